@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+Benchmark of the copies made by :class:`RuleIteratedElimination` at each round.
+
+Usage::
+
+    python -m benchmarks.bench_clone [--candidates 20] [--voters 100000] [--seed 0]
+"""
+import argparse
+import cProfile
+import pstats
+import random
+import time
+from copy import deepcopy
+from whalrus import RuleIRV, RulePlurality, CloneMixin, Priority
+
+
+def random_ballots(n_candidates: int, n_voters: int, seed: int) -> list:
+    rng = random.Random(seed)
+    candidates = ['c%02d' % i for i in range(n_candidates)]
+    return [rng.sample(candidates, n_candidates) for _ in range(n_voters)]
+
+
+def time_in(stats: pstats.Stats, function_name: str) -> float:
+    return sum(cumulative for (_, _, name), (_, _, _, cumulative, _) in stats.stats.items() if name == function_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the copies made by RuleIteratedElimination.')
+    parser.add_argument('--candidates', type=int, default=20)
+    parser.add_argument('--voters', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    ballots = random_ballots(args.candidates, args.voters, args.seed)
+
+    # Full IRV evaluation, with the time spent in copying the base rule and the elimination at each round.
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    rule = RuleIRV(ballots, tie_break=Priority.ASCENDING)
+    winner = rule.winner_
+    profiler.disable()
+    total = time.perf_counter() - start
+    stats = pstats.Stats(profiler)
+    print('IRV, %d candidates, %d voters: winner %r in %.3f s.' % (args.candidates, args.voters, winner, total))
+    print('    Time spent in clone: %.6f s (%d rounds).' % (time_in(stats, CloneMixin.clone.__name__),
+                                                            len(rule.eliminations_)))
+
+    # Cost of one copy of a rule that has already loaded the profile.
+    loaded = RulePlurality(ballots)
+    _ = loaded.gross_scores_
+    start = time.perf_counter()
+    loaded.clone()
+    time_clone = time.perf_counter() - start
+    start = time.perf_counter()
+    deepcopy(loaded)
+    time_deepcopy = time.perf_counter() - start
+    print('Copy of a loaded RulePlurality: clone %.6f s, deepcopy %.3f s.' % (time_clone, time_deepcopy))
+
+
+if __name__ == '__main__':
+    main()
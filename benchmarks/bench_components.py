@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+Benchmark of the decomposition into the components of the majority graph: for :class:`RuleSchulze` and
+:class:`RuleRankedPairs`, the time to compute the order, on profiles with a clear hierarchy (Mallows) or not
+(impartial culture). For Schulze, the time to compute the whole Schulze matrix is given for comparison.
+
+Usage::
+
+    python -m benchmarks.bench_components [--candidates 200] [--voters 100] [--seed 0]
+"""
+import argparse
+import time
+from whalrus import (GeneratorImpartialCulture, GeneratorMallows, MatrixMajority, RuleSchulze, RuleRankedPairs,
+                     Priority)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the decomposition into components.')
+    parser.add_argument('--candidates', type=int, default=200)
+    parser.add_argument('--voters', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    candidates = ['c%03d' % i for i in range(args.candidates)]
+    generators = {
+        'impartial culture': GeneratorImpartialCulture(candidates, seed=args.seed),
+        'Mallows (phi = .9)': GeneratorMallows(candidates, seed=args.seed, phi=.9),
+    }
+    for name, generator in generators.items():
+        profile = generator(args.voters)
+        n_components = len(MatrixMajority(profile).components_)
+        rule = RuleSchulze(profile, tie_break=Priority.ASCENDING)
+        _ = rule.matrix_schulze_.matrix_weighted_majority_.as_array_
+        start = time.perf_counter()
+        _ = rule.order_
+        time_order = time.perf_counter() - start
+        start = time.perf_counter()
+        _ = rule.matrix_schulze_.as_array_
+        time_matrix = time.perf_counter() - start
+        print('RuleSchulze, %s, %d candidates, %d voters: %d components, order %.3f s (whole matrix %.3f s).' % (
+            name, args.candidates, args.voters, n_components, time_order, time_matrix))
+        rule = RuleRankedPairs(profile, tie_break=Priority.ASCENDING)
+        _ = rule.matrix_.matrix_weighted_majority_.as_array_
+        start = time.perf_counter()
+        _ = rule.order_
+        time_order = time.perf_counter() - start
+        print('RuleRankedPairs, %s, %d candidates, %d voters: order %.3f s.' % (
+            name, args.candidates, args.voters, time_order))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+Benchmark of :class:`RuleKemeny`: for each number of candidates, the time to compute the Kemeny order, the size of
+the largest component and whether the result is exact (within the given budget).
+
+Usage::
+
+    python -m benchmarks.bench_kemeny [--min-candidates 8] [--max-candidates 30] [--voters 1000] [--max-time 60]
+"""
+import argparse
+import time
+from whalrus import GeneratorImpartialCulture, GeneratorMallows, RuleKemeny
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the Kemeny rule.')
+    parser.add_argument('--min-candidates', type=int, default=8)
+    parser.add_argument('--max-candidates', type=int, default=30)
+    parser.add_argument('--step', type=int, default=2)
+    parser.add_argument('--voters', type=int, default=1000)
+    parser.add_argument('--max-time', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for n_candidates in range(args.min_candidates, args.max_candidates + 1, args.step):
+        candidates = ['c%03d' % i for i in range(n_candidates)]
+        generators = {
+            'impartial culture': GeneratorImpartialCulture(candidates, seed=args.seed, weighted=True),
+            'Mallows (phi = .8)': GeneratorMallows(candidates, seed=args.seed, phi=.8, weighted=True),
+            'Mallows (phi = .95)': GeneratorMallows(candidates, seed=args.seed, phi=.95, weighted=True),
+        }
+        for name, generator in generators.items():
+            profile = generator(args.voters)
+            rule = RuleKemeny(profile, max_time=args.max_time)
+            _ = rule.matrix_weighted_majority_.as_array_of_floats_
+            start = time.perf_counter()
+            _ = rule.kemeny_order_
+            time_order = time.perf_counter() - start
+            print('%s, %d candidates, %d voters: %.3f s, largest component %d, %s.' % (
+                name, n_candidates, args.voters, time_order, max(len(component) for component in rule.components_),
+                'exact' if rule.is_exact_ else 'not exact'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Benchmark of live counting: ballots are appended to a profile one by one, and the winner is read after each
+ballot. The rules follow the profile (cf. :meth:`Profile.subscribe`), so that their tallies are patched instead
+of computed from scratch.
+
+Usage::
+
+    python -m benchmarks.bench_live_count [--candidates 10] [--voters 2000] [--new-voters 50] [--seed 0]
+"""
+import argparse
+import random
+import time
+from whalrus import Profile, RuleBorda, RulePlurality, RuleMaximin, Priority
+
+
+def random_ballots(n_candidates: int, n_voters: int, seed: int) -> list:
+    rng = random.Random(seed)
+    candidates = ['c%03d' % i for i in range(n_candidates)]
+    return [rng.sample(candidates, n_candidates) for _ in range(n_voters)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of live counting.')
+    parser.add_argument('--candidates', type=int, default=10)
+    parser.add_argument('--voters', type=int, default=2000)
+    parser.add_argument('--new-voters', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    ballots = random_ballots(args.candidates, args.voters + args.new_voters, args.seed)
+    for rule_class in [RuleBorda, RulePlurality, RuleMaximin]:
+        times = []
+        for live in [True, False]:
+            profile = Profile(ballots[:args.voters])
+            rule = rule_class(profile, tie_break=Priority.ASCENDING)
+            _ = rule.winner_
+            start = time.perf_counter()
+            for ballot in ballots[args.voters:]:
+                profile.append(ballot)
+                if not live:
+                    rule(Profile(profile))
+                _ = rule.winner_
+            times.append(time.perf_counter() - start)
+        print('%s, %d candidates, %d + %d voters: live %.3f s, from scratch %.3f s.' % (
+            rule_class.__name__, args.candidates, args.voters, args.new_voters, times[0], times[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Benchmark of the margin of victory: for some elections, the time to compute the winner, then the time to compute
+the margin of victory (or its bounds, for :class:`RuleIRV`), without brute force.
+
+Usage::
+
+    python -m benchmarks.bench_margin_of_victory [--candidates 10] [--voters 100000] [--seed 0]
+"""
+import argparse
+import time
+from whalrus import (GeneratorImpartialCulture, GeneratorUrn, GeneratorMallows, RuleIRV, RulePlurality, RuleBorda,
+                     RuleVeto, Priority)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the margin of victory.')
+    parser.add_argument('--candidates', type=int, default=10)
+    parser.add_argument('--voters', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    candidates = ['c%03d' % i for i in range(args.candidates)]
+    generators = {
+        'impartial culture': GeneratorImpartialCulture(candidates, seed=args.seed, weighted=True),
+        'urn': GeneratorUrn(candidates, seed=args.seed, replacement=1, weighted=True),
+        'Mallows': GeneratorMallows(candidates, seed=args.seed, phi=.9, weighted=True),
+    }
+    for name, generator in generators.items():
+        profile = generator(args.voters)
+        for rule_class in [RulePlurality, RuleBorda, RuleVeto, RuleIRV]:
+            rule = rule_class(profile, tie_break=Priority.ASCENDING)
+            start = time.perf_counter()
+            _ = rule.winner_
+            time_winner = time.perf_counter() - start
+            start = time.perf_counter()
+            if isinstance(rule, RuleIRV):
+                margin = '%s <= margin <= %s' % rule.margin_of_victory_bounds_
+            else:
+                margin = 'margin = %s' % rule.margin_of_victory_
+            time_margin = time.perf_counter() - start
+            print('%s, %s, %d candidates, %d voters (%d distinct ballots): winner %.3f s, %s in %.3f s.' % (
+                rule_class.__name__, name, args.candidates, args.voters, len(profile), time_winner, margin,
+                time_margin))
+
+
+if __name__ == '__main__':
+    main()
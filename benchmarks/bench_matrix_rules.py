@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+Benchmark of the rules that read their scores from a matrix (the matrix itself is computed beforehand).
+
+Usage::
+
+    python -m benchmarks.bench_matrix_rules [--candidates 200] [--voters 20] [--seed 0]
+"""
+import argparse
+import random
+import time
+from whalrus import RuleCopeland, RuleMaximin, RuleSimplifiedDodgson, RuleCondorcet, Priority
+
+
+def random_ballots(n_candidates: int, n_voters: int, seed: int) -> list:
+    rng = random.Random(seed)
+    candidates = ['c%03d' % i for i in range(n_candidates)]
+    return [rng.sample(candidates, n_candidates) for _ in range(n_voters)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the rules based on a matrix.')
+    parser.add_argument('--candidates', type=int, default=200)
+    parser.add_argument('--voters', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    ballots = random_ballots(args.candidates, args.voters, args.seed)
+    for rule_class, matrix_name, result_name in [(RuleCopeland, 'matrix_', 'scores_'),
+                                                 (RuleMaximin, 'matrix_weighted_majority_', 'scores_'),
+                                                 (RuleSimplifiedDodgson, 'matrix_weighted_majority_', 'scores_'),
+                                                 (RuleCondorcet, 'matrix_majority_', 'order_')]:
+        rule = rule_class(ballots, tie_break=Priority.ASCENDING)
+        start = time.perf_counter()
+        _ = getattr(rule, matrix_name).as_array_
+        time_matrix = time.perf_counter() - start
+        start = time.perf_counter()
+        _ = getattr(rule, result_name)
+        time_result = time.perf_counter() - start
+        print('%s, %d candidates, %d voters: matrix %.3f s, %s %.4f s.' % (
+            rule_class.__name__, args.candidates, args.voters, time_matrix, result_name, time_result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Benchmark of the removal of voters from a large profile, with and without index.
+
+Without index, each removal scans the profile, so only a few of them are timed (``--scan-removals``).
+
+Usage::
+
+    python -m benchmarks.bench_profile_removals [--voters 1000000] [--removals 100000] [--scan-removals 100]
+"""
+import argparse
+import itertools
+import random
+import time
+from whalrus import Profile, BallotOrder
+
+
+def make_profile(n_voters: int, indexed: bool) -> Profile:
+    ballots = [BallotOrder(list(permutation)) for permutation in itertools.permutations('abcd')]
+    return Profile([ballots[i % len(ballots)] for i in range(n_voters)],
+                   voters=['v%d' % i for i in range(n_voters)], indexed=indexed)
+
+
+def time_removals(profile: Profile, voters: list) -> float:
+    start = time.perf_counter()
+    for voter in voters:
+        profile.remove(voter=voter)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of removals from a profile.')
+    parser.add_argument('--voters', type=int, default=1000000)
+    parser.add_argument('--removals', type=int, default=100000)
+    parser.add_argument('--scan-removals', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    voters = ['v%d' % i for i in rng.sample(range(args.voters), args.removals)]
+    for indexed, n_removals in [(True, args.removals), (False, args.scan_removals)]:
+        start = time.perf_counter()
+        profile = make_profile(args.voters, indexed=indexed)
+        time_build = time.perf_counter() - start
+        time_remove = time_removals(profile, voters[:n_removals])
+        start = time.perf_counter()
+        _ = profile.ballots
+        time_compact = time.perf_counter() - start
+        print('indexed=%s, %d voters: build %.2f s, %d removals %.2f s (%.1f us per removal), then compaction %.2f s.'
+              % (indexed, args.voters, time_build, n_removals, time_remove, 1e6 * time_remove / n_removals,
+                 time_compact))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+Benchmark suite: times the construction of profiles, each converter, each matrix and each voting rule, on a grid of
+profiles (number of voters, number of candidates, type of ballots, weighted or not), and records the peak memory of
+each computation. The results are written as JSON, so that two commits can be compared.
+
+Usage::
+
+    python -m benchmarks.suite run [--voters 100 1000] [--candidates 5 10] [--ballots order weak truncated levels]
+        [--weighted no yes] [--only Rule] [--repeat 3] [--output results.json]
+    python -m benchmarks.suite compare old.json new.json [--threshold 1.25]
+
+The time of a target is the best of ``--repeat`` runs (the median is also recorded). The peak memory is measured with
+:mod:`tracemalloc` in a separate run, so that the tracing does not slow down the timed runs. A rule is timed from its
+construction with the profile to the computation of its order and its winner (all rules use
+:attr:`Priority.ASCENDING` as tie-break). ``compare`` exits with status 1 if a target is slower than ``threshold``
+times its previous time.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from whalrus import (
+    Priority, Profile, ScaleFromList, ScaleRange, GeneratorImpartialCulture,
+    ConverterBallotGeneral, ConverterBallotToOrder, ConverterBallotToStrictOrder, ConverterBallotToPlurality,
+    ConverterBallotToVeto, ConverterBallotToLevelsInterval, ConverterBallotToLevelsRange,
+    ConverterBallotToLevelsListNumeric, ConverterBallotToLevelsListNonNumeric, ConverterBallotToGrades,
+    ConverterBallotToLevels,
+    MatrixWeightedMajority, MatrixMajority, MatrixRankedPairs, MatrixSchulze,
+    RuleApproval, RuleBaldwin, RuleBlack, RuleBorda, RuleBucklinByRounds, RuleBucklinInstant, RuleCondorcet,
+    RuleCoombs, RuleCopeland, RuleIRV, RuleKApproval, RuleKemeny, RuleKimRoush, RuleMajorityJudgment, RuleMaximin,
+    RuleNanson, RulePlurality, RuleRangeVoting, RuleRankedPairs, RuleSchulze, RuleSimplifiedDodgson, RuleTwoRound,
+    RuleVeto)
+
+BALLOT_TYPES = {
+    'order': dict(),
+    'weak': dict(tie_probability=.3),
+    'truncated': dict(truncation=3),
+    'levels': dict(),
+}
+
+CONVERTERS = [
+    ConverterBallotGeneral(),
+    ConverterBallotToOrder(),
+    ConverterBallotToStrictOrder(priority=Priority.ASCENDING),
+    ConverterBallotToPlurality(priority=Priority.ASCENDING),
+    ConverterBallotToVeto(priority=Priority.ASCENDING),
+    ConverterBallotToLevelsInterval(),
+    ConverterBallotToLevelsRange(),
+    ConverterBallotToLevelsListNumeric(scale=ScaleFromList([0, 1, 2])),
+    ConverterBallotToLevelsListNonNumeric(scale=ScaleFromList(['Bad', 'Medium', 'Good'])),
+    ConverterBallotToGrades(),
+    ConverterBallotToLevels(),
+]
+
+MATRICES = [
+    (MatrixWeightedMajority, dict()),
+    (MatrixMajority, dict()),
+    (MatrixRankedPairs, dict(tie_break=Priority.ASCENDING)),
+    (MatrixSchulze, dict()),
+]
+
+
+def _plurality() -> RulePlurality:
+    return RulePlurality(converter=ConverterBallotToPlurality(priority=Priority.ASCENDING),
+                         tie_break=Priority.ASCENDING)
+
+
+def _veto() -> RuleVeto:
+    return RuleVeto(converter=ConverterBallotToVeto(priority=Priority.ASCENDING), tie_break=Priority.ASCENDING)
+
+
+# For each rule, a function giving its parameters. The converters that need to break ties in the ballots use
+# Priority.ASCENDING, so that all rules accept weak orders and truncated ballots.
+RULES = [
+    (RuleApproval, dict),
+    (RuleBaldwin, dict),
+    (RuleBlack, dict),
+    (RuleBorda, dict),
+    (RuleBucklinByRounds, dict),
+    (RuleBucklinInstant, dict),
+    (RuleCondorcet, dict),
+    (RuleCoombs, lambda: dict(base_rule=_veto())),
+    (RuleCopeland, dict),
+    (RuleIRV, lambda: dict(base_rule=_plurality())),
+    (RuleKApproval, lambda: dict(k=2, converter=ConverterBallotToStrictOrder(priority=Priority.ASCENDING))),
+    (RuleKemeny, lambda: dict(max_time=10)),
+    (RuleKimRoush, lambda: dict(base_rule=_veto())),
+    (RuleMajorityJudgment, dict),
+    (RuleMaximin, dict),
+    (RuleNanson, dict),
+    (RulePlurality, lambda: dict(converter=ConverterBallotToPlurality(priority=Priority.ASCENDING))),
+    (RuleRangeVoting, dict),
+    (RuleRankedPairs, dict),
+    (RuleSchulze, dict),
+    (RuleSimplifiedDodgson, dict),
+    (RuleTwoRound, lambda: dict(rule1=_plurality(), rule2=_plurality())),
+    (RuleVeto, lambda: dict(converter=ConverterBallotToVeto(priority=Priority.ASCENDING))),
+]
+
+
+def make_profile(n_voters: int, n_candidates: int, ballot_type: str, weighted: bool, seed: int) -> Profile:
+    """
+    Generate a profile of the grid.
+
+    :param n_voters: the number of voters.
+    :param n_candidates: the number of candidates.
+    :param ballot_type: a key of :data:`BALLOT_TYPES`. For ``'levels'``, the generated strict orders are converted
+        to grades between 0 and 10.
+    :param weighted: whether identical ballots are merged.
+    :param seed: the seed of the generator.
+    :return: a :class:`Profile`.
+    """
+    candidates = ['c%03d' % i for i in range(n_candidates)]
+    profile = GeneratorImpartialCulture(candidates, seed=seed, weighted=weighted, **BALLOT_TYPES[ballot_type])(
+        n_voters)
+    if ballot_type == 'levels':
+        converter = ConverterBallotToLevelsRange(scale=ScaleRange(0, 10))
+        profile = Profile([converter(b) for b in profile], weights=profile.weights)
+    return profile
+
+
+def targets(profile: Profile) -> list:
+    """
+    The computations to benchmark on a profile.
+
+    :param profile: a :class:`Profile`.
+    :return: a list of triples: kind of target, name, function without argument.
+    """
+    strings = [str(b) for b in profile]
+    result = [
+        ('profile', 'Profile (from strings)', lambda: Profile(strings, weights=profile.weights)),
+        ('profile', 'Profile (from ballots)', lambda: Profile(list(profile), weights=profile.weights)),
+    ]
+    for converter in CONVERTERS:
+        result.append(('converter', type(converter).__name__,
+                       lambda converter=converter: [converter(b) for b in profile]))
+    for matrix_class, kwargs in MATRICES:
+        result.append(('matrix', matrix_class.__name__,
+                       lambda matrix_class=matrix_class, kwargs=kwargs: matrix_class(profile, **kwargs).as_array_))
+
+    def evaluate(rule_class, parameters):
+        rule = rule_class(profile, tie_break=Priority.ASCENDING, **parameters())
+        return rule.order_, rule.winner_
+
+    for rule_class, parameters in RULES:
+        result.append(('rule', rule_class.__name__,
+                       lambda rule_class=rule_class, parameters=parameters: evaluate(rule_class, parameters)))
+    return result
+
+
+def measure(function, repeat: int) -> dict:
+    """
+    Time a function and measure its peak memory.
+
+    :param function: a function without argument.
+    :param repeat: the number of timed runs.
+    :return: a dictionary with the best and median times (in seconds), the peak memory (in bytes) and, if the function
+        raised an exception, its description (and no time).
+    """
+    times = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            function()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        return {'error': '%s: %s' % (type(e).__name__, e)}
+    return {'time': min(times), 'time_median': statistics.median(times), 'peak_memory': peak_memory}
+
+
+def metadata() -> dict:
+    """
+    Description of the environment.
+
+    :return: a dictionary with the current commit (if available), the date and the versions of Python and numpy.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform()}
+
+
+def run(args) -> None:
+    results = []
+    for n_voters in args.voters:
+        for n_candidates in args.candidates:
+            for ballot_type in args.ballots:
+                for weighted in args.weighted:
+                    profile = make_profile(n_voters, n_candidates, ballot_type, weighted == 'yes', args.seed)
+                    for kind, name, function in targets(profile):
+                        if args.only and not any(pattern in name for pattern in args.only):
+                            continue
+                        result = {'kind': kind, 'target': name, 'voters': n_voters, 'candidates': n_candidates,
+                                  'ballots': ballot_type, 'weighted': weighted == 'yes',
+                                  'distinct_ballots': len(profile)}
+                        result.update(measure(function, args.repeat))
+                        results.append(result)
+                        if 'error' in result:
+                            description = result['error']
+                        else:
+                            description = '%.4f s, %.1f MB' % (result['time'], result['peak_memory'] / 2 ** 20)
+                        print('%s, %d voters, %d candidates, %s, weighted: %s: %s.' % (
+                            name, n_voters, n_candidates, ballot_type, weighted, description))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'metadata': metadata(), 'results': results}, f, indent=1)
+
+
+def _key(result: dict) -> tuple:
+    return (result['target'], result['voters'], result['candidates'], result['ballots'], result['weighted'])
+
+
+def compare(args) -> int:
+    with open(args.old) as f:
+        old = {_key(result): result for result in json.load(f)['results'] if 'time' in result}
+    with open(args.new) as f:
+        new = [result for result in json.load(f)['results'] if 'time' in result]
+    n_regressions = 0
+    for result in new:
+        previous = old.get(_key(result))
+        if previous is None:
+            continue
+        ratio = result['time'] / previous['time']
+        if ratio > args.threshold:
+            status = 'SLOWER'
+            n_regressions += 1
+        elif ratio < 1 / args.threshold:
+            status = 'faster'
+        else:
+            continue
+        values = (status, ) + _key(result) + (previous['time'], result['time'], ratio,
+                                              previous['peak_memory'] / 2 ** 20, result['peak_memory'] / 2 ** 20)
+        print('%s: %s, %d voters, %d candidates, %s, weighted: %s: %.4f s -> %.4f s (x %.2f), memory %.1f MB -> '
+              '%.1f MB.' % values)
+    print('%d regression(s).' % n_regressions)
+    return 1 if n_regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite of Whalrus.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    parser_run = subparsers.add_parser('run', help='Run the benchmarks.')
+    parser_run.add_argument('--voters', type=int, nargs='+', default=[100, 1000])
+    parser_run.add_argument('--candidates', type=int, nargs='+', default=[5, 10])
+    parser_run.add_argument('--ballots', nargs='+', default=list(BALLOT_TYPES), choices=list(BALLOT_TYPES))
+    parser_run.add_argument('--weighted', nargs='+', default=['no', 'yes'], choices=['no', 'yes'])
+    parser_run.add_argument('--only', nargs='+', help='Only the targets whose name contains one of these strings.')
+    parser_run.add_argument('--repeat', type=int, default=3)
+    parser_run.add_argument('--seed', type=int, default=0)
+    parser_run.add_argument('--output', help='JSON file for the results.')
+    parser_compare = subparsers.add_parser('compare', help='Compare two JSON files of results.')
+    parser_compare.add_argument('old')
+    parser_compare.add_argument('new')
+    parser_compare.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == '__main__':
+    main()
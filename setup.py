@@ -34,6 +34,7 @@ setup(
     entry_points={
         'console_scripts': [
             'whalrus=whalrus.cli:main',
+            'whalrus-server=whalrus.server:main',
         ],
     },
     install_requires=requirements,
@@ -0,0 +1,32 @@
+from whalrus.resampling.Bootstrap import Bootstrap
+from whalrus.rule.RuleCopeland import RuleCopeland
+from whalrus.rule.RuleIRV import RuleIRV
+from whalrus.rule.RuleMaximin import RuleMaximin
+from whalrus.rule.RulePlurality import RulePlurality
+from whalrus.priority.Priority import Priority
+
+BALLOTS = ['a > b > c > d', 'b > c > d > a', 'c > a > d > b', 'd > b > a > c', 'b > a > c > d']
+WEIGHTS = [5, 4, 3, 2, 1]
+
+
+def test_batched_as_one_by_one():
+    # The vectorized tallies give the same winners as the evaluation of the rule on each resample.
+    for rule in [RulePlurality(BALLOTS, weights=WEIGHTS, tie_break=Priority.ASCENDING),
+                 RuleMaximin(BALLOTS, weights=WEIGHTS, tie_break=Priority.DESCENDING),
+                 RuleCopeland(BALLOTS, weights=WEIGHTS)]:
+        batched = Bootstrap(rule, n=200, seed=1, batch_size=30)
+        assert batched.is_batched_
+        one_by_one = Bootstrap(rule, n=200, seed=1, batch_size=30)
+        one_by_one._cached_properties['is_batched_'] = False
+        assert batched.winner_counts_ == one_by_one.winner_counts_
+        assert batched.n_no_winner_ == one_by_one.n_no_winner_
+        assert sum(batched.winner_counts_.values()) + batched.n_no_winner_ == 200
+
+
+def test_process_pool():
+    rule = RuleIRV(BALLOTS, weights=WEIGHTS, tie_break=Priority.ASCENDING)
+    bootstrap = Bootstrap(rule, n=60, seed=2, batch_size=20)
+    assert not bootstrap.is_batched_
+    assert Bootstrap(rule, n=60, seed=2, batch_size=20, n_jobs=2).winner_counts_ == bootstrap.winner_counts_
+    low, high = bootstrap.winner_frequencies_interval_['a']
+    assert low <= bootstrap.winner_frequencies_['a'] <= high
@@ -0,0 +1,22 @@
+from whalrus.generators.GeneratorImpartialCulture import GeneratorImpartialCulture
+from whalrus.generators.GeneratorMallows import GeneratorMallows
+from whalrus.generators.GeneratorUrn import GeneratorUrn
+from whalrus.rule.RulePlurality import RulePlurality
+
+
+def test_weak_orders_and_truncation():
+    generator = GeneratorImpartialCulture(['a', 'b', 'c', 'd'], seed=42, tie_probability=1, truncation=2)
+    for ballot in generator(10):
+        assert len(ballot.as_weak_order) == 1
+        assert len(ballot) == 2
+        assert ballot.candidates == {'a', 'b', 'c', 'd'}
+
+
+def test_weighted():
+    profile = GeneratorMallows(['a', 'b', 'c'], phi=.3, seed=42)(500)
+    profile_weighted = GeneratorMallows(['a', 'b', 'c'], phi=.3, seed=42, weighted=True)(500)
+    assert RulePlurality(profile).gross_scores_ == RulePlurality(profile_weighted).gross_scores_
+
+
+def test_urn_without_voters():
+    assert len(GeneratorUrn(['a', 'b'], replacement=3, seed=42)(0)) == 0
@@ -0,0 +1,50 @@
+import pytest
+from whalrus.generators.GeneratorImpartialCulture import GeneratorImpartialCulture
+from whalrus.manipulation.ManipulationIRV import ManipulationIRV
+from whalrus.manipulation.ManipulationPositional import ManipulationPositional
+from whalrus.manipulation.ManipulationTwoRound import ManipulationTwoRound
+from whalrus.priority.Priority import Priority
+from whalrus.rule.RuleBorda import RuleBorda
+from whalrus.rule.RuleIRV import RuleIRV
+from whalrus.rule.RulePlurality import RulePlurality
+from whalrus.rule.RuleTwoRound import RuleTwoRound
+from whalrus.rule.RuleVeto import RuleVeto
+
+
+def test_examples_make_the_candidate_win():
+    generator = GeneratorImpartialCulture(['a', 'b', 'c', 'd'], seed=42, weighted=True)
+    for _ in range(10):
+        profile = generator(11)
+        for rule, manipulation in [(RulePlurality, ManipulationPositional), (RuleVeto, ManipulationPositional),
+                                   (RuleBorda, ManipulationPositional), (RuleIRV, ManipulationIRV),
+                                   (RuleTwoRound, ManipulationTwoRound)]:
+            m = manipulation(rule(profile, tie_break=Priority.ASCENDING), verify=True)
+            assert set(m.examples_.keys()) == {c for c, result in m.is_cm_by_candidate_.items() if result}
+            if rule is not RuleBorda:
+                assert None not in m.is_cm_by_candidate_.values()
+
+
+def test_majority_favorite():
+    rule = RuleIRV(['a > b > c', 'b > c > a', 'c > b > a'], weights=[5, 2, 2], tie_break=Priority.ASCENDING)
+    assert ManipulationIRV(rule).is_cm_ is False
+
+
+def test_ties():
+    # The voters who prefer `b` to `a` can only make `b` tie with `a`.
+    ballots = ['a > b > c', 'b > a > c', 'c > b > a']
+    weights = [2, 1, 1]
+    assert ManipulationPositional(RulePlurality(ballots, weights=weights)).is_cm_by_candidate_['b'] is False
+    assert ManipulationPositional(RulePlurality(ballots, weights=weights, tie_break=Priority.ASCENDING)
+                                  ).is_cm_by_candidate_['b'] is False
+    rule = RulePlurality(ballots, weights=weights, tie_break=Priority.DESCENDING)
+    assert ManipulationPositional(rule).sincere_winner_ == 'a'
+    assert ManipulationPositional(rule).is_cm_by_candidate_['b'] is True
+
+
+def test_errors():
+    with pytest.raises(NotImplementedError):
+        ManipulationTwoRound(RuleTwoRound(['a > b > c'], rule1=RuleBorda()))
+    with pytest.raises(ValueError):
+        ManipulationPositional(RulePlurality(['a > b', 'b > a'], weights=[1.5, 1])).is_cm_
+    with pytest.raises(ValueError):
+        ManipulationPositional(RulePlurality(['a > b', 'b'], weights=[2, 1])).is_cm_
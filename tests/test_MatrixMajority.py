@@ -0,0 +1,30 @@
+from whalrus.matrix.MatrixMajority import MatrixMajority
+from whalrus.matrix.MatrixSchulze import MatrixSchulze
+from whalrus.matrix.MatrixWeightedMajority import MatrixWeightedMajority
+from whalrus.rule.RuleSchulze import RuleSchulze
+from whalrus.rule.RuleRankedPairs import RuleRankedPairs
+from whalrus.priority.Priority import Priority
+
+
+def test_components():
+    # In the first component, `c` beats `a`, `a` beats `b`, and `b` and `c` are tied. Then `d`, then a tie between `e`
+    # and `f`.
+    ballots = ['a > b > c > d > e > f', 'b > c > a > d > f > e', 'c > a > b > d > e > f', 'c > a > b > d > f > e']
+    matrix = MatrixMajority(ballots)
+    assert matrix.components_ == [{'a', 'b', 'c'}, {'d'}, {'e', 'f'}]
+    assert matrix.smith_set_ == {'a', 'b', 'c'}
+    assert matrix.schwartz_set_ == {'c'}
+    schulze = RuleSchulze(ballots)
+    assert len(schulze._widest_paths_by_component_) == 3
+    assert schulze.order_ == [{'c'}, {'a'}, {'b'}, {'d'}, {'e', 'f'}]
+    ranked_pairs = RuleRankedPairs(ballots, tie_break=Priority.ASCENDING)
+    assert ranked_pairs.strict_order_ == ['c', 'a', 'b', 'd', 'e', 'f']
+
+
+def test_schulze_without_constant_sum():
+    # An indifference counts 0 for both candidates, so the weighted majority matrix is not constant-sum: the whole
+    # Schulze matrix is used.
+    schulze = RuleSchulze(['a > b > c', 'a > b ~ c'], matrix_schulze=MatrixSchulze(
+        matrix_weighted_majority=MatrixWeightedMajority(indifference=0)))
+    assert len(schulze._widest_paths_by_component_) == 1
+    assert schulze.winner_ == 'a'
@@ -0,0 +1,76 @@
+import io
+from fractions import Fraction
+import numpy as np
+from whalrus.ballot.BallotOrder import BallotOrder
+from whalrus.matrix.Matrix import Matrix
+from whalrus.matrix.MatrixWeightedMajority import MatrixWeightedMajority
+from whalrus.rule.RuleCopeland import RuleCopeland
+from whalrus.rule.RuleMaximin import RuleMaximin
+
+
+def test_absent_candidates():
+    # In the first ballot, `c` is unordered and `d` is absent. In the second ballot, `b` and `d` are absent.
+    matrix = MatrixWeightedMajority(
+        ballots=[BallotOrder('a > b', candidates={'a', 'b', 'c'}), BallotOrder('a ~ c', candidates={'a', 'c'})],
+        weights=[2, 1], candidates={'a', 'b', 'c', 'd'},
+        ordered_vs_absent=1, absent_vs_ordered=0, unordered_vs_absent=1, absent_vs_absent=Fraction(1, 2))
+    assert matrix.gross_[('a', 'd')] == 3
+    assert matrix.gross_[('d', 'a')] == 0
+    assert matrix.gross_[('c', 'd')] == 3
+    assert matrix.gross_[('b', 'd')] == Fraction(5, 2)
+    assert matrix.weights_[('b', 'd')] == 3
+    assert matrix.as_dict_[('b', 'd')] == Fraction(5, 6)
+
+
+def test_as_dict_is_a_view():
+    matrix = MatrixWeightedMajority(ballots=['a > b > c', 'b > a > c'])
+    assert len(matrix.as_dict_) == 9
+    assert ('a', 'c') in matrix.as_dict_
+    assert ('a', 'z') not in matrix.as_dict_
+    assert dict(matrix.as_dict_) == {
+        (c, d): matrix.as_array_[i, j]
+        for i, c in enumerate(matrix.candidates_as_list_) for j, d in enumerate(matrix.candidates_as_list_)}
+
+
+def test_as_array_batch():
+    # Each matrix is the same as the one computed with the corresponding weights.
+    ballots = [BallotOrder('a > b', candidates={'a', 'b', 'c'}), BallotOrder('a ~ c', candidates={'a', 'c'}), 'c > b']
+    parameters = dict(candidates={'a', 'b', 'c', 'd'}, ordered_vs_absent=1, absent_vs_ordered=0, indifference=None,
+                      diagonal_score=Fraction(1, 2), default_score=-1, antisymmetric=True)
+    weights = [[2, 1, 1], [0, 0, 3], [Fraction(1, 3), 1, 0]]
+    matrices = MatrixWeightedMajority(ballots, **parameters).as_array_batch(weights)
+    for row, matrix in zip(weights, matrices):
+        assert np.allclose(matrix, MatrixWeightedMajority(ballots, weights=row, **parameters).as_array_of_floats_)
+
+
+def test_npz():
+    for matrix in [MatrixWeightedMajority(['a > b > c', 'b > a > c']),
+                   MatrixWeightedMajority(['a > b > c', 'b > a > c'], weights=[.5, 1.25]),
+                   MatrixWeightedMajority([[1, 2], [2, 1]], antisymmetric=True)]:
+        f = io.BytesIO()
+        matrix.to_npz(f)
+        f.seek(0)
+        view = Matrix.from_npz(f)
+        assert dict(view) == dict(matrix.as_dict_)
+        assert [type(x) for x in view.values()] == [type(x) for x in matrix.as_dict_.values()]
+
+
+def test_big_weights():
+    # The weights do not fit in native integers: the coefficients are still exact.
+    matrix = MatrixWeightedMajority(['a > b', 'b > a'], weights=[10 ** 20, 1])
+    assert matrix.gross_['a', 'b'] == 10 ** 20
+    assert matrix.as_dict_['a', 'b'] == Fraction(10 ** 20, 10 ** 20 + 1)
+    matrix = MatrixWeightedMajority(['a > b', 'b > a'], weights=[2 ** 62, 2 ** 62])
+    assert matrix.weights_['a', 'b'] == 2 ** 63
+
+
+def test_empty_profile():
+    assert MatrixWeightedMajority([]).as_dict_ == {}
+    assert RuleCopeland([]).order_ == []
+    assert RuleMaximin([]).order_ == []
+
+
+def test_one_candidate():
+    assert RuleCopeland(['a']).winner_ == 'a'
+    assert RuleMaximin(['a']).winner_ == 'a'
+    assert RuleMaximin(['a']).scores_ == {'a': 0}
@@ -1,5 +1,10 @@
+import io
+import pickle
+from fractions import Fraction
+import pytest
 from whalrus.profile.Profile import Profile
 from whalrus.ballot.BallotOrder import BallotOrder
+from whalrus.ballot.BallotLevels import BallotLevels
 
 
 def test():
@@ -68,3 +73,139 @@ def test():
     assert str(profile) == 'Alice (2): a > b ~ c\nNone (1): b > c > a\nNone (1): c > a > b'
     profile *= 3
     assert str(profile) == 'Alice (6): a > b ~ c\nNone (3): b > c > a\nNone (3): c > a > b'
+
+
+def test_subscribe():
+    profile = Profile(['a > b', 'b > a'])
+    events = []
+
+    def callback(index, ballot, weight, voter, added):
+        events.append((index, str(ballot), weight, voter, added))
+    profile.subscribe(callback)
+    profile.append('a > b', weight=2, voter='Alice')
+    profile[0] = 'b > a'
+    del profile[0:2]
+    assert events == [(2, 'a > b', 2, 'Alice', True),
+                      (0, 'a > b', 1, None, False), (0, 'b > a', 1, None, True),
+                      (1, 'b > a', 1, None, False), (0, 'b > a', 1, None, False)]
+    profile.unsubscribe(callback)
+    profile.append('a > b')
+    assert len(events) == 5
+    # The weights and voters of a copy are not shared with the original profile.
+    copy = Profile(profile)
+    copy.append('b > a')
+    assert len(profile.weights) == 2
+
+
+def test_subscribe_rule():
+    # The rule follows the profile, even when the set of candidates changes.
+    from whalrus.rule.RuleBorda import RuleBorda
+    profile = Profile(['a > b', 'b > a', 'a > b'])
+    rule = RuleBorda(profile, follow=True)
+    assert rule.winner_ == 'a'
+    tallies = rule._gross_scores_and_weights_
+    profile.append('b > a', weight=2)
+    assert rule.winner_ == 'b'
+    assert rule._gross_scores_and_weights_ is tallies
+    profile.append('c > b > a')
+    assert rule.candidates_ == {'a', 'b', 'c'}
+    assert rule.winner_ == 'b'
+    profile.remove('c > b > a')
+    assert rule.candidates_ == {'a', 'b'}
+    # A rule that is called with another profile stops following the first one.
+    rule(['a > b'])
+    profile.append('b > a')
+    assert len(rule.profile_original_) == 1
+
+
+def test_subscribe_opt_in():
+    import gc
+    from whalrus.rule.RuleBorda import RuleBorda
+    from whalrus.rule.RuleSchulze import RuleSchulze
+    profile = Profile(['a > b > c', 'b > c > a', 'c > a > b', 'a > c > b'])
+    # By default, a rule does not follow its profile.
+    rule = RuleBorda(profile)
+    assert not rule.follows_profile and not profile._subscribers
+    profile.append('b > a > c')
+    assert len(rule.profile_original_) == 4
+    # The subscriptions of the rules that are garbage collected are removed.
+    for _ in range(100):
+        assert RuleSchulze(profile, follow=True).winner_ == 'a'
+    gc.collect()
+    assert not profile._subscribers
+    # The matrices of a rule that follows its profile follow it too, so that they are kept.
+    rule = RuleSchulze(profile, follow=True)
+    matrix = rule.matrix_schulze_
+    assert matrix.follows_profile and matrix.matrix_weighted_majority_.follows_profile
+    profile.append('c > b > a', weight=3)
+    assert rule.matrix_schulze_.matrix_weighted_majority_ is matrix.matrix_weighted_majority_
+    assert rule.winner_ == RuleSchulze(list(profile), weights=profile.weights).winner_
+
+
+def test_indexed():
+    profile = Profile(['a > b', 'b > a', 'a > b', 'b > a'], voters=['Alice', 'Bob', 'Cate', 'Dave'], indexed=True)
+    assert profile.indexed
+    profile.remove(voter='Bob')
+    # The deleted ballot is not removed from the internal lists yet.
+    assert len(profile) == 3
+    assert profile[1] == BallotOrder('a > b')
+    profile.update('Cate', 'b > a')
+    profile.remove('b > a')
+    assert str(profile) == 'Alice: a > b\nDave: b > a'
+    profile.insert(0, 'a ~ b', voter='Bob')
+    profile.remove('a > b', voter='Alice')
+    assert str(profile) == 'Bob: a ~ b\nDave: b > a'
+    with pytest.raises(ValueError):
+        profile.remove(voter='Alice')
+    with pytest.raises(ValueError):
+        profile.update('Alice', 'a > b')
+
+
+def test_pickle():
+    profile = Profile([BallotOrder('a > b', candidates={'a', 'b', 'c'}), 'b ~ c > a', BallotLevels({'a': 1, 'b': 0}),
+                       BallotOrder('a > b', candidates={'a', 'b', 'c'}), BallotOrder([])],
+                      weights=[1, Fraction(1, 2), 3, 2, 1], voters=['x', 'y', 'z', 't', 'u'], indexed=True)
+    profile.subscribe(lambda *args: None)
+    buffers = []
+    copy = pickle.loads(pickle.dumps(profile, protocol=5, buffer_callback=buffers.append), buffers=buffers)
+    assert buffers
+    assert copy.ballots == profile.ballots
+    assert repr(copy) == repr(profile)
+    assert copy.indexed
+    assert not copy._subscribers
+    assert '_cached_properties' not in pickle.loads(pickle.dumps(copy.ballots[2])).__dict__
+    # Equal ballots are shared.
+    assert copy.ballots[0] is copy.ballots[3]
+    copy.remove(voter='t')
+    assert len(copy) == 4
+    # With weights that are neither integers, fractions nor floats.
+    copy = pickle.loads(pickle.dumps(Profile(['a > b'], weights=[1.5 + 0j])))
+    assert copy.weights == [1.5 + 0j]
+
+
+def test_npz():
+    profile = Profile(['a > b ~ c', BallotOrder('c > b', candidates={'a', 'b', 'c'}), 'a > b ~ c'], weights=[1.5, 2, 1])
+    f = io.BytesIO()
+    profile.to_npz(f)
+    f.seek(0)
+    copy = Profile.from_npz(f)
+    assert repr(copy) == repr(profile)
+    with pytest.raises(TypeError):
+        Profile([BallotLevels({'a': 1})]).to_npz(io.BytesIO())
+    with pytest.raises(TypeError):
+        Profile(['a > b'], voters=[('Alice', 1)]).to_npz(io.BytesIO())
+
+
+def test_freeze():
+    profile = Profile(['a > b', 'b > a', 'a > b'], voters=['x', 'y', 'z'], indexed=True)
+    del profile[0]
+    profile.freeze()
+    assert profile.frozen
+    assert profile.voters == ['y', 'z']
+    for modify in [lambda: profile.append('a > b'), lambda: profile.remove(voter='y'),
+                   lambda: profile.update('y', 'a > b'), lambda: profile.__setitem__(0, 'a > b'),
+                   lambda: profile.__delitem__(0)]:
+        with pytest.raises(TypeError):
+            modify()
+    assert pickle.loads(pickle.dumps(profile)).frozen
+    assert not Profile(profile).frozen
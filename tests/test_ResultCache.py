@@ -0,0 +1,91 @@
+import os
+import time
+from whalrus.cache.ResultCache import ResultCache
+from whalrus.converter_ballot.ConverterBallotToLevels import ConverterBallotToLevels
+from whalrus.converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
+from whalrus.priority.Priority import Priority
+from whalrus.profile.Profile import Profile
+from whalrus.rule.RuleBorda import RuleBorda
+from whalrus.rule.RuleCopeland import RuleCopeland
+from whalrus.rule.RuleIRV import RuleIRV
+from whalrus.rule.RuleMajorityJudgment import RuleMajorityJudgment
+from whalrus.scale.ScaleRange import ScaleRange
+
+BALLOTS = ['a > b > c', 'b > c > a', 'c > a > b', 'a > c > b']
+
+
+def test_hit_does_not_compute(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    rule = cache(RuleCopeland(), BALLOTS, [2, 1, 1, 1])
+    order = rule.order_
+    scores = rule.scores_
+    rule = cache(RuleCopeland(), BALLOTS, [2, 1, 1, 1])
+    assert (cache.hits_, cache.misses_) == (1, 1)
+    assert rule.order_ == order
+    assert rule.scores_ == scores
+    # The matrix is read from the file too: the profile is never converted.
+    assert 'matrix_' in rule._cached_properties
+    assert 'profile_converted_' not in rule._cached_properties
+
+
+def test_rounds_are_stored(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache(RuleIRV(tie_break=Priority.ASCENDING), BALLOTS)
+    rule = cache(RuleIRV(tie_break=Priority.ASCENDING), BALLOTS)
+    assert cache.hits_ == 1
+    assert rule.eliminations_[0].eliminated_ == rule.order_[-1]
+
+
+def test_key_is_stable():
+    # Equal parameters and equal profiles give the same key, even with other objects or other number types.
+    key = ResultCache.key(RuleBorda(BALLOTS, weights=[2, 1, 1, 1], converter=ConverterBallotToOrder()))
+    assert key == ResultCache.key(RuleBorda(Profile(BALLOTS, weights=[2., 1, 1, 1]),
+                                            converter=ConverterBallotToOrder()))
+    assert key != ResultCache.key(RuleBorda(BALLOTS, weights=[1, 2, 1, 1], converter=ConverterBallotToOrder()))
+    # The default converter of :class:`RuleBorda` has the same parameters.
+    assert key == ResultCache.key(RuleBorda(BALLOTS, weights=[2, 1, 1, 1]))
+    assert key != ResultCache.key(RuleBorda(BALLOTS, weights=[2, 1, 1, 1], converter=ConverterBallotToOrder(),
+                                            tie_break=Priority.ASCENDING))
+    assert key != ResultCache.key(RuleCopeland(BALLOTS, weights=[2, 1, 1, 1], converter=ConverterBallotToOrder()))
+    rule = RuleBorda(BALLOTS, weights=[2, 1, 1, 1], candidates={'a', 'b', 'c', 'd'})
+    assert ResultCache.key(rule, {'a', 'b', 'c', 'd'}) != ResultCache.key(RuleBorda(BALLOTS, weights=[2, 1, 1, 1]))
+
+
+def test_private_parameters(tmp_path):
+    # The bounds of a scale are stored in ``_low`` and ``_high``: they are parameters too.
+    cache = ResultCache(str(tmp_path))
+    ballots = [{'a': 10, 'b': 6}, {'a': 4, 'b': 6}, {'a': 6, 'b': 5}]
+    cache(RuleMajorityJudgment(scale=ScaleRange(0, 10), converter=ConverterBallotToLevels()), ballots)
+    rule = cache(RuleMajorityJudgment(scale=ScaleRange(0, 5), converter=ConverterBallotToLevels()), ballots)
+    assert (cache.hits_, cache.misses_) == (0, 2)
+    fresh = RuleMajorityJudgment(ballots, scale=ScaleRange(0, 5), converter=ConverterBallotToLevels())
+    assert rule.scores_ == fresh.scores_
+
+
+def test_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache(RuleBorda(), ['a > b'])
+    cache.max_size = 2.5 * cache.size
+    time.sleep(.01)
+    cache(RuleBorda(), ['b > a'])
+    time.sleep(.01)
+    cache(RuleBorda(), ['a > b'])
+    time.sleep(.01)
+    cache(RuleBorda(), ['c > d'])
+    # The least recently used result has been deleted.
+    assert len(os.listdir(str(tmp_path))) == 2
+    assert not os.path.exists(cache._path(ResultCache.key(RuleBorda(['b > a']))))
+    cache(RuleBorda(), ['a > b'])
+    assert cache.hits_ == 2
+    cache.clear()
+    assert cache.size == 0
+
+
+def test_corrupted_file(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    rule = cache(RuleBorda(), ['a > b'])
+    with open(cache._path(ResultCache.key(rule)), 'wb') as f:
+        f.write(b'not a pickle')
+    rule = cache(RuleBorda(), ['a > b'])
+    assert (cache.hits_, cache.misses_) == (0, 2)
+    assert rule.winner_ == 'a'
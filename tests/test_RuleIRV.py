@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from whalrus.rule.RuleIRV import RuleIRV
+from whalrus.rule.RuleBorda import RuleBorda
+from whalrus.priority.Priority import Priority
+
+
+def test_margin_of_victory():
+    # 'c' is eliminated first. If one voter changes 'c > a > b' to 'b > c > a', then 'a' is eliminated first.
+    rule = RuleIRV(['a > b > c', 'b > c > a', 'c > a > b'], weights=[4, 3, 3], tie_break=Priority.ASCENDING)
+    assert rule.winner_ == 'a'
+    assert rule.margin_of_victory_bounds_ == (1, 1)
+    rule = RuleIRV(['a > b > c', 'b > c > a', 'c > a > b'], weights=[8, 3, 3], tie_break=Priority.ASCENDING)
+    assert rule.winner_ == 'a'
+    assert rule.margin_of_victory_ == 2
+    # Truncated ballots and a single candidate.
+    rule = RuleIRV(['a > b', 'b > a', 'c > b'], weights=[3, 2, 2], tie_break=Priority.ASCENDING)
+    assert rule.winner_ == 'b'
+    assert rule.margin_of_victory_ == 1
+    assert RuleIRV(['a'], weights=[3]).margin_of_victory_ is None
+
+
+def test_margin_of_victory_not_implemented():
+    with pytest.raises(NotImplementedError):
+        _ = RuleIRV(['a > b', 'b > a'], base_rule=RuleBorda(), tie_break=Priority.ASCENDING).margin_of_victory_
+    with pytest.raises(NotImplementedError):
+        _ = RuleIRV(['a > b ~ c', 'b > a > c'], tie_break=Priority.ASCENDING).margin_of_victory_
+
+
+def test_margin_of_victory_large_election():
+    # 10 candidates and 10^5 voters, with 500 distinct ballots.
+    rng = np.random.default_rng(42)
+    candidates = ['c%d' % i for i in range(10)]
+    ballots = [' > '.join(candidates[i] for i in rng.permutation(10)) for _ in range(500)]
+    weights = rng.multinomial(100000, rng.dirichlet(np.ones(500))).tolist()
+    rule = RuleIRV(ballots, weights=weights, tie_break=Priority.ASCENDING)
+    lower, upper = rule.margin_of_victory_bounds_
+    assert 1 <= lower <= upper < 100000
@@ -22,3 +22,37 @@ def test():
     ], weights=[1, 1, 3, 4])
     assert irv.order_ == [{'b'}, {'c'}, {'a'}, {'d'}]
     assert irv.winner_ == 'b'
+
+
+def test_rounds_use_clones():
+    base_rule = RulePlurality()
+    irv = RuleIteratedElimination(['a > b > c', 'b > a > c', 'c > a > b'], weights=[2, 3, 4], base_rule=base_rule)
+    rules = [elimination.rule_ for elimination in irv.eliminations_]
+    assert len({id(rule) for rule in rules}) == len(rules)
+    assert all(rule is not base_rule for rule in rules)
+    assert base_rule.profile_converted_ is None
+    assert rules[0].gross_scores_ == {'a': 2, 'b': 3, 'c': 4}
+
+
+def test_lazy_rounds():
+    irv = RuleIteratedElimination(['a > b > c > d', 'b > a > c > d', 'c > a > b > d'], weights=[2, 3, 4],
+                                  base_rule=RulePlurality(), keep_profiles=False)
+    assert irv.winner_ == 'b'
+    # The last round (where 'b' is eliminated alone) was not necessary.
+    assert len(irv._rounds_computed_["eliminations"]) == 3
+    assert all(elimination.rule_.profile_original_ is None for elimination in irv.iter_eliminations())
+    assert irv.order_ == [{'b'}, {'c'}, {'a'}, {'d'}]
+    assert len(irv.eliminations_) == 4
+
+
+def test_stop_at_majority():
+    from whalrus import RuleIRV
+    ballots = ['a > b > c > d', 'b > a > c > d', 'c > a > b > d', 'd > c > b > a']
+    for weights in [[2, 3, 4, 1], [6, 1, 1, 1], [1, 1, 1, 6], [3, 3, 1, 1]]:
+        rule = RuleIRV(ballots, weights=weights, tie_break=Priority.ASCENDING)
+        rule_majority = RuleIRV(ballots, weights=weights, tie_break=Priority.ASCENDING, stop_at_majority=True)
+        assert rule_majority.winner_ == rule.winner_
+        assert len(rule_majority._rounds_computed_['eliminations']) <= len(rule.eliminations_)
+        # The remaining rounds are computed for the order, which does not depend on the option.
+        assert rule_majority.order_ == rule.order_
+        assert len(rule_majority.eliminations_) == len(rule.eliminations_)
@@ -0,0 +1,32 @@
+import itertools
+from whalrus.rule.RuleKemeny import RuleKemeny
+from whalrus.generators.GeneratorImpartialCulture import GeneratorImpartialCulture
+
+
+def brute_force(rule):
+    candidates = sorted(rule.candidates_)
+    matrix = rule.matrix_weighted_majority_.as_dict_
+    return max(sum(matrix[(c, d)] for i, c in enumerate(order) for d in order[i + 1:])
+               for order in itertools.permutations(candidates))
+
+
+def test_dynamic_programming_and_branch_and_bound():
+    profile = GeneratorImpartialCulture(candidates=['a', 'b', 'c', 'd', 'e', 'f'], seed=42)(7)
+    rule_dp = RuleKemeny(profile)
+    rule_bb = RuleKemeny(profile, max_candidates_dp=0)
+    assert rule_dp.kemeny_score_ == rule_bb.kemeny_score_ == brute_force(rule_dp)
+    assert rule_dp.order_ == rule_bb.order_
+    assert rule_bb.is_exact_
+
+
+def test_components():
+    rule = RuleKemeny(['a > b > c > d', 'b > c > a > d', 'c > a > b > d'])
+    assert rule.components_ == [{'a', 'b', 'c'}, {'d'}]
+    assert rule.order_ == [{'a', 'b', 'c'}, {'d'}]
+
+
+def test_budget():
+    profile = GeneratorImpartialCulture(candidates=['c%d' % i for i in range(12)], seed=42)(15)
+    rule = RuleKemeny(profile, max_candidates_dp=0, max_nodes=10)
+    assert not rule.is_exact_
+    assert rule.kemeny_score_ <= RuleKemeny(profile).kemeny_score_
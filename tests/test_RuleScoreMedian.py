@@ -0,0 +1,31 @@
+from fractions import Fraction
+from whalrus.ballot.BallotLevels import BallotLevels
+from whalrus.converter_ballot.ConverterBallotToLevels import ConverterBallotToLevels
+from whalrus.rule.RuleMajorityJudgment import RuleMajorityJudgment
+from whalrus.scale.ScaleFromList import ScaleFromList
+from whalrus.scale.ScaleRange import ScaleRange
+
+SCALE = ScaleFromList(['Bad', 'Fair', 'Good'])
+
+
+def test_bounded_and_unbounded_scales():
+    # A histogram (bounded scale) and a direct sort (unbounded scale) give the same results, with weights.
+    grades = [{'a': 2, 'b': 0}, {'a': 1, 'b': 2}, {'a': 1, 'b': 1}, {'a': 0}]
+    weights = [1, Fraction(5, 2), 1, 3]
+    bounded = RuleMajorityJudgment([BallotLevels(g, scale=ScaleRange(0, 2)) for g in grades], weights=weights,
+                                   scale=ScaleRange(0, 2))
+    unbounded = RuleMajorityJudgment([BallotLevels(g) for g in grades], weights=weights,
+                                     converter=ConverterBallotToLevels())
+    assert bounded.histograms_ == unbounded.histograms_ == {
+        'a': {0: 3, 1: Fraction(7, 2), 2: 1}, 'b': {0: 1, 1: 1, 2: Fraction(5, 2)}}
+    assert bounded.medians_ == unbounded.medians_ == {'a': 1, 'b': 2}
+    assert bounded.scores_ == unbounded.scores_
+
+
+def test_scale_from_list():
+    rule = RuleMajorityJudgment([{'a': 'Good', 'b': 'Fair'}, {'a': 'Bad', 'b': 'Fair'}, {'a': 'Good'}],
+                                weights=[1, 2, 1], scale=SCALE, default_median='Bad')
+    assert list(rule.histograms_['a']) == ['Bad', 'Good']
+    assert rule.medians_ == {'a': 'Bad', 'b': 'Fair'}
+    assert rule.scores_['a'] == ('Bad', Fraction(1, 2), 0)
+    assert rule.winner_ == 'b'
@@ -0,0 +1,39 @@
+from fractions import Fraction
+import pytest
+from whalrus.rule.RuleBorda import RuleBorda
+from whalrus.rule.RulePlurality import RulePlurality
+from whalrus.rule.RuleVeto import RuleVeto
+from whalrus.rule.RuleRangeVoting import RuleRangeVoting
+from whalrus.priority.Priority import Priority
+
+
+def test_margin_of_victory():
+    ballots = ['a > b > c', 'b > c > a']
+    assert RuleBorda(ballots, weights=[5, 3], tie_break=Priority.ASCENDING).margin_of_victory_ == 1
+    assert RuleVeto(ballots, weights=[5, 3], tie_break=Priority.ASCENDING).margin_of_victory_ == 2
+    # With an unambiguous priority, a tie is enough.
+    assert RulePlurality(['a', 'a', 'b'], candidates={'a', 'b'}).margin_of_victory_ == 1
+    assert RulePlurality(['a', 'a', 'b'], candidates={'a', 'b'}, tie_break=Priority.DESCENDING).margin_of_victory_ == 1
+    assert RulePlurality(['a', 'a', 'b'], candidates={'a', 'b'}, tie_break=Priority.ASCENDING).margin_of_victory_ == 1
+    assert RulePlurality(['a'] * 3 + ['b'], candidates={'a', 'b'},
+                         tie_break=Priority.ASCENDING).margin_of_victory_ == 2
+    # A part of a ballot can be changed. Changing a weight 3/4 leads to a tie, that 'a' wins, but any greater
+    # weight is enough.
+    assert RulePlurality(['a', 'b'], weights=[Fraction(5, 2), 1], candidates={'a', 'b'},
+                         tie_break=Priority.ASCENDING).margin_of_victory_ == Fraction(3, 4)
+    assert RulePlurality(['a'], candidates={'a'}).margin_of_victory_ is None
+
+
+def test_margin_of_victory_abstention():
+    with pytest.raises(NotImplementedError):
+        _ = RuleRangeVoting([{'a': 10}, {'a': 0, 'b': 5}], tie_break=Priority.ASCENDING).margin_of_victory_
+
+
+def test_scores_batch():
+    # Each row is the same as the scores with the corresponding weights, even with abstentions.
+    ballots = [{'a': 10, 'b': 5}, {'a': 0}, {'b': 10, 'c': 0}]
+    rule = RuleRangeVoting(ballots, candidates={'a', 'b', 'c'}, default_average=2)
+    weights = [[1, 2, 3], [0, 1, 0], [Fraction(1, 2), 0, 4]]
+    for row, batch_scores in zip(weights, rule.scores_batch(weights).tolist()):
+        scores = RuleRangeVoting(ballots, weights=row, candidates={'a', 'b', 'c'}, default_average=2).scores_
+        assert batch_scores == [float(scores[c]) for c in ['a', 'b', 'c']]
@@ -0,0 +1,46 @@
+import pytest
+from whalrus.generators.GeneratorMallows import GeneratorMallows
+from whalrus.matrix.MatrixMajority import MatrixMajority
+from whalrus.priority.Priority import Priority
+from whalrus.rule.RuleCondorcet import RuleCondorcet
+from whalrus.rule.RuleCopeland import RuleCopeland
+from whalrus.rule.RuleIRV import RuleIRV
+from whalrus.simulate.Simulation import Simulation
+
+
+def make_simulation(matrix=None, **kwargs):
+    return Simulation(
+        GeneratorMallows(['a', 'b', 'c', 'd'], phi=.8, weighted=True),
+        rules={'Copeland': RuleCopeland(matrix=matrix, tie_break=Priority.ASCENDING),
+               'Condorcet': RuleCondorcet(matrix_majority=matrix, tie_break=Priority.ASCENDING),
+               'IRV': RuleIRV(tie_break=Priority.ASCENDING)},
+        **{'n_voters': 15, 'batch_size': 10, 'seed': 42, **kwargs})
+
+
+def test_shared_matrix():
+    matrix = MatrixMajority()
+    assert make_simulation(matrix, matrix_majority=matrix)(50).counts_ == make_simulation()(50).counts_
+
+
+def test_checkpoint(tmp_path):
+    path = str(tmp_path / 'checkpoint.json')
+    reference = make_simulation()(60).counts_
+    make_simulation(checkpoint=path)(30)
+    simulation = make_simulation(checkpoint=path)(60)
+    assert simulation.batches_ == set(range(6))
+    assert simulation.counts_ == reference
+    assert simulation.condorcet_efficiency_['Condorcet'] == 1
+    with pytest.raises(ValueError):
+        make_simulation(checkpoint=path, batch_size=20)(60)
+
+
+def test_process_pool():
+    assert make_simulation(n_jobs=2)(40).counts_ == make_simulation()(40).counts_
+
+
+def test_matrix_greater():
+    # The Condorcet winners are detected with the value of the matrix for a victory, whatever it is.
+    counts = make_simulation()(30).counts_
+    assert counts['condorcet'] > 0
+    matrix = MatrixMajority(greater=2, lower=-2, equal=0)
+    assert make_simulation(matrix_majority=matrix)(30).counts_ == counts
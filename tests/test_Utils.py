@@ -1,6 +1,8 @@
 import pytest
 from pyparsing import ParseException
-from whalrus.utils.Utils import parse_weak_order, set_to_str, dict_to_str
+from whalrus.converter_ballot.ConverterBallotToPlurality import ConverterBallotToPlurality
+from whalrus.rule.RuleCopeland import RuleCopeland
+from whalrus.utils.Utils import parse_weak_order, set_to_str, dict_to_str, share_matrices
 
 
 def test_parse_weak_order():
@@ -18,3 +20,27 @@ def test_set_to_str():
 def test_dict_to_str():
     s = dict_to_str({'a': 1, 51: 0})
     assert s == "{'a': 1, 51: 0}" or s == "{51: 0, 'a': 1}"
+
+
+def test_clone():
+    from whalrus import RuleBlack
+    rule = RuleBlack(['a > b > c', 'b > c > a'], weights=[3, 2])
+    assert rule.winner_ == 'a'
+    clone = rule.clone()
+    assert clone.profile_converted_ is None
+    assert clone.rules[0] is clone.rule_condorcet
+    assert clone.rules[0] is not rule.rules[0]
+    assert clone(['b > a > c']).winner_ == 'b'
+    assert rule.winner_ == 'a'
+
+
+def test_share_matrices_with_other_converter():
+    # A rule whose converter changes the ballots does not get the matrix of another rule.
+    ballots = ['a > b > c', 'b > c > a', 'b > c > a', 'c > a > b']
+    shared = dict()
+    share_matrices(RuleCopeland(ballots), shared)
+    rule = RuleCopeland(ballots, converter=ConverterBallotToPlurality())
+    share_matrices(rule, shared)
+    assert len(shared) == 2
+    assert rule.matrix_.as_array_.tolist() == RuleCopeland(
+        ballots, converter=ConverterBallotToPlurality()).matrix_.as_array_.tolist()
@@ -0,0 +1,99 @@
+import json
+from click.testing import CliRunner
+from whalrus import profiling
+from whalrus.cli import main, read_election, evaluate
+
+PREFLIB_LEGACY = """3
+1,Alice
+2,Bob
+3,Carol
+4,4,3
+2,1,2,3
+1,2,{1,3}
+1,3
+"""
+
+PREFLIB = """# FILE NAME: example.toi
+# DATA TYPE: toi
+# NUMBER ALTERNATIVES: 3
+# ALTERNATIVE NAME 1: Alice
+# ALTERNATIVE NAME 2: Bob
+# ALTERNATIVE NAME 3: Carol
+2: 1,2,3
+1: 2,{1,3}
+1: 3
+"""
+
+
+def test_preflib_formats():
+    for text in [PREFLIB_LEGACY, PREFLIB]:
+        ballots, weights, candidates = read_election(text.splitlines(), fmt='preflib')
+        assert candidates == {'Alice', 'Bob', 'Carol'}
+        assert [str(ballot) for ballot in ballots] == [
+            'Alice > Bob > Carol', 'Bob > Alice ~ Carol', 'Carol (unordered: Alice, Bob)']
+        assert weights == [2, 1, 1]
+
+
+def test_identical_ballots_are_counted_once():
+    lines = (['a > b > c', 'b > c > a'] * 1000)
+    ballots, weights, candidates = read_election(iter(lines))
+    assert ballots == ['a > b > c', 'b > c > a']
+    assert weights == [1000, 1000]
+    assert candidates is None
+
+
+def test_csv_grades():
+    ballots, weights, candidates = read_election(['a,b,c', '10,5,', '0,10,5', '10,5,'], fmt='csv-grades')
+    assert weights == [2, 1]
+    assert dict(ballots[0].as_dict) == {'a': 10, 'b': 5}
+    assert ballots[0].candidates == {'a', 'b', 'c'}
+    assert evaluate(ballots, weights, candidates, ['RangeVoting'])[0]['winner'] == 'a'
+
+
+def test_matrices_are_shared():
+    with profiling.record() as stats:
+        results = evaluate(['a > b > c', 'b > a > c'], [2, 1], None, ['Copeland', 'Condorcet', 'Maximin', 'Kemeny'])
+    assert [result['winner'] for result in results] == ['a', 'a', 'a', 'a']
+    assert stats[('MatrixMajority', '__call__')]['calls'] == 1
+    assert stats[('MatrixWeightedMajority', '__call__')]['calls'] == 2
+
+
+def test_errors_are_reported():
+    results = evaluate(['a > b', 'b > a'], [1, 1], None, ['Plurality', 'Borda'], tie_break='unambiguous')
+    assert results[0] == {'rule': 'Plurality', 'error': "ValueError: Cannot sort {'a', 'b'} with priority set to "
+                                                        "Unambiguous."}
+    assert set(results[1]) == {'rule', 'error'}
+
+
+def test_files_in_parallel(tmp_path):
+    paths = []
+    for i, text in enumerate([PREFLIB, 'a > b\nb > a\nb > a\n', PREFLIB_LEGACY]):
+        path = tmp_path / ('election%s.%s' % (i, 'toi' if i != 1 else 'txt'))
+        path.write_text(text)
+        paths.append(str(path))
+    args = ['--rule', 'borda', '--rule', 'Schulze'] + paths
+    result = CliRunner().invoke(main, args + ['--jobs', '2'])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [(record['file'], record['rule']) for record in records] == [
+        (path, rule) for path in paths for rule in ['Borda', 'Schulze']]
+    assert [record['winner'] for record in records] == ['Alice', 'Alice', 'b', 'b', 'Alice', 'Alice']
+    assert CliRunner().invoke(main, args).output == result.output
+
+
+def test_csv_output(tmp_path):
+    path = tmp_path / 'ranks.csv'
+    path.write_text('a,b,c\n1,2,3\n2,1,3\n1,3,2\n')
+    result = CliRunner().invoke(main, ['-f', 'csv-ranks', '-F', 'csv', '-r', 'Borda', str(path)])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        'file,rule,candidate,rank,score,winner,error',
+        '%s,Borda,a,1,1.6666666666666667,1,' % path,
+        '%s,Borda,b,2,1,0,' % path,
+        '%s,Borda,c,3,0.3333333333333333,0,' % path]
+
+
+def test_exit_code_on_error():
+    result = CliRunner().invoke(main, ['-t', 'unambiguous'], input='a > b\nb > a\n')
+    assert result.exit_code == 1
+    assert 'error' in json.loads(result.output)
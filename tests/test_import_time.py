@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import pytest
+import whalrus
+
+# Budget for ``import whalrus``, in microseconds. It is generous, so that the test is not flaky on a slow machine: with
+# eager imports, the package took about 250 ms because it loaded all the modules, NumPy and pyparsing.
+IMPORT_BUDGET = 100000
+
+
+def import_times(statement: str) -> dict:
+    # For each imported module, its cumulative import time in microseconds, as measured by ``python -X importtime``.
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('package'):
+            continue
+        _, cumulative, module = line.split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_whalrus_is_cheap():
+    times = import_times('import whalrus')
+    assert times['whalrus'] < IMPORT_BUDGET
+    assert 'numpy' not in times
+    assert 'pyparsing' not in times
+    assert not [module for module in times if module.startswith('whalrus.')]
+
+
+def test_score_rules_do_not_need_numpy():
+    times = import_times('import whalrus; whalrus.RulePlurality(["a", "b", "a"]).winner_; whalrus.RuleBorda')
+    assert 'whalrus.rule.RulePlurality' in times
+    assert 'numpy' not in times
+
+
+def test_lazy_attributes():
+    assert whalrus.RuleBorda.__name__ == 'RuleBorda'
+    assert whalrus.parse_weak_order('a > b ~ c') == [{'a'}, {'b', 'c'}]
+    assert 'RuleKemeny' in dir(whalrus)
+    assert set(whalrus.__all__) <= set(dir(whalrus))
+    with pytest.raises(AttributeError):
+        whalrus.RuleThatDoesNotExist
@@ -0,0 +1,23 @@
+from whalrus import memory
+from whalrus.profile.Profile import Profile
+from whalrus.rule.RuleMaximin import RuleMaximin
+from whalrus.rule.RuleBorda import RuleBorda
+
+
+def test_report_matrices():
+    rule = RuleMaximin(['a > b > c', 'b > a > c', 'c > a > b'])
+    _ = rule.scores_
+    sizes = memory.report(rule)
+    assert sizes['matrices'] > 0
+    assert sizes['ballots'] > 0
+    assert sizes['total'] == sum(size for category, size in sizes.items() if category != 'total')
+
+
+def test_release_live_profile():
+    profile = Profile(['a > b > c', 'b > a > c'])
+    rule = RuleBorda(profile).release(keep=('order_', 'candidates_'))
+    assert rule.candidates_ == {'a', 'b', 'c'}
+    # The rule does not follow the profile anymore.
+    profile.append('c > b > a')
+    assert rule.order_ == [{'a', 'b'}, {'c'}]
+    assert rule.profile_original_ is None
@@ -0,0 +1,63 @@
+import threading
+from whalrus import profiling
+from whalrus.rule.Rule import Rule
+from whalrus.rule.RuleBorda import RuleBorda
+from whalrus.rule.RuleCopeland import RuleCopeland
+from whalrus.priority.Priority import Priority
+
+
+def test_uninstalled_outside_of_record():
+    winner = Rule.__dict__['winner_']
+    call = Rule.__dict__['__call__']
+    with profiling.record():
+        assert Rule.__dict__['winner_'] is not winner
+        assert Rule.__dict__['__call__'] is not call
+    assert Rule.__dict__['winner_'] is winner
+    assert Rule.__dict__['__call__'] is call
+
+
+def test_nested_records():
+    with profiling.record() as outer:
+        rule = RuleBorda(['a > b > c', 'b > a > c'], tie_break=Priority.ASCENDING)
+        with profiling.record() as inner:
+            _ = rule.winner_
+        _ = rule.winner_
+    assert ('RuleBorda', '__call__') in outer
+    assert ('RuleBorda', '__call__') not in inner
+    assert inner[('RuleBorda', 'winner_')] == {'calls': 1, 'hits': 0, 'time': inner[('RuleBorda', 'winner_')]['time']}
+    assert outer[('RuleBorda', 'winner_')]['hits'] == 1
+    # The tie between `a` and `b` is broken by the priority.
+    assert outer[('PriorityAscending', 'sort')]['calls'] >= 1
+    assert rule.profile_stats_()[('RuleBorda', 'winner_')]['calls'] == 1
+    assert 'RuleBorda.winner_' in outer.report()
+
+
+def test_no_stats_without_record():
+    rule = RuleBorda(['a > b > c'])
+    _ = rule.winner_
+    assert rule.profile_stats_() == {}
+
+
+def test_other_threads_are_not_recorded():
+    stop = threading.Event()
+    started = threading.Event()
+
+    def work():
+        while not stop.is_set():
+            _ = RuleBorda(['a > b > c', 'b > a > c'], tie_break=Priority.ASCENDING).winner_
+            started.set()
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    try:
+        assert started.wait(timeout=10)
+        for _ in range(20):
+            with profiling.record() as stats:
+                rule = RuleCopeland(['a > b > c', 'b > a > c', 'a > c > b'])
+                _ = rule.winner_
+            assert ('RuleCopeland', 'winner_') in stats
+            assert not any(class_name.startswith(('RuleBorda', 'Scorer')) for class_name, _ in stats)
+            assert not any(class_name.startswith(('RuleBorda', 'Scorer')) for class_name, _ in rule.profile_stats_())
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from whalrus import profiling
+from whalrus.priority.Priority import Priority
+from whalrus.rule.RuleBorda import RuleBorda
+from whalrus.rule.RuleCopeland import RuleCopeland
+from whalrus.server import TallyServer
+
+
+async def request(reader, writer, method, path, body=b'', headers=''):
+    writer.write(('%s %s HTTP/1.1\r\nHost: localhost\r\nContent-Length: %s\r\n%s\r\n'
+                  % (method, path, len(body), headers)).encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        response_headers[name.lower()] = value.strip()
+    content = json.loads(await reader.readexactly(int(response_headers['content-length'])))
+    return status, content, response_headers
+
+
+def make_server(**kwargs):
+    return TallyServer({'Borda': RuleBorda(tie_break=Priority.ASCENDING),
+                        'Copeland': RuleCopeland(tie_break=Priority.ASCENDING)}, **kwargs)
+
+
+def test_http():
+    async def scenario():
+        server = make_server(batch_delay=.01)
+        await server.start(port=0)
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port_)
+        # Several requests on the same connection.
+        assert (await request(reader, writer, 'POST', '/ballots', b'a > b > c\nb > a > c\n\na > b > c\n'))[:2] == (
+            202, {'accepted': 3})
+        body = json.dumps(['c > b > a', {'a': 1, 'b': 2, 'c': 3}]).encode()
+        assert (await request(reader, writer, 'POST', '/ballots', body, 'Content-Type: application/json\r\n'))[0] == 202
+        assert (await request(reader, writer, 'POST', '/ballots', b'["a > b", '))[0] == 400
+        assert (await request(reader, writer, 'GET', '/ballots'))[0] == 405
+        assert (await request(reader, writer, 'GET', '/nowhere'))[0] == 404
+        while server.metrics()['ballots_tallied'] < 5:
+            await asyncio.sleep(.01)
+        status, results, _ = await request(reader, writer, 'GET', '/results')
+        assert status == 200
+        assert results['ballots'] == 5
+        assert results['rules']['Borda']['winner'] == 'b'
+        assert results['rules']['Copeland']['order'] == [['b'], ['a'], ['c']]
+        status, metrics, _ = await request(reader, writer, 'GET', '/metrics')
+        assert metrics['ballots_received'] == metrics['ballots_tallied'] == 5
+        assert metrics['distinct_ballots'] == 4
+        assert metrics['latency']['POST /ballots']['count'] == 3
+        assert metrics['latency']['batch']['count'] == metrics['batches']
+        writer.close()
+        await server.stop()
+    asyncio.run(scenario())
+
+
+def test_back_pressure():
+    async def scenario():
+        server = make_server(max_pending=1, pending_timeout=.01)
+        # The ingestion is paused, so that the queue fills up.
+        server._ingest = lambda: asyncio.sleep(3600)
+        await server.start(port=0)
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port_)
+        assert (await request(reader, writer, 'POST', '/ballots', b'a > b\n'))[0] == 202
+        status, content, headers = await request(reader, writer, 'POST', '/ballots', b'b > a\n')
+        assert status == 503
+        assert headers['retry-after'] == '1'
+        assert server.metrics()['requests_rejected'] == 1
+        assert server.metrics()['pending_requests'] == 1
+        writer.close()
+        await server.stop()
+        # The pending ballots are added when the server stops.
+        assert server.results()['ballots'] == 1
+    asyncio.run(scenario())
+
+
+def test_batches_are_patched():
+    server = make_server(candidates={'a', 'b', 'c'})
+    with profiling.record() as stats:
+        for _ in range(3):
+            server.add_ballots(['a > b > c', 'b > c > a', 'a > b > c'])
+            assert server.results()['rules']['Borda']['winner'] == 'a'
+            assert server.results() is server.results()
+    # The tally of Borda is computed once, then patched with each batch.
+    assert stats[('RuleBorda', '_gross_scores_and_weights_')]['calls'] == 1
+    assert len(server.profile_) == 2
+    assert server.profile_.weights == [6, 3] or server.profile_.weights == [3, 6]
@@ -0,0 +1,79 @@
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from whalrus.ballot.BallotOrder import BallotOrder
+from whalrus.matrix.MatrixMajority import MatrixMajority
+from whalrus.matrix.MatrixRankedPairs import MatrixRankedPairs
+from whalrus.matrix.MatrixWeightedMajority import MatrixWeightedMajority
+from whalrus.priority.Priority import Priority
+from whalrus.profile.Profile import Profile
+from whalrus.rule.RuleBorda import RuleBorda
+from whalrus.rule.RuleBucklinByRounds import RuleBucklinByRounds
+from whalrus.rule.RuleBucklinInstant import RuleBucklinInstant
+from whalrus.rule.RuleCopeland import RuleCopeland
+from whalrus.rule.RuleIRV import RuleIRV
+from whalrus.rule.RuleMaximin import RuleMaximin
+from whalrus.rule.RuleRankedPairs import RuleRankedPairs
+from whalrus.rule.RuleSchulze import RuleSchulze
+from whalrus.scorer.ScorerBucklin import ScorerBucklin
+
+
+@pytest.fixture
+def frequent_switches():
+    # Switch between threads as often as possible, so that the interleavings are varied.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_concurrent_rules(frequent_switches):
+    generator = random.Random(42)
+    candidates = ['a', 'b', 'c', 'd', 'e']
+    profiles = []
+    for _ in range(4):
+        ballots = []
+        for _ in range(60):
+            generator.shuffle(candidates)
+            ballots.append(BallotOrder(list(candidates)))
+        profiles.append(Profile(ballots, weights=[generator.randint(1, 3) for _ in ballots]).freeze())
+    # These parameters are shared by all the rules.
+    scorer = ScorerBucklin()
+    matrix_weighted_majority = MatrixWeightedMajority()
+    matrix_majority = MatrixMajority(matrix_weighted_majority=matrix_weighted_majority)
+    matrix_ranked_pairs = MatrixRankedPairs(matrix_weighted_majority=matrix_weighted_majority,
+                                            tie_break=Priority.ASCENDING)
+    makers = [
+        lambda: RuleBorda(tie_break=Priority.ASCENDING),
+        lambda: RuleBucklinByRounds(scorer=scorer, tie_break=Priority.ASCENDING),
+        lambda: RuleBucklinInstant(scorer=scorer, tie_break=Priority.ASCENDING),
+        lambda: RuleCopeland(matrix=matrix_majority, tie_break=Priority.ASCENDING),
+        lambda: RuleMaximin(matrix_weighted_majority=matrix_weighted_majority, tie_break=Priority.ASCENDING),
+        lambda: RuleRankedPairs(matrix=matrix_ranked_pairs, tie_break=Priority.ASCENDING),
+        lambda: RuleSchulze(tie_break=Priority.ASCENDING),
+        lambda: RuleIRV(tie_break=Priority.ASCENDING),
+    ]
+    tasks = [(make, profile) for make in makers for profile in profiles] * 5
+
+    def evaluate(task):
+        make, profile = task
+        rule = make()(profile)
+        return rule.order_, getattr(rule, 'scores_', None)
+
+    serial = [evaluate(task) for task in tasks]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        concurrent = list(executor.map(evaluate, tasks))
+    assert concurrent == serial
+    assert scorer.k == 1 and scorer.ballot_ is None
+    assert matrix_weighted_majority.profile_original_ is None
+    assert all(not profile._subscribers for profile in profiles)
+
+
+def test_concurrent_cached_property(frequent_switches):
+    # Several threads read the same cached properties of the same rule: they all get the same objects.
+    profile = Profile(['a > b > c', 'b > c > a', 'c > a > b', 'a > c > b'] * 50).freeze()
+    rule = RuleCopeland(profile, tie_break=Priority.ASCENDING)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: (rule.scores_, rule.matrix_majority_), range(32)))
+    assert all(scores is rule.scores_ and matrix is rule.matrix_majority_ for scores, matrix in results)
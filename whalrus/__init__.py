@@ -1,112 +1,180 @@
 # -*- coding: utf-8 -*-
 
-"""Top-level package for Whalrus."""
+"""Top-level package for Whalrus.
+
+The classes and functions are imported on first access (:pep:`562`), so that ``import whalrus`` stays cheap and does
+not load NumPy or pyparsing: ``whalrus.RuleBorda`` only imports the modules needed by :class:`RuleBorda`.
+"""
 
 __author__ = """Sylvain Bouveret, Yann Chevaleyre and François Durand"""
 __email__ = 'fradurand@gmail.com'
 __version__ = '0.4.1'
 
-# Utils
-from .utils.Utils import cached_property, DeleteCacheMixin, parse_weak_order, set_to_list, set_to_str, dict_to_items, \
-    dict_to_str, NiceSet, NiceDict, my_division, convert_number, take_closest
-
-# Scales
-from .scale.Scale import Scale
-from .scale.ScaleFromList import ScaleFromList
-from .scale.ScaleFromSet import ScaleFromSet
-from .scale.ScaleRange import ScaleRange
-from .scale.ScaleInterval import ScaleInterval
-
-# Priority
-from .priority.Priority import Priority
-from .priority.Priority import PriorityUnambiguous
-from .priority.Priority import PriorityAbstain
-from .priority.Priority import PriorityAscending
-from .priority.Priority import PriorityDescending
-from .priority.Priority import PriorityRandom
-
-# Ballots
-from .ballot.Ballot import Ballot
-from .ballot.BallotOrder import BallotOrder
-from .ballot.BallotLevels import BallotLevels
-from .ballot.BallotOneName import BallotOneName
-from .ballot.BallotPlurality import BallotPlurality
-from .ballot.BallotVeto import BallotVeto
-
-# Ballot Converters
-from .converter_ballot.ConverterBallot import ConverterBallot
-from .converter_ballot.ConverterBallotGeneral import ConverterBallotGeneral
-from .converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
-from .converter_ballot.ConverterBallotToStrictOrder import ConverterBallotToStrictOrder
-from .converter_ballot.ConverterBallotToPlurality import ConverterBallotToPlurality
-from .converter_ballot.ConverterBallotToVeto import ConverterBallotToVeto
-from .converter_ballot.ConverterBallotToLevelsInterval import ConverterBallotToLevelsInterval
-from .converter_ballot.ConverterBallotToLevelsRange import ConverterBallotToLevelsRange
-from .converter_ballot.ConverterBallotToLevelsListNumeric import ConverterBallotToLevelsListNumeric
-from .converter_ballot.ConverterBallotToLevelsListNonNumeric import ConverterBallotToLevelsListNonNumeric
-from .converter_ballot.ConverterBallotToGrades import ConverterBallotToGrades
-from .converter_ballot.ConverterBallotToLevels import ConverterBallotToLevels
-
-# Profile
-from .profile.Profile import Profile
-
-# Matrix
-from .matrix.Matrix import Matrix
-from .matrix.MatrixWeightedMajority import MatrixWeightedMajority
-from .matrix.MatrixMajority import MatrixMajority
-from .matrix.MatrixRankedPairs import MatrixRankedPairs
-from .matrix.MatrixSchulze import MatrixSchulze
-
-# Elimination algorithms
-from .elimination.Elimination import Elimination
-from .elimination.EliminationLast import EliminationLast
-from .elimination.EliminationBelowAverage import EliminationBelowAverage
-
-# Scorers
-from .scorer.Scorer import Scorer
-from .scorer.ScorerBorda import ScorerBorda
-from .scorer.ScorerBucklin import ScorerBucklin
-from .scorer.ScorerLevels import ScorerLevels
-from .scorer.ScorerPlurality import ScorerPlurality
-from .scorer.ScorerPositional import ScorerPositional
-from .scorer.ScorerVeto import ScorerVeto
-
-# Voting Rules 1: General
-from .rule.Rule import Rule
-from .rule.RuleScore import RuleScore
-from .rule.RuleScoreNum import RuleScoreNum
-from .rule.RuleScoreNumAverage import RuleScoreNumAverage
-from .rule.RuleScoreNumRowSum import RuleScoreNumRowSum
-from .rule.RuleScorePositional import RuleScorePositional
-from .rule.RuleIteratedElimination import RuleIteratedElimination
-from .rule.RuleSequentialElimination import RuleSequentialElimination
-from .rule.RuleSequentialTieBreak import RuleSequentialTieBreak
-
-# Voting Rules 2: Particular
-from .rule.RuleApproval import RuleApproval
-from .rule.RuleBaldwin import RuleBaldwin
-from .rule.RuleBlack import RuleBlack
-from .rule.RuleBorda import RuleBorda
-from .rule.RuleBucklinByRounds import RuleBucklinByRounds
-from .rule.RuleBucklinInstant import RuleBucklinInstant
-from .rule.RuleCondorcet import RuleCondorcet
-from .rule.RuleCoombs import RuleCoombs
-from .rule.RuleCopeland import RuleCopeland
-from .rule.RuleIRV import RuleIRV
-from .rule.RuleKApproval import RuleKApproval
-from .rule.RuleKimRoush import RuleKimRoush
-from .rule.RuleMajorityJudgment import RuleMajorityJudgment
-from .rule.RuleMaximin import RuleMaximin
-from .rule.RuleNanson import RuleNanson
-from .rule.RulePlurality import RulePlurality
-from .rule.RuleRangeVoting import RuleRangeVoting
-from .rule.RuleRankedPairs import RuleRankedPairs
-from .rule.RuleSchulze import RuleSchulze
-from .rule.RuleSimplifiedDodgson import RuleSimplifiedDodgson
-from .rule.RuleTwoRound import RuleTwoRound
-from .rule.RuleVeto import RuleVeto
-
-# Examples of documentation
-from .SubPackage1.MyClass1 import MyClass1
-from .SubPackage2.MyClass2 import MyClass2
-from .SubPackage2.MyClass3 import MyClass3
+# For each public name, the module where it is defined.
+_lazy_imports = {
+    # Utils
+    'cached_property': '.utils.Utils',
+    'DeleteCacheMixin': '.utils.Utils',
+    'CloneMixin': '.utils.Utils',
+    'parameters_key': '.utils.Utils',
+    'parse_weak_order': '.utils.Utils',
+    'share_matrices': '.utils.Utils',
+    'shared_matrix_key': '.utils.Utils',
+    'set_to_list': '.utils.Utils',
+    'set_to_str': '.utils.Utils',
+    'dict_to_items': '.utils.Utils',
+    'dict_to_str': '.utils.Utils',
+    'NiceSet': '.utils.Utils',
+    'NiceDict': '.utils.Utils',
+    'NiceMatrixView': '.utils.Utils',
+    'my_division': '.utils.Utils',
+    'convert_number': '.utils.Utils',
+    'take_closest': '.utils.Utils',
+    'wilson_interval': '.utils.Utils',
+    'strongly_connected_components': '.utils.Utils',
+
+    # Scales
+    'Scale': '.scale.Scale',
+    'ScaleFromList': '.scale.ScaleFromList',
+    'ScaleFromSet': '.scale.ScaleFromSet',
+    'ScaleRange': '.scale.ScaleRange',
+    'ScaleInterval': '.scale.ScaleInterval',
+
+    # Priority
+    'Priority': '.priority.Priority',
+    'PriorityUnambiguous': '.priority.Priority',
+    'PriorityAbstain': '.priority.Priority',
+    'PriorityAscending': '.priority.Priority',
+    'PriorityDescending': '.priority.Priority',
+    'PriorityRandom': '.priority.Priority',
+
+    # Ballots
+    'Ballot': '.ballot.Ballot',
+    'BallotOrder': '.ballot.BallotOrder',
+    'BallotLevels': '.ballot.BallotLevels',
+    'BallotOneName': '.ballot.BallotOneName',
+    'BallotPlurality': '.ballot.BallotPlurality',
+    'BallotVeto': '.ballot.BallotVeto',
+
+    # Ballot Converters
+    'ConverterBallot': '.converter_ballot.ConverterBallot',
+    'ConverterBallotGeneral': '.converter_ballot.ConverterBallotGeneral',
+    'ConverterBallotToOrder': '.converter_ballot.ConverterBallotToOrder',
+    'ConverterBallotToStrictOrder': '.converter_ballot.ConverterBallotToStrictOrder',
+    'ConverterBallotToPlurality': '.converter_ballot.ConverterBallotToPlurality',
+    'ConverterBallotToVeto': '.converter_ballot.ConverterBallotToVeto',
+    'ConverterBallotToLevelsInterval': '.converter_ballot.ConverterBallotToLevelsInterval',
+    'ConverterBallotToLevelsRange': '.converter_ballot.ConverterBallotToLevelsRange',
+    'ConverterBallotToLevelsListNumeric': '.converter_ballot.ConverterBallotToLevelsListNumeric',
+    'ConverterBallotToLevelsListNonNumeric': '.converter_ballot.ConverterBallotToLevelsListNonNumeric',
+    'ConverterBallotToGrades': '.converter_ballot.ConverterBallotToGrades',
+    'ConverterBallotToLevels': '.converter_ballot.ConverterBallotToLevels',
+
+    # Profile
+    'Profile': '.profile.Profile',
+    'ProfileSubscriberMixin': '.profile.ProfileSubscriberMixin',
+
+    # Matrix
+    'Matrix': '.matrix.Matrix',
+    'MatrixWeightedMajority': '.matrix.MatrixWeightedMajority',
+    'MatrixMajority': '.matrix.MatrixMajority',
+    'MatrixRankedPairs': '.matrix.MatrixRankedPairs',
+    'MatrixSchulze': '.matrix.MatrixSchulze',
+
+    # Profile generators
+    'Generator': '.generators.Generator',
+    'GeneratorImpartialCulture': '.generators.GeneratorImpartialCulture',
+    'GeneratorUrn': '.generators.GeneratorUrn',
+    'GeneratorImpartialAnonymousCulture': '.generators.GeneratorImpartialAnonymousCulture',
+    'GeneratorMallows': '.generators.GeneratorMallows',
+    'GeneratorSinglePeaked': '.generators.GeneratorSinglePeaked',
+    'GeneratorEuclidean': '.generators.GeneratorEuclidean',
+
+    # Elimination algorithms
+    'Elimination': '.elimination.Elimination',
+    'EliminationLast': '.elimination.EliminationLast',
+    'EliminationBelowAverage': '.elimination.EliminationBelowAverage',
+
+    # Scorers
+    'Scorer': '.scorer.Scorer',
+    'ScorerBorda': '.scorer.ScorerBorda',
+    'ScorerBucklin': '.scorer.ScorerBucklin',
+    'ScorerLevels': '.scorer.ScorerLevels',
+    'ScorerPlurality': '.scorer.ScorerPlurality',
+    'ScorerPositional': '.scorer.ScorerPositional',
+    'ScorerVeto': '.scorer.ScorerVeto',
+
+    # Voting Rules 1: General
+    'Rule': '.rule.Rule',
+    'RuleScore': '.rule.RuleScore',
+    'RuleScoreNum': '.rule.RuleScoreNum',
+    'RuleScoreNumAverage': '.rule.RuleScoreNumAverage',
+    'RuleScoreNumRowSum': '.rule.RuleScoreNumRowSum',
+    'RuleScoreMedian': '.rule.RuleScoreMedian',
+    'RuleScorePositional': '.rule.RuleScorePositional',
+    'RuleIteratedElimination': '.rule.RuleIteratedElimination',
+    'RuleSequentialElimination': '.rule.RuleSequentialElimination',
+    'RuleSequentialTieBreak': '.rule.RuleSequentialTieBreak',
+
+    # Voting Rules 2: Particular
+    'RuleApproval': '.rule.RuleApproval',
+    'RuleBaldwin': '.rule.RuleBaldwin',
+    'RuleBlack': '.rule.RuleBlack',
+    'RuleBorda': '.rule.RuleBorda',
+    'RuleBucklinByRounds': '.rule.RuleBucklinByRounds',
+    'RuleBucklinInstant': '.rule.RuleBucklinInstant',
+    'RuleCondorcet': '.rule.RuleCondorcet',
+    'RuleCoombs': '.rule.RuleCoombs',
+    'RuleCopeland': '.rule.RuleCopeland',
+    'RuleIRV': '.rule.RuleIRV',
+    'RuleKApproval': '.rule.RuleKApproval',
+    'RuleKemeny': '.rule.RuleKemeny',
+    'RuleKimRoush': '.rule.RuleKimRoush',
+    'RuleMajorityJudgment': '.rule.RuleMajorityJudgment',
+    'RuleMaximin': '.rule.RuleMaximin',
+    'RuleNanson': '.rule.RuleNanson',
+    'RulePlurality': '.rule.RulePlurality',
+    'RuleRangeVoting': '.rule.RuleRangeVoting',
+    'RuleRankedPairs': '.rule.RuleRankedPairs',
+    'RuleSchulze': '.rule.RuleSchulze',
+    'RuleSimplifiedDodgson': '.rule.RuleSimplifiedDodgson',
+    'RuleTwoRound': '.rule.RuleTwoRound',
+    'RuleVeto': '.rule.RuleVeto',
+
+    # Manipulation
+    'Manipulation': '.manipulation.Manipulation',
+    'ManipulationPositional': '.manipulation.ManipulationPositional',
+    'ManipulationIRV': '.manipulation.ManipulationIRV',
+    'ManipulationTwoRound': '.manipulation.ManipulationTwoRound',
+
+    # Simulations
+    'Simulation': '.simulate.Simulation',
+
+    # Cache
+    'ResultCache': '.cache.ResultCache',
+
+    # Resampling
+    'Bootstrap': '.resampling.Bootstrap',
+
+    # Examples of documentation
+    'MyClass1': '.SubPackage1.MyClass1',
+    'MyClass2': '.SubPackage2.MyClass2',
+    'MyClass3': '.SubPackage2.MyClass3',
+}
+
+__all__ = list(_lazy_imports)
+
+
+def __getattr__(name):
+    try:
+        module_name = _lazy_imports[name]
+    except KeyError:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name)) from None
+    # Unlike ``importlib.import_module``, the built-in ``__import__`` is reported by ``python -X importtime``.
+    value = getattr(__import__(module_name[1:], globals(), None, [name], 1), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_imports))
@@ -99,3 +99,9 @@ class Ballot:
         :meth:`BallotOrder.restrict`.
         """
         raise NotImplementedError
+
+    def __getstate__(self) -> dict:
+        # The cached properties are not pickled (nor copied): they are computed again when needed.
+        state = self.__dict__.copy()
+        state.pop('_cached_properties', None)
+        return state
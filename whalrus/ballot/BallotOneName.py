@@ -97,7 +97,7 @@ class BallotOneName(Ballot):
         return self.candidates == other.candidates and self.candidate == other.candidate
 
     def __hash__(self) -> int:
-        return hash((self.candidates, self.candidate))
+        return hash((frozenset(self.candidates), self.candidate))
 
     # Representation
     # ==============
@@ -185,7 +185,7 @@ class BallotOrder(Ballot):
         return self.candidates == other.candidates and self._internal_representation == other._internal_representation
 
     def __hash__(self) -> int:
-        return hash((self.candidates, self._internal_representation))
+        return hash((frozenset(self.candidates), tuple(frozenset(s) for s in self.as_weak_order)))
 
     # Representation
     # ==============
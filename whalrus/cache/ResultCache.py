@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from numbers import Number
+from whalrus.ballot.Ballot import Ballot
+from whalrus.profile.Profile import Profile
+from whalrus.rule.Rule import Rule
+from whalrus.utils.Utils import convert_number
+
+
+def _canonical(x: object, ancestors: frozenset = frozenset()) -> object:
+    """
+    A canonical representation of an object.
+
+    :param x: an object, typically a rule or one of its parameters.
+    :param ancestors: the ids of the objects that contain `x` (used to detect cycles).
+    :return: a representation of `x` that can be written as JSON and that does not depend on the process. A string is
+        represented by itself, and any other object by a list whose first element is a tag. The objects such as rules,
+        converters, scorers, scales or matrices are represented by their class and their parameters (their attributes
+        whose names do not end with an underscore, without their leading underscores, e.g. ``_low`` for a scale), so
+        that two objects with the same parameters have the same representation.
+
+    >>> from whalrus.rule.RuleBorda import RuleBorda
+    >>> _canonical(RuleBorda()) == _canonical(RuleBorda())
+    True
+    >>> _canonical({'b': 2., 'a': 1})
+    ['dict', [['a', ['number', '1']], ['b', ['number', '2']]]]
+    """
+    if isinstance(x, str):
+        return x
+    if x is None or isinstance(x, bool):
+        return ['constant', repr(x)]
+    if isinstance(x, Number):
+        return ['number', str(convert_number(x))]
+    if isinstance(x, Ballot):
+        return ['ballot', repr(x)]
+    if isinstance(x, Profile):
+        return ['profile', x.digest]
+    if isinstance(x, type) or callable(x) and hasattr(x, '__qualname__'):
+        return ['callable', '%s.%s' % (x.__module__, x.__qualname__)]
+    if hasattr(x, 'tobytes') and hasattr(x, 'dtype'):
+        return ['array', str(x.dtype), list(x.shape), hashlib.sha256(x.tobytes()).hexdigest()]
+    if id(x) in ancestors:
+        raise ValueError('Cannot represent an object that contains itself.')
+    ancestors = ancestors | {id(x)}
+    if isinstance(x, (list, tuple)):
+        return ['list', [_canonical(y, ancestors) for y in x]]
+    if isinstance(x, (set, frozenset)):
+        return ['set', sorted([_canonical(y, ancestors) for y in x], key=json.dumps)]
+    if isinstance(x, dict):
+        return ['dict', sorted([[_canonical(k, ancestors), _canonical(v, ancestors)] for k, v in x.items()],
+                               key=json.dumps)]
+    if hasattr(x, '__dict__'):
+        parameters = {k.lstrip('_'): v for k, v in vars(x).items()
+                      if not k.endswith('_') and k != '_cached_properties'}
+        return ['object', '%s.%s' % (type(x).__module__, type(x).__qualname__), _canonical(parameters, ancestors)]
+    return ['repr', repr(x)]
+
+
+class ResultCache:
+    """
+    A persistent cache for the results of rules.
+
+    :param directory: the directory where the results are stored (it is created if necessary).
+    :param max_size: the maximal total size of the stored results, in bytes. When it is exceeded, the least recently
+        used results are deleted.
+    :param names: the names of the computed variables to store (e.g. ``('order_', 'scores_')``). Default: ``order_``,
+        ``scores_`` (if the rule has it), and all the public computed variables that were computed along the way
+        (e.g. the matrices, the rounds, etc).
+
+    A :class:`ResultCache` object is a callable whose inputs are a :class:`Rule` and the same arguments as the rule
+    (ballots, weights, voters, candidates). When it is called, it loads the profile in the rule. If the results are
+    already stored, they are put in the cache of the rule, so that they are not computed again; otherwise, they are
+    computed and stored. Then it returns the rule.
+
+    >>> import tempfile
+    >>> from whalrus.rule.RuleSchulze import RuleSchulze
+    >>> from whalrus.priority.Priority import Priority
+    >>> cache = ResultCache(tempfile.mkdtemp())
+    >>> rule = cache(RuleSchulze(tie_break=Priority.ASCENDING), ['a > b > c', 'b > c > a', 'c > a > b'], [3, 2, 2])
+    >>> rule.order_
+    [{'a'}, {'b'}, {'c'}]
+    >>> rule = cache(RuleSchulze(tie_break=Priority.ASCENDING), ['a > b > c', 'b > c > a', 'c > a > b'], [3, 2, 2])
+    >>> cache.hits_, cache.misses_
+    (1, 1)
+    >>> 'matrix_schulze_' in rule._cached_properties
+    True
+
+    The results are stored in a file whose name is given by :meth:`key`: a digest of the parameters of the rule (its
+    class and its parameters, such as its tie-breaking rule, its converter, its scorer, etc), of the profile (cf.
+    :attr:`Profile.digest`), of the candidates and of the version of Whalrus. Hence, the same rule configuration,
+    evaluated on the same profile, gives the same key in another session. The stored values are pickled: the
+    directory should only be shared between trusted users.
+
+    :ivar hits\\_: the number of calls where the results were already stored.
+    :ivar misses\\_: the number of calls where the results were computed.
+    """
+
+    def __init__(self, directory: str, max_size: int = 2 ** 30, names: tuple = None):
+        self.directory = directory
+        self.max_size = max_size
+        self.names = names
+        # Computed variables
+        self.hits_ = 0
+        self.misses_ = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(rule: Rule, candidates: set = None) -> str:
+        """
+        The key of the results of a rule.
+
+        :param rule: a rule, which has already loaded a profile.
+        :param candidates: the candidates given to the rule (if any).
+        :return: a string (the SHA-256 digest in hexadecimal).
+
+        >>> from whalrus.rule.RuleBorda import RuleBorda
+        >>> from whalrus.priority.Priority import Priority
+        >>> ResultCache.key(RuleBorda(['a > b'])) == ResultCache.key(RuleBorda(['a > b']))
+        True
+        >>> ResultCache.key(RuleBorda(['a > b'])) == ResultCache.key(RuleBorda(['a > b'], tie_break=Priority.ASCENDING))
+        False
+        """
+        import whalrus
+        content = [whalrus.__version__, _canonical(rule), rule.profile_original_.digest, _canonical(candidates)]
+        return hashlib.sha256(json.dumps(content, separators=(',', ':')).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.pickle')
+
+    def __call__(self, rule: Rule, ballots: list = None, weights: list = None, voters: list = None,
+                 candidates: set = None) -> Rule:
+        rule(ballots, weights=weights, voters=voters, candidates=candidates)
+        path = self._path(self.key(rule, candidates))
+        values = self._load(path)
+        if values is not None:
+            # noinspection PyProtectedMember
+            rule._cached_properties.update(values)
+            self.hits_ += 1
+            return rule
+        self.misses_ += 1
+        self._store(path, self._results(rule))
+        return rule
+
+    def _results(self, rule: Rule) -> dict:
+        """
+        The results of a rule.
+
+        :param rule: a rule, which has already loaded a profile.
+        :return: a dictionary whose keys are names of computed variables and whose values are their values.
+        """
+        if self.names is not None:
+            return {name: getattr(rule, name) for name in self.names}
+        _ = rule.order_
+        if isinstance(getattr(type(rule), 'scores_', None), property):
+            _ = rule.scores_
+        # noinspection PyProtectedMember
+        return {name: value for name, value in rule._cached_properties.items() if not name.startswith('_')}
+
+    def _load(self, path: str) -> dict:
+        """
+        Load some stored results.
+
+        :param path: the path of the file.
+        :return: the results, or None if they are not stored (or if the file cannot be read, in which case it is
+            deleted). The file is marked as recently used.
+        """
+        try:
+            with open(path, 'rb') as f:
+                values = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning('Cannot read %s (%s): it is deleted.' % (path, e))
+            self._remove(path)
+            return None
+        os.utime(path)
+        return values
+
+    def _store(self, path: str, values: dict) -> None:
+        """
+        Store some results, then delete the least recently used results if the directory is too large.
+
+        :param path: the path of the file.
+        :param values: the results.
+        """
+        try:
+            data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logging.warning('Cannot store the results (%s).' % e)
+            return
+        # Write in a temporary file first, so that other processes never read a partial file.
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temporary_path, path)
+        self._evict()
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """
+        Delete the least recently used results until the total size is at most :attr:`max_size`.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pickle'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    @property
+    def size(self) -> int:
+        """
+        The total size of the stored results.
+
+        :return: a number of bytes.
+        """
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith('.pickle'))
+
+    def clear(self) -> None:
+        """
+        Delete all the stored results.
+        """
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pickle'):
+                self._remove(entry.path)
@@ -17,20 +17,325 @@ This file is part of Whalrus.
 
     You should have received a copy of the GNU General Public License
     along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+Console script for whalrus: compute the results of elections given as ballot files.
+
+The files are read line by line and the identical ballots are counted together, so that the memory used depends on the
+number of distinct ballots, not on the size of the files. The input formats are:
+
+* ``lines``: one ballot per line, in the format of :class:`BallotOrder` (e.g. ``a > b ~ c``), or a JSON object of
+  grades (e.g. ``{"a": 10, "b": 7}``). Empty lines are ignored.
+* ``preflib``: a PrefLib file (``soc``, ``soi``, ``toc`` or ``toi``), in the current format (``# ALTERNATIVE NAME 1: a``
+  and ``count: 1,{2,3},4``) or in the legacy one.
+* ``csv-ranks``: a CSV file whose header gives the candidates and where each row gives the rank of each candidate
+  (1 for the top candidates; an empty cell for the candidates that are not ranked).
+* ``csv-grades``: a CSV file whose header gives the candidates and where each row gives the grade of each candidate
+  (an empty cell for the candidates that are not graded).
+
+With the format ``auto`` (default), the files with a PrefLib extension are read as ``preflib``, and the other ones as
+``lines``.
+
+For each file and each rule, the output gives the winner, the order and, for the rules based on scores, the scores.
+The rules share their majority matrices (cf. :func:`share_matrices`), so that each one is computed once per file:
+
+>>> from click.testing import CliRunner
+>>> ballots = 'a > b > c\\na > c > b\\nb > a > c\\nc > a > b\\n'
+>>> result = CliRunner().invoke(main, ['--rule', 'Plurality', '--rule', 'Copeland'], input=ballots)
+>>> print(result.output, end='')  # doctest: +ELLIPSIS
+{"file": "-", "rule": "Plurality", "winner": "a", "order": [["a"], ["b", "c"]], "scores": {"a": 0.5, "b": 0.25, ...}}
+{"file": "-", "rule": "Copeland", "winner": "a", "order": [["a"], ["b", "c"]], "scores": {"a": 2, "b": 0.5, ...}}
 """
+import csv
+import json
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from numbers import Integral, Number
 import click
 
-"""Console script for whalrus."""
+FORMATS = ['auto', 'lines', 'preflib', 'csv-ranks', 'csv-grades']
+
+PREFLIB_EXTENSIONS = ('.soc', '.soi', '.toc', '.toi')
+
+# The voting rules that can be used with their default parameters (cf. "Voting Rules 2: Particular" in the package).
+RULES = ['Approval', 'Baldwin', 'Black', 'Borda', 'BucklinByRounds', 'BucklinInstant', 'Condorcet', 'Coombs',
+         'Copeland', 'IRV', 'KApproval', 'Kemeny', 'KimRoush', 'MajorityJudgment', 'Maximin', 'Nanson', 'Plurality',
+         'RangeVoting', 'RankedPairs', 'Schulze', 'SimplifiedDodgson', 'TwoRound', 'Veto']
+
+# The deterministic tie-breaking rules (cf. :class:`Priority`).
+TIE_BREAKS = ['unambiguous', 'abstain', 'ascending', 'descending']
+
+CSV_COLUMNS = ['file', 'rule', 'candidate', 'rank', 'score', 'winner', 'error']
+
+
+# Input
+# =====
+
+def _count(keys) -> dict:
+    """
+    Count identical keys.
+
+    :param keys: an iterable of pairs ``(key, weight)``.
+    :return: a dictionary that maps each key to its total weight (in the order of first appearance).
+    """
+    counts = {}
+    for key, weight in keys:
+        counts[key] = counts.get(key, 0) + weight
+    return counts
+
+
+def _read_lines(lines) -> tuple:
+    counts = _count((line.strip(), 1) for line in lines if line.strip())
+    ballots = [json.loads(line) if line.startswith('{') else line for line in counts]
+    return ballots, list(counts.values()), None
+
+
+def _read_preflib(lines) -> tuple:
+    names = {}
+    n_alternatives = None
+    summary_read = False
+
+    def keys():
+        nonlocal n_alternatives, summary_read
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#'):
+                match = re.match(r'#\s*ALTERNATIVE NAME\s+(\d+)\s*:\s*(.*)', line)
+                if match:
+                    names[match.group(1)] = match.group(2).strip()
+            elif n_alternatives is not None and len(names) < n_alternatives:
+                # Legacy header: ``i,name`` for each alternative.
+                i, name = line.split(',', 1)
+                names[i.strip()] = name.strip()
+            elif ':' in line:
+                count, ballot = line.split(':', 1)
+                yield ballot.replace(' ', ''), int(count)
+            elif n_alternatives is None:
+                # Legacy header: the number of alternatives.
+                n_alternatives = int(line)
+            elif not summary_read:
+                # Legacy header: the number of voters, the sum of the counts and the number of distinct ballots.
+                summary_read = True
+            else:
+                count, ballot = line.split(',', 1)
+                yield ballot.replace(' ', ''), int(count)
+
+    counts = _count(keys())
+    candidates = set(names.values()) if names else None
+    from whalrus.ballot.BallotOrder import BallotOrder
+    ballots = []
+    for key in counts:
+        classes = re.findall(r'{([^}]*)}|([^,{}]+)', key)
+        ballots.append(BallotOrder([{names.get(i, i) for i in (group or single).split(',') if i}
+                                    for group, single in classes], candidates=candidates))
+    return ballots, list(counts.values()), candidates
+
+
+def _read_csv(lines) -> tuple:
+    rows = csv.reader(lines)
+    header = [name.strip() for name in next(rows, [])]
+    counts = _count((tuple(cell.strip() for cell in row), 1) for row in rows if any(cell.strip() for cell in row))
+    return header, counts
+
+
+def _read_csv_ranks(lines) -> tuple:
+    from whalrus.ballot.BallotOrder import BallotOrder
+    from whalrus.utils.Utils import convert_number
+    header, counts = _read_csv(lines)
+    ballots = []
+    for key in counts:
+        classes = {}
+        for candidate, cell in zip(header, key):
+            if cell:
+                classes.setdefault(convert_number(cell), set()).add(candidate)
+        ballots.append(BallotOrder([classes[rank] for rank in sorted(classes)], candidates=set(header)))
+    return ballots, list(counts.values()), set(header)
+
+
+def _read_csv_grades(lines) -> tuple:
+    from whalrus.ballot.BallotLevels import BallotLevels
+    from whalrus.utils.Utils import convert_number
+    header, counts = _read_csv(lines)
+    ballots = [BallotLevels({candidate: convert_number(cell) for candidate, cell in zip(header, key) if cell},
+                            candidates=set(header))
+               for key in counts]
+    return ballots, list(counts.values()), set(header)
+
+
+_READERS = {'lines': _read_lines, 'preflib': _read_preflib, 'csv-ranks': _read_csv_ranks,
+            'csv-grades': _read_csv_grades}
+
+
+def read_election(lines, fmt: str = 'lines') -> tuple:
+    """
+    Read an election, counting the identical ballots together.
+
+    :param lines: an iterable of lines (e.g. a text file), which is read only once.
+    :param fmt: the format: ``'lines'``, ``'preflib'``, ``'csv-ranks'`` or ``'csv-grades'``.
+    :return: a tuple ``(ballots, weights, candidates)``: the distinct ballots, their total weights, and the set of
+        candidates given by the file (None if the format does not give them).
+
+    >>> read_election(['a > b', 'b > a', 'a > b'])
+    (['a > b', 'b > a'], [2, 1], None)
+    >>> ballots, weights, candidates = read_election(['a,b,c', '1,2,', '1,2,', '2,1,1'], fmt='csv-ranks')
+    >>> for ballot, weight in zip(ballots, weights):
+    ...     print(weight, ballot)
+    2 a > b (unordered: c)
+    1 b ~ c > a
+    """
+    return _READERS[fmt](lines)
+
+
+# Evaluation
+# ==========
+
+def _jsonable(x: object) -> object:
+    if isinstance(x, Integral):
+        return int(x)
+    if isinstance(x, Number):
+        return float(x)
+    if isinstance(x, (tuple, list)):
+        return [_jsonable(y) for y in x]
+    return x
+
+
+def _rule_result(rule) -> dict:
+    """
+    The results of a rule that has been called with a profile.
+
+    :param rule: a :class:`Rule`.
+    :return: a dictionary with the keys ``'winner'``, ``'order'`` and, for the rules based on scores, ``'scores'``,
+        whose values can be written as JSON.
+    """
+    from whalrus.rule.RuleScore import RuleScore
+    from whalrus.utils.Utils import set_to_list
+    result = {'winner': rule.winner_, 'order': [set_to_list(s) for s in rule.order_]}
+    if isinstance(rule, RuleScore):
+        result['scores'] = {c: _jsonable(rule.scores_[c]) for c in set_to_list(rule.scores_.keys())}
+    return result
+
+
+def evaluate(ballots: list, weights: list, candidates: set, rules: list, tie_break: str = 'ascending') -> list:
+    """
+    Evaluate several rules on an election.
+
+    :param ballots: the ballots.
+    :param weights: their weights.
+    :param candidates: the candidates (None to use the candidates of the ballots).
+    :param rules: the names of the rules (cf. :data:`RULES`).
+    :param tie_break: the name of the tie-breaking rule (cf. :data:`TIE_BREAKS`).
+    :return: a list of dictionaries, one for each rule, with the keys ``'rule'``, ``'winner'``, ``'order'`` and, for
+        the rules based on scores, ``'scores'``. If the rule fails, the dictionary has the keys ``'rule'`` and
+        ``'error'`` instead.
+
+    The rules whose majority matrices have the same parameters share them: each one is computed only once.
+
+    >>> evaluate(['a > b > c', 'b > a > c'], [2, 1], None, ['Copeland', 'Condorcet'])
+    [{'rule': 'Copeland', 'winner': 'a', 'order': [['a'], ['b'], ['c']], 'scores': {'a': 2, 'b': 1, 'c': 0}}, \
+{'rule': 'Condorcet', 'winner': 'a', 'order': [['a'], ['b', 'c']]}]
+    """
+    import whalrus
+    from whalrus.profile.Profile import Profile
+    from whalrus.utils.Utils import share_matrices
+    profile = Profile(ballots, weights=weights)
+    shared = {}
+    results = []
+    for name in rules:
+        try:
+            rule = getattr(whalrus, 'Rule' + name)(tie_break=getattr(whalrus.Priority, tie_break.upper()))
+            rule(profile, candidates=candidates)
+            share_matrices(rule, shared)
+            result = dict(rule=name, **_rule_result(rule))
+        except Exception as e:
+            result = {'rule': name, 'error': '%s: %s' % (type(e).__name__, e)}
+        results.append(result)
+    return results
+
+
+def _process_file(path: str, fmt: str, rules: list, tie_break: str) -> list:
+    """
+    Read a file and evaluate the rules.
+
+    :param path: the path of the file, or ``'-'`` for the standard input.
+    :return: a list of dictionaries (cf. :func:`evaluate`), with the additional key ``'file'``.
+    """
+    if fmt == 'auto':
+        fmt = 'preflib' if path.lower().endswith(PREFLIB_EXTENSIONS) else 'lines'
+    try:
+        if path == '-':
+            election = read_election(click.get_text_stream('stdin'), fmt)
+        else:
+            with open(path, encoding='utf-8', newline='') as f:
+                election = read_election(f, fmt)
+    except Exception as e:
+        return [{'file': path, 'error': '%s: %s' % (type(e).__name__, e)}]
+    return [dict(file=path, **result) for result in evaluate(*election, rules=rules, tie_break=tie_break)]
+
+
+# Output
+# ======
+
+def _write_jsonl(records: list, output) -> None:
+    for record in records:
+        output.write(json.dumps(record, default=str) + '\n')
+
+
+def _write_csv(records: list, output) -> None:
+    writer = csv.DictWriter(output, CSV_COLUMNS, lineterminator='\n')
+    for record in records:
+        if 'error' in record:
+            writer.writerow({key: record.get(key) for key in ('file', 'rule', 'error')})
+            continue
+        scores = record.get('scores', {})
+        for rank, candidates in enumerate(record['order'], 1):
+            for c in candidates:
+                score = scores.get(c)
+                writer.writerow({'file': record['file'], 'rule': record['rule'], 'candidate': c, 'rank': rank,
+                                 'score': json.dumps(score) if isinstance(score, list) else score,
+                                 'winner': int(c == record['winner'])})
 
 
 @click.command()
-def main(args=None):
-    """Console script for whalrus."""
-    click.echo("Replace this message by putting your code into "
-               "whalrus.cli.main")
-    click.echo("See click documentation at http://click.pocoo.org/")
-    return 0
+@click.argument('files', nargs=-1, type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--rule', '-r', 'rules', multiple=True, type=click.Choice(RULES, case_sensitive=False),
+              default=['Plurality'], show_default=True, help='A voting rule (repeat the option for several rules).')
+@click.option('--format', '-f', 'fmt', type=click.Choice(FORMATS), default='auto', show_default=True,
+              help='The format of the input files.')
+@click.option('--tie-break', '-t', type=click.Choice(TIE_BREAKS), default='ascending', show_default=True,
+              help='The tie-breaking rule.')
+@click.option('--output-format', '-F', type=click.Choice(['jsonl', 'csv']), default='jsonl', show_default=True,
+              help='JSON lines (one line per file and rule) or CSV (one row per file, rule and candidate).')
+@click.option('--output', '-o', type=click.File('w'), default='-', help='The output file (default: stdout).')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1, show_default=True,
+              help='The number of processes, each one handling one input file at a time.')
+def main(files, rules, fmt, tie_break, output_format, output, jobs):
+    """
+    Compute the results of the elections given in FILES (default: the standard input).
+    """
+    files = files or ('-', )
+    write = _write_jsonl if output_format == 'jsonl' else _write_csv
+    if output_format == 'csv':
+        csv.writer(output, lineterminator='\n').writerow(CSV_COLUMNS)
+    n_errors = 0
+    if jobs == 1 or '-' in files:
+        results = (_process_file(path, fmt, list(rules), tie_break) for path in files)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(jobs)
+        results = executor.map(_process_file, files, repeat(fmt), repeat(list(rules)), repeat(tie_break))
+    try:
+        for records in results:
+            write(records, output)
+            output.flush()
+            n_errors += sum('error' in record for record in records)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if n_errors:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -18,7 +18,6 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
-from pyparsing import ParseException
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
 from whalrus.ballot.Ballot import Ballot
 from whalrus.ballot.BallotOneName import BallotOneName
@@ -104,6 +103,7 @@ class ConverterBallotGeneral(ConverterBallot):
         # If it is not a ballot, convert to ballot and call the method again.
         if isinstance(x, dict):
             return self(BallotLevels(x), candidates)
+        from pyparsing import ParseException
         try:
             ballot_order = BallotOrder(x)
             if len(ballot_order) == 1:
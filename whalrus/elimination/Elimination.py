@@ -18,11 +18,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
-from whalrus.utils.Utils import cached_property, DeleteCacheMixin, NiceSet
+from whalrus.utils.Utils import cached_property, DeleteCacheMixin, CloneMixin, NiceSet
 from whalrus.rule.Rule import Rule
 
 
-class Elimination(DeleteCacheMixin):
+class Elimination(DeleteCacheMixin, CloneMixin):
     """
     An elimination method.
 
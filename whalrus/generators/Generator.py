@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from whalrus.ballot.BallotOrder import BallotOrder
+from whalrus.profile.Profile import Profile
+from whalrus.utils.Utils import NiceSet, set_to_list
+
+
+class Generator:
+    """
+    A random generator of profiles.
+
+    :param candidates: the candidates. If it is a list, its order is used by the generators that need a reference
+        order (e.g. :class:`GeneratorMallows` or :class:`GeneratorSinglePeaked`). If it is a set, the candidates are
+        sorted when possible.
+    :param seed: the seed of the random generator: an int, None (fresh entropy) or a :class:`numpy.random.Generator`.
+        With a given seed, the sequence of generated profiles is reproducible.
+    :param tie_probability: probability that two consecutive candidates of a ballot are tied. Default: 0, i.e. the
+        ballots are strict orders.
+    :param truncation: if an int `k`, each ballot only orders its `k` best candidates, and the other candidates are
+        unordered (but still available). Default: None, i.e. the ballots are complete.
+    :param weighted: if True, identical ballots are merged into one ballot whose weight is their number of occurrences.
+        This gives the same results with anonymous rules, and is much faster when the number of voters is large
+        compared to the number of possible ballots.
+
+    A :class:`Generator` object is a callable whose input is a number of voters and whose output is a
+    :class:`Profile` of :class:`BallotOrder`. Cf. :class:`GeneratorImpartialCulture` for some examples.
+
+    The core of the generation is done with numpy in :meth:`rankings`, which returns the raw rankings of the voters
+    as an array. Then the weak orders and the truncation are applied, and a ballot object is created only once per
+    distinct ballot.
+    """
+
+    def __init__(self, candidates: list, seed: object = None, tie_probability: float = 0,
+                 truncation: int = None, weighted: bool = False):
+        if isinstance(candidates, (set, frozenset)):
+            candidates = set_to_list(candidates)
+        self.candidates = list(candidates)
+        self.rng = np.random.default_rng(seed)
+        self.tie_probability = tie_probability
+        self.truncation = truncation
+        self.weighted = weighted
+
+    @property
+    def n_candidates(self) -> int:
+        """
+        The number of candidates.
+
+        :return: an int.
+        """
+        return len(self.candidates)
+
+    def rankings(self, n_voters: int) -> np.ndarray:
+        """
+        Raw rankings of the voters.
+
+        :param n_voters: the number of voters.
+        :return: an array of int, of shape (`n_voters`, :attr:`n_candidates`). Each row is a strict order, given as the
+            indexes of the candidates (in :attr:`candidates`) from the most liked to the least liked.
+        """
+        raise NotImplementedError
+
+    def __call__(self, n_voters: int) -> Profile:
+        rankings = self.rankings(n_voters)
+        length = self.n_candidates if self.truncation is None else min(self.truncation, self.n_candidates)
+        rankings = rankings[:, :length]
+        ties = self.rng.random((n_voters, max(length - 1, 0))) < self.tie_probability
+        distinct, inverse, counts = np.unique(np.hstack([rankings, ties]), axis=0,
+                                              return_inverse=True, return_counts=True)
+        candidates = NiceSet(self.candidates)
+        ballots = [self._ballot(row[:length], row[length:], candidates) for row in distinct]
+        if self.weighted:
+            return Profile(ballots, weights=counts.tolist())
+        return Profile([ballots[k] for k in inverse.reshape(-1)])
+
+    def _ballot(self, ranking: np.ndarray, ties: np.ndarray, candidates: NiceSet) -> BallotOrder:
+        """
+        Build a ballot.
+
+        :param ranking: the indexes of the ordered candidates, from the most liked to the least liked.
+        :param ties: an array of bool. ``ties[k]`` means that the candidates in positions `k` and `k + 1` are tied.
+        :param candidates: the candidates available in the ballot.
+        :return: a :class:`BallotOrder`.
+        """
+        b = []
+        for position, i in enumerate(ranking.tolist()):
+            if position > 0 and ties[position - 1]:
+                b[-1].add(self.candidates[i])
+            else:
+                b.append({self.candidates[i]})
+        return BallotOrder(b, candidates=candidates)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from whalrus.generators.Generator import Generator
+
+
+class GeneratorEuclidean(Generator):
+    """
+    Euclidean spatial model: voters and candidates are points, and each voter prefers the closest candidates.
+
+    :param `*args`: cf. :class:`Generator`.
+    :param dimension: the dimension of the space.
+    :param candidate_positions: an array of shape (number of candidates, :attr:`dimension`). Default: the positions of
+        the candidates are drawn uniformly in the unit hypercube, independently for each profile.
+    :param `**kwargs`: cf. :class:`Generator`.
+
+    The positions of the voters are drawn uniformly in the unit hypercube.
+
+    >>> generator = GeneratorEuclidean(['a', 'b', 'c'], candidate_positions=[[0], [.5], [1]], seed=42)
+    >>> profile = generator(1000)
+    >>> all(ballot.as_strict_order[-1] in {'a', 'c'} for ballot in profile)
+    True
+
+    In dimension 1, the model is a particular case of single-peaked preferences (cf.
+    :class:`GeneratorSinglePeaked`).
+    """
+
+    def __init__(self, *args, dimension: int = 2, candidate_positions: np.ndarray = None, **kwargs):
+        if candidate_positions is not None:
+            candidate_positions = np.asarray(candidate_positions, dtype=float)
+            dimension = candidate_positions.shape[1]
+        self.dimension = dimension
+        self.candidate_positions = candidate_positions
+        super().__init__(*args, **kwargs)
+
+    def rankings(self, n_voters: int) -> np.ndarray:
+        candidate_positions = self.candidate_positions
+        if candidate_positions is None:
+            candidate_positions = self.rng.random((self.n_candidates, self.dimension))
+        voter_positions = self.rng.random((n_voters, self.dimension))
+        distances = np.linalg.norm(voter_positions[:, np.newaxis, :] - candidate_positions[np.newaxis, :, :], axis=2)
+        return distances.argsort(axis=1, kind='stable')
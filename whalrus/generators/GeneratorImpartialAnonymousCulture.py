@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from whalrus.generators.GeneratorUrn import GeneratorUrn
+
+
+class GeneratorImpartialAnonymousCulture(GeneratorUrn):
+    """
+    Impartial anonymous culture: all anonymous profiles (i.e. multisets of strict orders) are equally likely.
+
+    :param `*args`: cf. :class:`Generator`.
+    :param `**kwargs`: cf. :class:`Generator`.
+
+    This is the urn model with ``replacement=1`` (cf. :class:`GeneratorUrn`).
+
+    >>> generator = GeneratorImpartialAnonymousCulture(['a', 'b'], seed=42, weighted=True)
+    >>> profile = generator(10)
+    >>> sum(profile.weights)
+    10
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, replacement=1, **kwargs)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from whalrus.generators.Generator import Generator
+
+
+class GeneratorImpartialCulture(Generator):
+    """
+    Impartial culture: each voter draws a strict order uniformly at random, independently of the others.
+
+    :param `*args`: cf. :class:`Generator`.
+    :param `**kwargs`: cf. :class:`Generator`.
+
+    >>> generator = GeneratorImpartialCulture(['a', 'b', 'c'], seed=42)
+    >>> profile = generator(4)
+    >>> len(profile)
+    4
+    >>> profile[0].candidates
+    {'a', 'b', 'c'}
+
+    The generated profiles can be used with any rule:
+
+    >>> from whalrus.rule.RuleBorda import RuleBorda
+    >>> generator = GeneratorImpartialCulture(['a', 'b', 'c'], seed=42)
+    >>> rule = RuleBorda(generator(1000))
+    >>> sorted(rule.candidates_)
+    ['a', 'b', 'c']
+
+    With the same seed, the same profiles are generated:
+
+    >>> list(GeneratorImpartialCulture(['a', 'b', 'c'], seed=1)(10)) == list(
+    ...     GeneratorImpartialCulture(['a', 'b', 'c'], seed=1)(10))
+    True
+
+    Weak orders and truncated ballots:
+
+    >>> generator = GeneratorImpartialCulture(['a', 'b', 'c', 'd'], seed=0, tie_probability=.5, truncation=3)
+    >>> all(len(ballot) == 3 for ballot in generator(20))
+    True
+
+    With a large number of voters, merging identical ballots makes the profile small:
+
+    >>> generator = GeneratorImpartialCulture(['a', 'b', 'c'], seed=42, weighted=True)
+    >>> profile = generator(10000)
+    >>> len(profile), sum(profile.weights)
+    (6, 10000)
+    """
+
+    def rankings(self, n_voters: int) -> np.ndarray:
+        return self.rng.random((n_voters, self.n_candidates)).argsort(axis=1)
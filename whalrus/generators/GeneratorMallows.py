@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from whalrus.generators.Generator import Generator
+
+
+class GeneratorMallows(Generator):
+    """
+    Mallows model: the probability of a strict order is proportional to `phi ** d`, where `d` is its Kendall tau
+    distance to a reference order.
+
+    :param `*args`: cf. :class:`Generator`. The reference order is the order of :attr:`candidates`.
+    :param phi: the dispersion, between 0 and 1. With ``phi=0``, all voters have the reference order; with ``phi=1``,
+        this is the impartial culture.
+    :param `**kwargs`: cf. :class:`Generator`.
+
+    >>> generator = GeneratorMallows(['a', 'b', 'c'], phi=0, seed=42)
+    >>> print(generator(2))
+    a > b > c
+    a > b > c
+    >>> from whalrus.rule.RuleBorda import RuleBorda
+    >>> RuleBorda(GeneratorMallows(['a', 'b', 'c'], phi=.5, seed=42)(1000)).order_
+    [{'a'}, {'b'}, {'c'}]
+
+    The orders are drawn by the repeated insertion model, vectorized over the voters: the candidates are inserted one
+    by one in the reference order, the `i`-th one (counting from 0) being inserted at position `j` with probability
+    proportional to `phi ** (i - j)`.
+    """
+
+    def __init__(self, *args, phi: float = 1, **kwargs):
+        self.phi = phi
+        super().__init__(*args, **kwargs)
+
+    def rankings(self, n_voters: int) -> np.ndarray:
+        # positions[v, i] is the current position of candidate i in the order of voter v.
+        positions = np.zeros((n_voters, self.n_candidates), dtype=int)
+        for i in range(1, self.n_candidates):
+            probabilities = self.phi ** np.arange(i, -1, -1, dtype=float)
+            insertions = self.rng.choice(i + 1, size=n_voters, p=probabilities / probabilities.sum())
+            positions[:, :i] += positions[:, :i] >= insertions[:, np.newaxis]
+            positions[:, i] = insertions
+        return positions.argsort(axis=1)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from whalrus.generators.Generator import Generator
+
+
+class GeneratorSinglePeaked(Generator):
+    """
+    Single-peaked orders, drawn uniformly at random.
+
+    :param `*args`: cf. :class:`Generator`. The axis is the order of :attr:`candidates`.
+    :param `**kwargs`: cf. :class:`Generator`.
+
+    Each strict order that is single-peaked with respect to the axis is equally likely. The orders are built from
+    the least liked candidate to the most liked one: at each step, the next candidate is one of the two extremities of
+    the remaining part of the axis, chosen with probability 1/2.
+
+    >>> generator = GeneratorSinglePeaked(['a', 'b', 'c', 'd'], seed=42)
+    >>> profile = generator(1000)
+    >>> all(ballot.as_strict_order[-1] in {'a', 'd'} for ballot in profile)
+    True
+
+    A single-peaked profile always has a Condorcet winner (for an odd number of voters):
+
+    >>> from whalrus.rule.RuleCondorcet import RuleCondorcet
+    >>> len(RuleCondorcet(generator(101)).cowinners_)
+    1
+    """
+
+    def rankings(self, n_voters: int) -> np.ndarray:
+        rankings = np.zeros((n_voters, self.n_candidates), dtype=int)
+        left = np.zeros(n_voters, dtype=int)
+        right = np.full(n_voters, self.n_candidates - 1)
+        for position in range(self.n_candidates - 1, 0, -1):
+            take_left = self.rng.random(n_voters) < .5
+            rankings[:, position] = np.where(take_left, left, right)
+            left += take_left
+            right -= ~take_left
+        rankings[:, 0] = left
+        return rankings
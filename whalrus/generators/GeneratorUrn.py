@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import math
+import numpy as np
+from whalrus.generators.Generator import Generator
+
+
+class GeneratorUrn(Generator):
+    """
+    Pólya-Eggenberger urn model.
+
+    :param `*args`: cf. :class:`Generator`.
+    :param replacement: the number of copies of a ballot that are added to the urn each time it is drawn.
+    :param `**kwargs`: cf. :class:`Generator`.
+
+    The urn initially contains each strict order once. Voters draw their ballot in turn, and each time a ballot is
+    drawn, it is put back in the urn with :attr:`replacement` additional copies. With ``replacement=0``, this is the
+    impartial culture; with ``replacement=1``, this is the impartial anonymous culture (cf.
+    :class:`GeneratorImpartialAnonymousCulture`); the larger :attr:`replacement`, the more homogeneous the profile.
+
+    >>> generator = GeneratorUrn(['a', 'b', 'c'], replacement=1000, seed=42, weighted=True)
+    >>> profile = generator(100)
+    >>> sum(profile.weights)
+    100
+    >>> max(profile.weights) > 50
+    True
+
+    The draws are vectorized: voter `i` draws either a ballot of the initial urn, with probability
+    `m! / (m! + replacement * i)` (where `m` is the number of candidates), or a copy of the ballot of a previous voter
+    chosen uniformly at random. Then the chains of copies are resolved by pointer jumping.
+    """
+
+    def __init__(self, *args, replacement: int = 1, **kwargs):
+        self.replacement = replacement
+        super().__init__(*args, **kwargs)
+
+    def rankings(self, n_voters: int) -> np.ndarray:
+        voters = np.arange(n_voters)
+        # ``ratio`` may underflow to 0 for many candidates, which is fine: then the urn is (almost) the IC.
+        ratio = self.replacement / math.factorial(self.n_candidates)
+        fresh = self.rng.random(n_voters) * (1 + ratio * voters) < 1
+        source = np.where(fresh, voters, (self.rng.random(n_voters) * voters).astype(int))
+        while True:
+            new_source = source[source]
+            if np.array_equal(new_source, source):
+                break
+            source = new_source
+        return self.rng.random((n_voters, self.n_candidates)).argsort(axis=1)[source]
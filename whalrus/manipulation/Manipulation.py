@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from whalrus.ballot.BallotOrder import BallotOrder
+from whalrus.profile.Profile import Profile
+from whalrus.rule.Rule import Rule
+from whalrus.utils.Utils import cached_property, DeleteCacheMixin, CloneMixin, NiceDict, set_to_list
+
+
+class Manipulation(DeleteCacheMixin, CloneMixin):
+    """
+    A coalitional manipulation checker.
+
+    :param `*args`: if present, these parameters will be passed to ``__call__`` immediately after initialization.
+    :param verify: if True, each manipulation that is found is checked by evaluating the rule with the ballots of
+        the manipulators (if the check fails, the result for this candidate is None). This is mostly useful for
+        testing, since it is much slower than the algorithms themselves for large profiles.
+    :param `**kwargs`: if present, these parameters will be passed to ``__call__`` immediately after initialization.
+
+    A :class:`Manipulation` object is a callable whose input is a :class:`Rule` (which has already loaded a profile).
+    When the :class:`Manipulation` object is called, it loads the rule. The output of the call is the
+    :class:`Manipulation` object itself. But after the call, you can access to the computed variables (ending with an
+    underscore), such as :attr:`is_cm_` or :attr:`examples_`.
+
+    Let `w` be the sincere winner. The election is `coalitionally manipulable` in favor of another candidate `c` if
+    the voters who prefer `c` to `w` can cast other ballots so that `c` wins, the other voters keeping their sincere
+    ballots. The ballots of the profile must be strict total orders over the candidates of the election, and the
+    weights must be integers (numbers of voters, who may cast different ballots when they manipulate). Ties are broken
+    with the priority of the rule, which must be deterministic (or unambiguous, in which case the manipulators need
+    to make `c` win without tie).
+
+    Cf. :class:`ManipulationPositional` for some examples.
+
+    :ivar rule\\_: this attribute stores the rule given in argument of the ``__call__``.
+    """
+
+    def __init__(self, *args, verify: bool = False, **kwargs):
+        """
+        Remark: this `__init__` must always be called at the end of the subclasses' `__init__`.
+        """
+        self.verify = verify
+        # Computed variables
+        self.rule_ = None
+        # Optional: load a rule at initialization
+        if args or kwargs:
+            self(*args, **kwargs)
+
+    def __call__(self, rule: Rule):
+        self.rule_ = rule
+        self.delete_cache()
+        return self
+
+    # Sincere profile
+    # ===============
+
+    @cached_property
+    def candidates_as_list_(self) -> list:
+        """
+        The candidates of the election, as a list.
+
+        :return: a list. The indexes of the candidates in the internal arrays refer to this list.
+        """
+        return set_to_list(self.rule_.candidates_)
+
+    @cached_property
+    def _rankings_and_weights_(self) -> tuple:
+        """
+        The sincere ballots, as arrays.
+
+        :return: a pair of arrays. The first one is of shape (number of ballots, number of candidates): each row gives
+            the indexes of the candidates, from the most liked to the least liked. The second one gives the weights
+            (as ints).
+        """
+        index = {c: i for i, c in enumerate(self.candidates_as_list_)}
+        rankings = []
+        weights = []
+        for ballot, weight, _ in self.rule_.profile_original_.items():
+            if not isinstance(ballot, BallotOrder) or ballot.candidates_in_b != self.rule_.candidates_:
+                raise ValueError('Coalitional manipulation needs total orders over the candidates, got: %r.' % ballot)
+            if weight != int(weight):
+                raise ValueError('Coalitional manipulation needs integer weights, got: %r.' % weight)
+            rankings.append([index[c] for c in ballot.restrict(self.rule_.candidates_).as_strict_order])
+            weights.append(int(weight))
+        rankings = np.array(rankings, dtype=int).reshape(len(weights), len(index))
+        return rankings, np.array(weights, dtype=int)
+
+    @cached_property
+    def rankings_(self) -> np.ndarray:
+        """
+        The sincere rankings.
+
+        :return: an array of shape (number of ballots, number of candidates). Each row gives the indexes of the
+            candidates (in :attr:`candidates_as_list_`), from the most liked to the least liked.
+        """
+        return self._rankings_and_weights_[0]
+
+    @cached_property
+    def weights_(self) -> np.ndarray:
+        """
+        The weights of the ballots.
+
+        :return: an array of ints.
+        """
+        return self._rankings_and_weights_[1]
+
+    @cached_property
+    def positions_(self) -> np.ndarray:
+        """
+        The position of each candidate in each ballot.
+
+        :return: an array of shape (number of ballots, number of candidates). ``positions_[b, i]`` is the position
+            of the candidate of index `i` in ballot `b` (0 for the most liked).
+        """
+        return self.rankings_.argsort(axis=1)
+
+    @cached_property
+    def sincere_winner_(self) -> object:
+        """
+        The sincere winner.
+
+        :return: the winner of the rule with the sincere profile.
+        """
+        return self.rule_.winner_
+
+    @cached_property
+    def _sincere_winner_index_(self) -> int:
+        """
+        The index of the sincere winner in :attr:`candidates_as_list_`.
+
+        :return: an int.
+        """
+        return self.candidates_as_list_.index(self.sincere_winner_)
+
+    @cached_property
+    def _priority_ranks_(self) -> list:
+        """
+        The ranks of the candidates in the tie-breaking priority of the rule.
+
+        :return: a list (indexed like :attr:`candidates_as_list_`), or None if the priority is unambiguous.
+        """
+        try:
+            order = self._tie_break().sort(self.candidates_as_list_)
+        except ValueError:
+            return None
+        rank = {c: r for r, c in enumerate(order)}
+        return [rank[c] for c in self.candidates_as_list_]
+
+    def _tie_break(self):
+        """
+        The priority used to break the ties.
+
+        :return: a :class:`Priority`. By default, it is the one of the rule.
+        """
+        return self.rule_.tie_break
+
+    def _beats(self, score_x: object, x: int, score_y: object, y: int) -> bool:
+        """
+        Whether candidate `x` is better than candidate `y`, given their scores and the tie-breaking priority.
+
+        :param score_x: the score of `x`.
+        :param x: the index of a candidate.
+        :param score_y: the score of `y`.
+        :param y: the index of another candidate.
+        :return: True if `x` has a greater score, or the same score and a better priority.
+        """
+        if score_x != score_y:
+            return score_x > score_y
+        return self._priority_ranks_ is not None and self._priority_ranks_[x] < self._priority_ranks_[y]
+
+    def _coalition(self, c: int) -> np.ndarray:
+        """
+        The manipulators in favor of a candidate.
+
+        :param c: the index of a candidate.
+        :return: an array of bool: for each ballot, whether it prefers `c` to the sincere winner.
+        """
+        return self.positions_[:, c] < self.positions_[:, self._sincere_winner_index_]
+
+    def _plurality_scores(self, candidates: np.ndarray, ballots: np.ndarray) -> np.ndarray:
+        """
+        Plurality scores restricted to some candidates.
+
+        :param candidates: an array of bool: for each candidate, whether it is still in the election.
+        :param ballots: an array of bool: for each ballot, whether it is counted.
+        :return: an array of ints: for each candidate, the weight of the counted ballots where it is the most liked
+            among the candidates that are still in the election (0 for the other candidates).
+        """
+        rankings = self.rankings_[ballots]
+        tops = rankings[np.arange(len(rankings)), candidates[rankings].argmax(axis=1)]
+        return np.bincount(tops, weights=self.weights_[ballots], minlength=len(candidates)).astype(int)
+
+    def _is_majority_favorite(self) -> bool:
+        """
+        Whether the sincere winner is the most liked candidate of a strict majority of voters.
+
+        :return: a bool. This is a sufficient condition of non-manipulability for the rules that meet the majority
+            favorite criterion (such as :class:`RulePlurality`, :class:`RuleIRV` and :class:`RuleTwoRound`): the
+            voters who prefer another candidate to `w` are only a minority.
+        """
+        w = self._sincere_winner_index_
+        return 2 * int(self.weights_[self.rankings_[:, 0] == w].sum()) > int(self.weights_.sum())
+
+    # Manipulation
+    # ============
+
+    def _manipulation(self, c: int, coalition: np.ndarray, k: int) -> tuple:
+        """
+        Try to manipulate in favor of a candidate.
+
+        :param c: the index of a candidate, other than the sincere winner.
+        :param coalition: an array of bool: for each ballot, whether it prefers `c` to the sincere winner.
+        :param k: the total weight of the coalition (which is positive).
+        :return: a pair `(result, ballots)`. `result` is True if a manipulation was found, False if the algorithm
+            proves that there is none, and None if it cannot decide. `ballots` is a dictionary whose keys are tuples
+            of indexes of candidates (strict orders) and whose values are their weights among the manipulators (or None
+            when `result` is not True).
+        """
+        raise NotImplementedError
+
+    def _check(self, c: int, coalition: np.ndarray, ballots: dict) -> bool:
+        """
+        Check a manipulation with the rule itself.
+
+        :param c: the index of a candidate.
+        :param coalition: an array of bool: for each ballot, whether it prefers `c` to the sincere winner.
+        :param ballots: the ballots of the manipulators, as returned by :meth:`_manipulation`.
+        :return: True if `c` is the winner when the coalition casts these ballots.
+        """
+        profile = self.rule_.profile_original_
+        sincere = [i for i, manipulator in enumerate(coalition.tolist()) if not manipulator]
+        rule = self.rule_.clone()(
+            ballots=[profile[i] for i in sincere] + [self._ballot(order) for order in ballots],
+            weights=[profile.weights[i] for i in sincere] + list(ballots.values()),
+            candidates=self.rule_.candidates_)
+        try:
+            return rule.winner_ == self.candidates_as_list_[c]
+        except ValueError:
+            # A tie that an unambiguous priority cannot break.
+            return False
+
+    def _ballot(self, order: tuple) -> BallotOrder:
+        """
+        Convert a strict order of indexes to a ballot.
+
+        :param order: a tuple of indexes of candidates, from the most liked to the least liked.
+        :return: a :class:`BallotOrder`.
+        """
+        return BallotOrder([self.candidates_as_list_[i] for i in order], candidates=self.rule_.candidates_)
+
+    @cached_property
+    def _results_(self) -> dict:
+        results = {}
+        w = self._sincere_winner_index_
+        majority_favorite = self._majority_favorite_criterion() and self._is_majority_favorite()
+        for c in range(len(self.candidates_as_list_)):
+            if c == w:
+                continue
+            coalition = self._coalition(c)
+            k = int(self.weights_[coalition].sum())
+            if k == 0 or majority_favorite:
+                results[c] = (False, None)
+                continue
+            result, ballots = self._manipulation(c, coalition, k)
+            if result and self.verify and not self._check(c, coalition, ballots):
+                result, ballots = None, None
+            results[c] = (result, ballots)
+        return results
+
+    def _majority_favorite_criterion(self) -> bool:
+        """
+        Whether the rule meets the majority favorite criterion (cf. :meth:`_is_majority_favorite`).
+
+        :return: a bool. Default: False.
+        """
+        return False
+
+    @cached_property
+    def is_cm_by_candidate_(self) -> NiceDict:
+        """
+        Coalitional manipulability in favor of each candidate.
+
+        :return: a :class:`NiceDict`. For each candidate other than the sincere winner: True if the election is
+            coalitionally manipulable in favor of this candidate, False if it is not, None if the algorithm cannot
+            decide.
+        """
+        return NiceDict({self.candidates_as_list_[c]: result for c, (result, _) in self._results_.items()})
+
+    @cached_property
+    def is_cm_(self) -> object:
+        """
+        Coalitional manipulability.
+
+        :return: True if the election is coalitionally manipulable (in favor of some candidate), False if it is not,
+            None if the algorithm cannot decide.
+        """
+        results = self.is_cm_by_candidate_.values()
+        if any(result is True for result in results):
+            return True
+        if all(result is False for result in results):
+            return False
+        return None
+
+    @cached_property
+    def examples_(self) -> NiceDict:
+        """
+        Examples of manipulations.
+
+        :return: a :class:`NiceDict`. For each candidate `c` in favor of whom a manipulation was found, a
+            :class:`Profile` with the ballots that the voters who prefer `c` to the sincere winner can cast to make
+            `c` win (and the number of voters casting each ballot).
+        """
+        return NiceDict({
+            self.candidates_as_list_[c]: Profile([self._ballot(order) for order in ballots],
+                                                 weights=list(ballots.values()))
+            for c, (result, ballots) in self._results_.items() if result})
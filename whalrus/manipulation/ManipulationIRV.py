@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from whalrus.manipulation.Manipulation import Manipulation
+from whalrus.priority.Priority import Priority
+from whalrus.elimination.EliminationLast import EliminationLast
+from whalrus.rule.RuleIRV import RuleIRV
+from whalrus.rule.RulePlurality import RulePlurality
+
+
+class ManipulationIRV(Manipulation):
+    """
+    Coalitional manipulation of :class:`RuleIRV`.
+
+    :param `*args`: cf. parent class.
+    :param max_nodes: the maximal number of nodes explored by the search, for each candidate. If it is reached, the
+        result for this candidate is None (undecided).
+    :param `**kwargs`: cf. parent class.
+
+    >>> from whalrus.priority.Priority import Priority
+    >>> rule = RuleIRV(['a > b > c', 'b > a > c', 'c > b > a'], weights=[4, 2, 3], tie_break=Priority.ASCENDING)
+    >>> manipulation = ManipulationIRV(rule)
+    >>> manipulation.sincere_winner_
+    'a'
+    >>> manipulation.is_cm_by_candidate_
+    {'b': True, 'c': False}
+    >>> print(manipulation.examples_['b'])
+    (5): b > a > c
+
+    The manipulators need to choose the order in which the candidates are eliminated. The search explores these
+    orders, round by round, and prunes an order as soon as one of its rounds is infeasible. For a given order, the
+    feasibility is decided exactly, using the per-round structure of the elimination: a manipulator votes for a
+    candidate until it is eliminated, then for her next choice among the remaining candidates. At each round, with
+    the candidate `e` to be eliminated, each other remaining candidate receives just enough manipulators to be above
+    `e`. These manipulators are taken among the `floating` ones, i.e. those who have not been assigned to a remaining
+    candidate yet (at the beginning: all of them; then also those whose candidate was eliminated). This is optimal:
+    a floating manipulator can be assigned afterwards to any remaining candidate (it only helps this candidate in
+    the previous rounds), and the floating manipulators that are still there at the end vote for `c`.
+
+    Before that, a necessary condition is checked for each set of remaining candidates (with memoization): even if
+    all the manipulators were floating at each round, is there an order where they can lift the candidates above the
+    eliminated one at each round? Then, the states (remaining candidates, number of manipulators assigned to each of
+    them) that lead to no manipulation are memorized. If more than :attr:`max_nodes` states are explored, the result
+    is None (undecided).
+    """
+
+    def __init__(self, *args, max_nodes: int = 100000, **kwargs):
+        self.max_nodes = max_nodes
+        super().__init__(*args, **kwargs)
+
+    def __call__(self, rule: RuleIRV):
+        if not (isinstance(rule.base_rule, RulePlurality) and isinstance(rule.elimination, EliminationLast)
+                and rule.elimination.k == 1):
+            raise NotImplementedError('Only RuleIRV with its default base rule and elimination is supported.')
+        return super().__call__(rule)
+
+    def _tie_break(self) -> Priority:
+        # The eliminations use the priority of the base rule, unless it is overridden by the one of the IRV rule.
+        if self.rule_.propagate_tie_break:
+            return self.rule_.tie_break
+        return self.rule_.base_rule.tie_break
+
+    def _majority_favorite_criterion(self) -> bool:
+        return True
+
+    def _manipulation(self, c: int, coalition: np.ndarray, k: int) -> tuple:
+        n_candidates = len(self.candidates_as_list_)
+        sincere = ~coalition
+        failures = set()
+        scores_cache = {}
+        relaxed_cache = {}
+        n_nodes = 0
+
+        def scores(remaining: tuple) -> list:
+            # Plurality scores of the sincere voters, restricted to the remaining candidates.
+            if remaining not in scores_cache:
+                candidates = np.zeros(n_candidates, dtype=bool)
+                candidates[list(remaining)] = True
+                scores_cache[remaining] = self._plurality_scores(candidates, sincere).tolist()
+            return scores_cache[remaining]
+
+        def needs(remaining: tuple, e: int, totals: dict) -> dict:
+            # Number of additional manipulators needed by each other remaining candidate to be above `e`.
+            return {x: max(totals[e] - totals[x] + (0 if self._beats(0, x, 0, e) else 1), 0)
+                    for x in remaining if x != e}
+
+        def relaxed(remaining: tuple) -> bool:
+            # Whether `c` could win if all the manipulators were floating at each round. This is a necessary
+            # condition, which only depends on the remaining candidates.
+            if len(remaining) == 1:
+                return True
+            if remaining not in relaxed_cache:
+                s = scores(remaining)
+                totals = {x: s[x] for x in remaining}
+                relaxed_cache[remaining] = any(
+                    e != c and sum(needs(remaining, e, totals).values()) <= k
+                    and relaxed(tuple(x for x in remaining if x != e)) for e in remaining)
+            return relaxed_cache[remaining]
+
+        def search(remaining: tuple, floating: list, locked: dict) -> tuple:
+            # `locked[x]` is the list of the groups of manipulators who vote for `x` until it is eliminated, and
+            # `floating` the list of the other groups. A group is a pair (chain, weight), where the chain is the tuple
+            # of the candidates for whom these manipulators have voted so far.
+            nonlocal n_nodes
+            if len(remaining) == 1:
+                groups = [(chain + (c,), weight) for chain, weight in floating]
+                return True, groups + [group for x in locked for group in locked[x]]
+            votes = {x: sum(weight for _, weight in locked.get(x, [])) for x in remaining}
+            state = (remaining, tuple(votes[x] for x in remaining))
+            if state in failures or not relaxed(remaining):
+                return False, None
+            n_nodes += 1
+            if n_nodes > self.max_nodes:
+                return None, None
+            s = scores(remaining)
+            totals = {x: s[x] + votes[x] for x in remaining}
+            n_floating = sum(weight for _, weight in floating)
+            for e in sorted(remaining, key=lambda x: totals[x]):
+                if e == c:
+                    continue
+                # Each other candidate gets just enough floating manipulators to be above `e`.
+                needs_e = needs(remaining, e, totals)
+                if sum(needs_e.values()) > n_floating:
+                    continue
+                new_floating = list(floating)
+                new_locked = {x: list(groups) for x, groups in locked.items()}
+                for x, need in needs_e.items():
+                    while need > 0:
+                        chain, weight = new_floating.pop()
+                        if weight > need:
+                            new_floating.append((chain, weight - need))
+                            weight = need
+                        new_locked.setdefault(x, []).append((chain + (x,), weight))
+                        need -= weight
+                new_floating += new_locked.pop(e, [])
+                result, groups = search(tuple(x for x in remaining if x != e), new_floating, new_locked)
+                if result or result is None:
+                    return result, groups
+            failures.add(state)
+            return False, None
+
+        result, groups = search(tuple(range(n_candidates)), [((), k)], {})
+        if not result:
+            return result, None
+        ballots = {}
+        for chain, weight in groups:
+            order = chain + tuple(x for x in range(n_candidates) if x not in chain)
+            ballots[order] = ballots.get(order, 0) + weight
+        return True, ballots
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from collections import Counter
+from whalrus.ballot.BallotOrder import BallotOrder
+from whalrus.manipulation.Manipulation import Manipulation
+from whalrus.utils.Utils import cached_property
+
+
+class ManipulationPositional(Manipulation):
+    """
+    Coalitional manipulation of a positional scoring rule.
+
+    :param `*args`: cf. parent class.
+    :param `**kwargs`: cf. parent class.
+
+    This works with :class:`RulePlurality`, :class:`RuleVeto`, :class:`RuleBorda`, :class:`RuleKApproval` and
+    :class:`RuleScorePositional`. The points of each position are read from the rule, by evaluating it on a single
+    ballot.
+
+    >>> from whalrus.rule.RulePlurality import RulePlurality
+    >>> from whalrus.priority.Priority import Priority
+    >>> rule = RulePlurality(['a > b > c', 'b > c > a', 'c > a > b'], weights=[4, 3, 2], tie_break=Priority.ASCENDING)
+    >>> manipulation = ManipulationPositional(rule)
+    >>> manipulation.sincere_winner_
+    'a'
+    >>> manipulation.is_cm_
+    True
+    >>> manipulation.is_cm_by_candidate_
+    {'b': False, 'c': True}
+    >>> print(manipulation.examples_['c'])
+    (5): c > b > a
+
+    The manipulators are the voters who prefer `c` to the sincere winner. Each of them, in turn, puts `c` first and
+    gives the most points to the opponents of `c` that have the fewest points so far (consecutive manipulators who
+    would cast the same ballot are processed at once). For the rules where all
+    positions but the first are worth the same (e.g. plurality) or all positions but the last are worth the same
+    (e.g. veto), this greedy algorithm is exact. For the other rules (e.g. Borda), when it fails, some necessary
+    conditions are checked: if they do not hold, the election is not manipulable in favor of `c`; otherwise, the
+    result is None (undecided).
+
+    >>> from whalrus.rule.RuleBorda import RuleBorda
+    >>> rule = RuleBorda(['a > b > c > d', 'b > a > c > d', 'c > d > a > b'], weights=[3, 2, 2],
+    ...                  tie_break=Priority.ASCENDING)
+    >>> ManipulationPositional(rule).is_cm_by_candidate_
+    {'b': True, 'c': False, 'd': False}
+    """
+
+    @cached_property
+    def points_(self) -> list:
+        """
+        The points of each position.
+
+        :return: a list. ``points_[i]`` is the number of points of a candidate ranked in position `i` (0 for the most
+            liked).
+        """
+        rule = self.rule_.clone()(ballots=[BallotOrder(self.candidates_as_list_, candidates=self.rule_.candidates_)],
+                                  candidates=self.rule_.candidates_)
+        return [rule.gross_scores_[c] for c in self.candidates_as_list_]
+
+    @cached_property
+    def is_greedy_exact_(self) -> bool:
+        """
+        Whether the greedy algorithm is exact for this rule.
+
+        :return: True if all positions but the first are worth the same (e.g. plurality), or all positions but the
+            last are worth the same (e.g. veto).
+        """
+        return len(set(self.points_[1:])) <= 1 or len(set(self.points_[:-1])) <= 1
+
+    def _manipulation(self, c: int, coalition: np.ndarray, k: int) -> tuple:
+        points = self.points_
+        n_candidates = len(points)
+        # The dtype is int when the points are ints, and object for exact fractions.
+        contributions = np.array(points)[np.newaxis, :] * self.weights_[~coalition, np.newaxis]
+        scores = np.zeros(n_candidates, dtype=contributions.dtype)
+        np.add.at(scores, self.rankings_[~coalition], contributions)
+        scores = scores.tolist()
+        # Greedy algorithm.
+        greedy_scores = list(scores)
+        greedy_scores[c] += k * points[0]
+        ballots = Counter()
+        others = [d for d in range(n_candidates) if d != c]
+        remaining = k
+        while remaining > 0:
+            # The opponents that are the least dangerous for `c` come first, and receive the most points.
+            others.sort(key=lambda d: (greedy_scores[d], self._beats(greedy_scores[d], d, greedy_scores[c], c)))
+            # The next manipulators cast the same ballot, as long as the order of the opponents stays the same.
+            repeat = remaining
+            for position in range(1, n_candidates - 1):
+                delta = points[position] - points[position + 1]
+                if delta > 0:
+                    gap = greedy_scores[others[position]] - greedy_scores[others[position - 1]]
+                    repeat = min(repeat, max(1, -(-gap // delta)))
+            for position, d in enumerate(others, 1):
+                greedy_scores[d] += repeat * points[position]
+            ballots[(c, *others)] += repeat
+            remaining -= repeat
+        if all(self._beats(greedy_scores[c], c, greedy_scores[d], d) for d in range(n_candidates) if d != c):
+            return True, dict(ballots)
+        if self.is_greedy_exact_:
+            return False, None
+        # Necessary conditions: each opponent receives at least `k * points[-1]` points, and all the opponents
+        # together receive `k * (sum(points) - points[0])` points, but each of them can receive at most the points
+        # that keep it (weakly) below `c`, and at most `k * points[1]`.
+        best_c = scores[c] + k * points[0]
+        capacities = [best_c - scores[d] for d in others]
+        if any(capacity < k * points[-1] for capacity in capacities):
+            return False, None
+        if sum(min(capacity, k * points[1]) for capacity in capacities) < k * (sum(points) - points[0]):
+            return False, None
+        return None, None
+
+    def _majority_favorite_criterion(self) -> bool:
+        return len(set(self.points_[1:])) <= 1
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from whalrus.manipulation.Manipulation import Manipulation
+from whalrus.priority.Priority import Priority
+from whalrus.elimination.EliminationLast import EliminationLast
+from whalrus.rule.RulePlurality import RulePlurality
+from whalrus.rule.RuleTwoRound import RuleTwoRound
+
+
+class ManipulationTwoRound(Manipulation):
+    """
+    Coalitional manipulation of :class:`RuleTwoRound` (with its default settings: plurality at both rounds).
+
+    :param `*args`: cf. parent class.
+    :param `**kwargs`: cf. parent class.
+
+    >>> from whalrus.priority.Priority import Priority
+    >>> rule = RuleTwoRound(['a > b > c', 'b > a > c', 'c > b > a'], weights=[4, 2, 3],
+    ...                     tie_break=Priority.ASCENDING)
+    >>> manipulation = ManipulationTwoRound(rule)
+    >>> manipulation.sincere_winner_
+    'a'
+    >>> manipulation.is_cm_by_candidate_
+    {'b': True, 'c': False}
+    >>> print(manipulation.examples_['b'])
+    (5): b > a > c
+
+    For each possible opponent `d` of `c` in the second round, the algorithm is exact and immediate. The manipulators
+    only cast two kinds of ballots: `c > d > ...` and `d > c > ...`. The second kind is only useful to qualify `d`
+    for the second round, but it gives votes to `d` in the second round. So the manipulators cast the minimal number
+    of ballots `d > c > ...` that qualifies `d`; then `c` must be qualified and win the second round.
+    """
+
+    def __call__(self, rule: RuleTwoRound):
+        if not (all(isinstance(r, RulePlurality) for r in rule.rules) and len(rule.eliminations) == 1
+                and isinstance(rule.eliminations[0], EliminationLast) and rule.eliminations[0].k == -2):
+            raise NotImplementedError('Only RuleTwoRound with its default rules and elimination is supported.')
+        return super().__call__(rule)
+
+    def _tie_break(self) -> Priority:
+        return self.rule_.tie_break
+
+    def _majority_favorite_criterion(self) -> bool:
+        return True
+
+    def _manipulation(self, c: int, coalition: np.ndarray, k: int) -> tuple:
+        n_candidates = len(self.candidates_as_list_)
+        sincere = ~coalition
+        scores = self._plurality_scores(np.ones(n_candidates, dtype=bool), sincere).tolist()
+        positions = self.positions_[sincere]
+        weights = self.weights_[sincere]
+        for d in range(n_candidates):
+            if d == c:
+                continue
+            others = [x for x in range(n_candidates) if x not in {c, d}]
+            # Minimal number of ballots `d > c > ...` so that `d` is above all the other candidates.
+            b = max([scores[x] - scores[d] + (0 if self._beats(0, d, 0, x) else 1) for x in others] + [0])
+            a = k - b
+            if a < 0:
+                continue
+            if not all(self._beats(scores[c] + a, c, scores[x], x) for x in others):
+                continue
+            score_c = int(weights[positions[:, c] < positions[:, d]].sum()) + a
+            score_d = int(weights[positions[:, d] < positions[:, c]].sum()) + b
+            if not self._beats(score_c, c, score_d, d):
+                continue
+            rest = tuple(others)
+            ballots = {(c, d) + rest: a, (d, c) + rest: b}
+            return True, {order: weight for order, weight in ballots.items() if weight > 0}
+        return False, None
@@ -20,14 +20,16 @@ along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
 import logging
 import numpy as np
-from whalrus.utils.Utils import DeleteCacheMixin, cached_property, NiceSet, set_to_list, NiceDict
+from whalrus.utils.Utils import DeleteCacheMixin, CloneMixin, cached_property, NiceSet, set_to_list, NiceDict, \
+    NiceMatrixView, convert_number, encode_numbers, decode_numbers, encode_labels
 from whalrus.converter_ballot.ConverterBallotGeneral import ConverterBallotGeneral
 from whalrus.profile.Profile import Profile
+from whalrus.profile.ProfileSubscriberMixin import ProfileSubscriberMixin
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
 from typing import Union
 
 
-class Matrix(DeleteCacheMixin):
+class Matrix(DeleteCacheMixin, CloneMixin, ProfileSubscriberMixin):
     """
     A way to compute a matrix from a profile.
 
@@ -39,7 +41,8 @@ class Matrix(DeleteCacheMixin):
     A :class:`Matrix` object is a callable whose inputs are ballots and optionally weights, voters and candidates. When
     it is called, it loads the profile. The output of the call is the :class:`Matrix` object itself.
     But after the call, you can access to the computed variables (ending with an underscore), such as
-    :attr:`as_dict_` or :attr:`as_array_`.
+    :attr:`as_dict_` or :attr:`as_array_`. If the matrix is called with a :class:`Profile` and ``follow=True``, then it
+    follows the changes of this profile (cf. :meth:`Profile.subscribe`).
 
     Cf. :class:`MatrixWeightedMajority` for some examples.
 
@@ -69,10 +72,11 @@ class Matrix(DeleteCacheMixin):
             self(*args, **kwargs)
 
     def __call__(self, ballots: Union[list, Profile] = None, weights: list = None, voters: list = None,
-                 candidates: set = None):
+                 candidates: set = None, follow: bool = False):
         self.profile_original_ = Profile(ballots, weights=weights, voters=voters)
         self.profile_converted_ = Profile([self.converter(b, candidates) for b in self.profile_original_],
                                           weights=self.profile_original_.weights, voters=self.profile_original_.voters)
+        self._subscribe(ballots, weights=weights, voters=voters, candidates=candidates, follow=follow)
         if candidates is None:
             candidates = NiceSet(set().union(*[b.candidates for b in self.profile_converted_]))
         self.candidates_ = candidates
@@ -84,15 +88,6 @@ class Matrix(DeleteCacheMixin):
         if any([b.candidates != candidates for b in self.profile_converted_]):
             logging.warning('Some ballots do not have the same set of candidates as the whole election.')
 
-    @cached_property
-    def as_dict_(self) -> NiceDict:
-        """
-        The matrix, as a :class:`NiceDict`.
-
-        :return: a :class:`NiceDict`. Keys are pairs of candidates, and values are the coefficients of the matrix.
-        """
-        raise NotImplementedError
-
     @cached_property
     def candidates_as_list_(self) -> list:
         """
@@ -118,8 +113,33 @@ class Matrix(DeleteCacheMixin):
 
         :return: a numpy array. Each row and each column corresponds to a candidate (in the order of
             :attr:`candidates_as_list_`).
+
+        This is the attribute that subclasses must implement: all the other representations of the matrix are
+        derived from it.
         """
-        return np.array([[self.as_dict_[(c, d)] for d in self.candidates_as_list_] for c in self.candidates_as_list_])
+        raise NotImplementedError
+
+    @cached_property
+    def as_dict_(self) -> NiceMatrixView:
+        """
+        The matrix, as a dictionary.
+
+        :return: a :class:`NiceMatrixView`. Keys are pairs of candidates, and values are the coefficients of the
+            matrix. It is a read-only view of :attr:`as_array_`.
+        """
+        return NiceMatrixView(self.as_array_, self.candidates_as_list_, self.candidates_indexes_)
+
+    @cached_property
+    def as_array_off_diagonal_(self) -> np.array:
+        """
+        The non-diagonal coefficients of the matrix, as a numpy array.
+
+        :return: a numpy array with one row per candidate (in the order of :attr:`candidates_as_list_`) and one column
+            less than :attr:`as_array_`: each row contains the coefficients of the corresponding row of
+            :attr:`as_array_`, except the diagonal coefficient. This allows for vectorized operations on the rows.
+        """
+        n = len(self.candidates_as_list_)
+        return self.as_array_[~np.eye(n, dtype=bool)].reshape(n, max(n - 1, 0))
 
     @cached_property
     def as_array_of_floats_(self) -> np.array:
@@ -129,3 +149,62 @@ class Matrix(DeleteCacheMixin):
         :return: :attr:`as_array_`, converted to floats.
         """
         return self.as_array_.astype(float)
+
+    def to_npz(self, file) -> None:
+        """
+        Save the matrix in the ``.npz`` format of numpy.
+
+        :param file: a file name or a file-like object (cf. ``numpy.savez_compressed``).
+
+        The file contains the candidates (which must all be strings or all be integers) and :attr:`as_array_`. It
+        contains only numpy arrays, so that it can be read without unpickling anything (cf. :meth:`from_npz`).
+        Exact coefficients (fractions) are saved as numerators and denominators, so that they remain exact.
+
+        >>> import io
+        >>> from whalrus.matrix.MatrixWeightedMajority import MatrixWeightedMajority
+        >>> f = io.BytesIO()
+        >>> matrix = MatrixWeightedMajority(['a > b > c', 'b > a > c', 'c > a > b'])
+        >>> matrix.to_npz(f)
+        >>> _ = f.seek(0)
+        >>> view = Matrix.from_npz(f)
+        >>> view[('a', 'b')]
+        Fraction(2, 3)
+        >>> dict(view) == dict(matrix.as_dict_)
+        True
+        """
+        if self.as_array_.dtype.kind in 'iuf':
+            arrays = {'matrix': self.as_array_}
+        else:
+            arrays = encode_numbers([convert_number(x) for x in self.as_array_.ravel().tolist()], 'matrix')
+            if arrays is None:
+                raise TypeError('The coefficients of the matrix cannot be saved in the npz format.')
+        np.savez_compressed(file, candidates=encode_labels(self.candidates_as_list_, 'candidates'), **arrays)
+
+    @staticmethod
+    def from_npz(file) -> NiceMatrixView:
+        """
+        Load a matrix saved with :meth:`to_npz`.
+
+        :param file: a file name or a file-like object.
+        :return: a :class:`NiceMatrixView`, like :attr:`as_dict_`.
+        """
+        with np.load(file, allow_pickle=False) as data:
+            candidates = data['candidates'].tolist()
+            n = len(candidates)
+            if 'matrix' in data:
+                array = data['matrix'].reshape(n, n)
+            else:
+                array = np.array(decode_numbers(data, 'matrix')).reshape(n, n)
+        return NiceMatrixView(array, candidates)
+
+    @staticmethod
+    def _exact_array(array: np.array) -> np.array:
+        """
+        Convert the coefficients of a square array with :func:`convert_number`.
+
+        :param array: a square numpy array.
+        :return: a square numpy array with the converted coefficients. As for an array built from a list of Python
+            numbers, its dtype is int if all the coefficients are integers, and object otherwise.
+        """
+        n = array.shape[0]
+        return np.array([[convert_number(x) for x in row] for row in array.tolist()]).reshape(n, n)
@@ -18,13 +18,14 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
-from whalrus.utils.Utils import cached_property, NiceDict, convert_number
+from whalrus.utils.Utils import cached_property, NiceDict, NiceSet, convert_number, strongly_connected_components
 from whalrus.converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
 from whalrus.matrix.Matrix import Matrix
 from whalrus.matrix.MatrixWeightedMajority import MatrixWeightedMajority
 from numbers import Number
 from fractions import Fraction
+import numpy as np
 
 
 class MatrixMajority(Matrix):
@@ -56,6 +57,17 @@ class MatrixMajority(Matrix):
     array([[0, 1, 1],
            [0, 0, 0],
            [0, 0, 0]])
+
+    The candidates can be split into components, such that all the candidates of a component beat all the candidates
+    of the next ones. The first component is the Smith set:
+
+    >>> m = MatrixMajority(ballots=['a > b > c > d', 'b > c > a > d', 'c > a > b > d'])
+    >>> m.components_
+    [{'a', 'b', 'c'}, {'d'}]
+    >>> m.smith_set_
+    {'a', 'b', 'c'}
+    >>> m.schwartz_set_
+    {'a', 'b', 'c'}
     """
 
     def __init__(self, *args, converter: ConverterBallot = None, matrix_weighted_majority: Matrix = None,
@@ -79,7 +91,7 @@ class MatrixMajority(Matrix):
 
         :return: the weighted majority matrix (once computed with the given profile).
         """
-        return self.matrix_weighted_majority(self.profile_converted_)
+        return self.matrix_weighted_majority.clone()(self.profile_converted_, follow=self.follows_profile)
 
     @cached_property
     def candidates_as_list_(self) -> list:
@@ -90,13 +102,60 @@ class MatrixMajority(Matrix):
         return self.matrix_weighted_majority_.candidates_indexes_
 
     @cached_property
-    def as_dict_(self):
-        def convert(x, y):
-            if x == y:
-                return self.equal
-            return self.greater if x > y else self.lower
-        weighted_as_dict = self.matrix_weighted_majority_.as_dict_
-        return NiceDict({
-            (c, d): self.diagonal if c == d else convert(weighted_as_dict[(c, d)], weighted_as_dict[(d, c)])
-            for (c, d) in weighted_as_dict.keys()
-        })
+    def as_array_(self):
+        weighted = self.matrix_weighted_majority_.as_array_
+        result = np.full(weighted.shape, self.equal, dtype=object)
+        result[weighted > weighted.T] = self.greater
+        result[weighted < weighted.T] = self.lower
+        np.fill_diagonal(result, self.diagonal)
+        return self._exact_array(result)
+
+    # Components
+    # ----------
+
+    @cached_property
+    def components_(self) -> list:
+        """
+        The components of the majority graph.
+
+        :return: a list of :class:`NiceSet`. These are the strongly connected components of the graph where there is
+            an edge from `c` to `d` iff `W(c, d) >= W(d, c)`. They are sorted so that each candidate beats (in the
+            sense `W(c, d) > W(d, c)`) all the candidates of the next components. They are computed with Tarjan's
+            algorithm, whose cost is quadratic in the number of candidates.
+        """
+        weighted = self.matrix_weighted_majority_.as_array_
+        components = strongly_connected_components((weighted >= weighted.T).astype(bool))
+        return [NiceSet(self.candidates_as_list_[i] for i in component) for component in components]
+
+    @cached_property
+    def smith_set_(self) -> NiceSet:
+        """
+        The Smith set.
+
+        :return: a :class:`NiceSet`: the smallest non-empty set of candidates that beat all the other candidates
+            (in the sense `W(c, d) > W(d, c)`). This is the first element of :attr:`components_`.
+        """
+        return self.components_[0]
+
+    @cached_property
+    def schwartz_set_(self) -> NiceSet:
+        """
+        The Schwartz set.
+
+        :return: a :class:`NiceSet`: the union of the minimal non-empty sets of candidates that are beaten by no
+            other candidate (in the sense `W(c, d) > W(d, c)`). It is included in :attr:`smith_set_`.
+
+        >>> m = MatrixMajority(ballots=['a > b > c', 'b > c > a'])
+        >>> m.smith_set_
+        {'a', 'b', 'c'}
+        >>> m.schwartz_set_
+        {'a', 'b'}
+        """
+        weighted = self.matrix_weighted_majority_.as_array_
+        victories = (weighted > weighted.T).astype(bool)
+        result = NiceSet()
+        for component in strongly_connected_components(victories):
+            others = [i for i in range(len(victories)) if i not in component]
+            if not victories[np.ix_(others, component)].any():
+                result |= {self.candidates_as_list_[i] for i in component}
+        return result
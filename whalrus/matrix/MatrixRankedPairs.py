@@ -19,7 +19,7 @@ You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
 from whalrus.priority.Priority import Priority
-from whalrus.utils.Utils import cached_property, NiceDict
+from whalrus.utils.Utils import cached_property, NiceDict, strongly_connected_components
 from whalrus.converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
 from whalrus.matrix.Matrix import Matrix
@@ -63,6 +63,11 @@ class MatrixRankedPairs(Matrix):
 
     >>> MatrixRankedPairs(['a > b > c'], tie_break=Priority.ASCENDING).edges_order_
     [('a', 'c'), ('a', 'b'), ('b', 'c')]
+
+    The candidates are split into the strongly connected components of the graph where there is an edge `(c, d)` iff
+    `W(c, d) >= W(d, c)`. An edge from a component to a later one never creates a cycle, so all these edges are in the
+    ranked pairs matrix, and the cycles are only checked inside each component. When the majority graph has a clear
+    hierarchy, the components are small and the computation is much faster.
     """
 
     def __init__(self, *args, converter: ConverterBallot = None, matrix_weighted_majority: Matrix = None,
@@ -82,7 +87,7 @@ class MatrixRankedPairs(Matrix):
 
         :return: the weighted majority matrix (once computed with the given profile).
         """
-        return self.matrix_weighted_majority(self.profile_converted_)
+        return self.matrix_weighted_majority.clone()(self.profile_converted_, follow=self.follows_profile)
 
     @cached_property
     def candidates_as_list_(self) -> list:
@@ -100,30 +105,34 @@ class MatrixRankedPairs(Matrix):
         :return: a list of pairs of candidates. E.g. ``[('b', 'c'), ('c', 'a'), ('a', 'b')]``, where ('b', 'c') is the
             first edge to add.
         """
-        m = self.matrix_weighted_majority_
+        weighted = self.matrix_weighted_majority_.as_array_
+        n = len(self.candidates_as_list_)
+        rows, columns = np.nonzero((weighted >= weighted.T) & ~np.eye(n, dtype=bool))
+        duels_by_value = dict()
+        for i, j, value in zip(rows.tolist(), columns.tolist(), weighted[rows, columns].tolist()):
+            duels_by_value.setdefault(value, set()).add((self.candidates_as_list_[i], self.candidates_as_list_[j]))
         return list(chain(*[
-            self.tie_break.sort_pairs_rp({
-                (c, d) for (c, d), v in m.as_dict_.items()
-                if v == value and c != d and m.as_dict_[(c, d)] >= m.as_dict_[(d, c)]
-            })
-            for value in sorted(set(m.as_dict_.values()), reverse=True)
+            self.tie_break.sort_pairs_rp(duels_by_value[value])
+            for value in sorted(duels_by_value.keys(), reverse=True)
         ]))
 
     @cached_property
     def as_array_(self):
-        n = len(self.candidates_)
+        weighted = self.matrix_weighted_majority_.as_array_
+        n = len(self.candidates_as_list_)
+        components = strongly_connected_components((weighted >= weighted.T).astype(bool))
+        component_of = np.zeros(n, dtype=int)
+        for k, component in enumerate(components):
+            component_of[component] = k
         rp = np.zeros((n, n), dtype=object)
+        rp[component_of[:, np.newaxis] < component_of[np.newaxis, :]] = 1
         for (c, d) in self.edges_order_:
-            i = self.matrix_weighted_majority_.candidates_indexes_[c]
-            j = self.matrix_weighted_majority_.candidates_indexes_[d]
-            if rp[j, i] > 0:
+            i = self.candidates_indexes_[c]
+            j = self.candidates_indexes_[d]
+            if component_of[i] != component_of[j] or rp[j, i] > 0:
                 continue
+            component = components[component_of[i]]
             rp[i, j] = 1
-            rp[i, :] = np.maximum(rp[i, :], rp[j, :])
-            rp[:, j] = np.maximum(rp[:, i], rp[:, j])
+            rp[i, component] = np.maximum(rp[i, component], rp[j, component])
+            rp[component, j] = np.maximum(rp[component, i], rp[component, j])
         return rp
-
-    @cached_property
-    def as_dict_(self):
-        return NiceDict({(c, d): self.as_array_[self.candidates_indexes_[c], self.candidates_indexes_[d]]
-                         for c in self.candidates_ for d in self.candidates_})
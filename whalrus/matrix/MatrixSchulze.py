@@ -62,7 +62,7 @@ class MatrixSchulze(Matrix):
 
         :return: the weighted majority matrix (once computed with the given profile).
         """
-        return self.matrix_weighted_majority(self.profile_converted_)
+        return self.matrix_weighted_majority.clone()(self.profile_converted_, follow=self.follows_profile)
 
     @cached_property
     def candidates_as_list_(self) -> list:
@@ -74,19 +74,26 @@ class MatrixSchulze(Matrix):
 
     @cached_property
     def as_array_(self):
-        widest_path = np.copy(self.matrix_weighted_majority_.as_array_)
-        n = len(self.candidates_)
+        return self._widest_paths(self.matrix_weighted_majority_.as_array_)
+
+    @staticmethod
+    def _widest_paths(weighted: np.ndarray) -> np.ndarray:
+        """
+        Widest paths.
+
+        :param weighted: a square array (the weighted majority matrix of some candidates).
+        :return: a square array. For each pair of distinct candidates `(c, d)`, it gives the width of the widest path
+            from `c` to `d` (cf. :class:`MatrixSchulze`). The diagonal coefficients are the ones of `weighted`.
+        """
+        widest_path = np.copy(weighted)
+        n = widest_path.shape[0]
+        off_diagonal = ~np.eye(n, dtype=bool)
         for i in range(n):
-            for j in range(n):
-                if i == j:
-                    continue
-                for k in range(n):
-                    if k == i or k == j:
-                        continue
-                    widest_path[j, k] = max(widest_path[j, k], min(widest_path[j, i], widest_path[i, k]))
+            # Paths from j to k through i, for all j, k distinct from i and from each other. Row and column i are not
+            # modified during this step, hence all the pairs (j, k) can be updated at once.
+            through_i = np.minimum(widest_path[:, i:i + 1], widest_path[i:i + 1, :])
+            mask = off_diagonal.copy()
+            mask[i, :] = False
+            mask[:, i] = False
+            widest_path[mask] = np.maximum(widest_path, through_i)[mask]
         return widest_path
-
-    @cached_property
-    def as_dict_(self):
-        return NiceDict({(c, d): self.as_array_[self.candidates_indexes_[c], self.candidates_indexes_[d]]
-                         for c in self.candidates_ for d in self.candidates_})
@@ -18,13 +18,15 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
-from whalrus.utils.Utils import cached_property, NiceDict, convert_number, my_division
+from whalrus.utils.Utils import cached_property, NiceMatrixView, convert_number, my_division
 from whalrus.converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
+from whalrus.ballot.BallotOrder import BallotOrder
 from typing import Union
 from whalrus.matrix.Matrix import Matrix
 from numbers import Number
 from fractions import Fraction
+import numpy as np
 
 
 class MatrixWeightedMajority(Matrix):
@@ -141,79 +143,155 @@ class MatrixWeightedMajority(Matrix):
         self.antisymmetric = antisymmetric
         super().__init__(*args, converter=converter, **kwargs)
 
+    def _situations(self, codes: np.array):
+        """
+        Auxiliary generator used by :meth:`_tally`.
+
+        :param codes: a numpy array with one row per ballot and one column per candidate. The code of a candidate is
+            its rank in the ballot (0 for the top indifference class) if it is ordered, ``n`` if it is unordered and
+            ``n + 1`` if it is absent, where ``n`` is the number of candidates.
+        :return: for each scoring parameter that is not None, a pair ``(parameter, mask)``, where ``mask`` is a boolean
+            numpy array indicating, for each ballot and each pair of candidates `(c, d)`, whether the ballot is in the
+            situation corresponding to this parameter (including the diagonal, which is dealt with afterwards).
+        """
+        n = codes.shape[1]
+        c_code, d_code = codes[:, :, np.newaxis], codes[:, np.newaxis, :]
+        c_ordered, d_ordered = c_code < n, d_code < n
+        c_unordered, d_unordered = c_code == n, d_code == n
+        c_absent, d_absent = c_code > n, d_code > n
+        situations = [
+            (self.higher_vs_lower, lambda: c_ordered & d_ordered & (c_code < d_code)),
+            (self.lower_vs_higher, lambda: c_ordered & d_ordered & (c_code > d_code)),
+            (self.indifference, lambda: c_ordered & (c_code == d_code)),
+            (self.ordered_vs_unordered, lambda: c_ordered & d_unordered),
+            (self.unordered_vs_ordered, lambda: c_unordered & d_ordered),
+            (self.unordered_vs_unordered, lambda: c_unordered & d_unordered),
+            (self.ordered_vs_absent, lambda: c_ordered & d_absent),
+            (self.absent_vs_ordered, lambda: c_absent & d_ordered),
+            (self.unordered_vs_absent, lambda: c_unordered & d_absent),
+            (self.absent_vs_unordered, lambda: c_absent & d_unordered),
+            (self.absent_vs_absent, lambda: c_absent & d_absent),
+        ]
+        for parameter, mask in situations:
+            if parameter is not None:
+                yield parameter, mask()
+
+    def _code(self, ballot: BallotOrder) -> list:
+        """
+        Code a ballot as a row for :meth:`_situations`.
+
+        :param ballot: a ballot.
+        :return: a list. For each candidate (in the order of :attr:`candidates_as_list_`), its rank in the ballot if it
+            is ordered, ``n`` if it is unordered, ``n + 1`` if it is absent.
+        """
+        n = len(self.candidates_as_list_)
+        row = [n + 1] * n
+        for rank, indifference_class in enumerate(ballot.as_weak_order):
+            for c in indifference_class:
+                row[self.candidates_indexes_[c]] = rank
+        for c in ballot.candidates_not_in_b:
+            row[self.candidates_indexes_[c]] = n
+        return row
+
+    def _tally(self, ballots: list, ballot_weights: list) -> tuple:
+        """
+        Compute the gross matrix and the matrix of weights for some ballots.
+
+        :param ballots: a list of ballots.
+        :param ballot_weights: the list of their weights.
+        :return: a pair of numpy arrays: the gross matrix and the matrix of weights.
+        """
+        n = len(self.candidates_as_list_)
+        if not ballots or n == 0:
+            return np.zeros((n, n), dtype=int), np.zeros((n, n), dtype=int)
+        codes = np.array([self._code(ballot) for ballot in ballots], dtype=int).reshape(-1, n)
+        # Identical ballots are merged, so that the work below depends on the number of distinct ballots.
+        codes, inverse = np.unique(codes, axis=0, return_inverse=True)
+        # Native integers are used only if no sum of weights can overflow them (otherwise, Python integers are used).
+        dtype = object
+        if all(isinstance(w, int) for w in ballot_weights) and sum(abs(w) for w in ballot_weights) <= np.iinfo(int).max:
+            dtype = int
+        code_weights = np.zeros(codes.shape[0], dtype=dtype)
+        np.add.at(code_weights, inverse.reshape(-1), np.array(ballot_weights, dtype=dtype))
+        # Weighted number of ballots in each situation, by chunks of ballots to bound the memory.
+        counts = None
+        chunk = max(1, 2 ** 22 // max(1, n * n))
+        for i in range(0, codes.shape[0], chunk):
+            counts_chunk = [(parameter, np.tensordot(code_weights[i:i + chunk], mask, axes=1))
+                            for parameter, mask in self._situations(codes[i:i + chunk])]
+            if counts is None:
+                counts = counts_chunk
+            else:
+                counts = [(parameter, count + count_chunk)
+                          for (parameter, count), (_, count_chunk) in zip(counts, counts_chunk)]
+        gross = np.zeros((n, n), dtype=dtype)
+        weights = np.zeros((n, n), dtype=dtype)
+        for parameter, count in counts or []:
+            gross = gross + parameter * count
+            weights = weights + count
+        np.fill_diagonal(gross, 0)
+        np.fill_diagonal(weights, 0)
+        return gross, weights
+
+    @cached_property
+    def _ballot_tensors_(self) -> np.ndarray:
+        # An array of shape (number of distinct ballots, 2 * n * n), where n is the number of candidates. For each
+        # ballot of ``profile_converted_.distinct_ballots``, its points for each pair of candidates (flattened), then
+        # its weights for each pair of candidates.
+        n = len(self.candidates_as_list_)
+        ballots = self.profile_converted_.distinct_ballots
+        codes = np.array([self._code(ballot) for ballot in ballots], dtype=int).reshape(-1, n)
+        points = np.zeros((len(ballots), n, n))
+        weights = np.zeros((len(ballots), n, n))
+        for parameter, mask in self._situations(codes):
+            points += float(parameter) * mask
+            weights += mask
+        return np.concatenate([points.reshape(-1, n * n), weights.reshape(-1, n * n)], axis=1)
+
+    def as_array_batch(self, weights: np.ndarray) -> np.ndarray:
+        """
+        The matrix for several weight vectors.
+
+        :param weights: an array of shape (k, number of distinct ballots). Each row gives a weight to each ballot of
+            ``profile_converted_.distinct_ballots`` (cf. :attr:`Profile.distinct_ballots`).
+        :return: an array of floats, of shape (k, number of candidates, number of candidates). For each row of
+            ``weights``, the matrix that :attr:`as_array_` would be with these weights.
+
+        The contribution of each distinct ballot is computed only once, so that the `k` evaluations cost one matrix
+        product:
+
+        >>> matrix = MatrixWeightedMajority(ballots=['a > b', 'b > a', 'a ~ b'])
+        >>> matrix.as_array_batch([[1, 1, 0], [3, 0, 1]])
+        array([[[0.   , 0.5  ],
+                [0.5  , 0.   ]],
+        <BLANKLINE>
+               [[0.   , 0.875],
+                [0.125, 0.   ]]])
+        """
+        n = len(self.candidates_as_list_)
+        totals = np.asarray(weights, dtype=float) @ self._ballot_tensors_
+        gross = totals[:, :n * n].reshape(-1, n, n)
+        weights = totals[:, n * n:].reshape(-1, n, n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = np.where(weights == 0, float(self.default_score), gross / weights)
+        diagonal = np.eye(n, dtype=bool)
+        result[:, diagonal] = float(self.diagonal_score)
+        if self.antisymmetric:
+            result = result - result.transpose(0, 2, 1)
+        return result
+
     @cached_property
     def _gross_and_weights_(self):
-        gross = NiceDict({(c, d): 0 for c in self.candidates_ for d in self.candidates_})
-        weights = NiceDict({(c, d): 0 for c in self.candidates_ for d in self.candidates_})
-        for ballot, weight, _ in self.profile_converted_.items():
-            absent = self.candidates_ - ballot.candidates
-            for i_class, indifference_class in enumerate(ballot.as_weak_order):
-                indifference_class_as_list = list(indifference_class)
-                for i, c in enumerate(indifference_class_as_list):
-                    # Deal with other candidates of the indifference class
-                    if self.indifference is not None:
-                        for d in indifference_class_as_list[i + 1:]:
-                            gross[(c, d)] += weight * self.indifference
-                            gross[(d, c)] += weight * self.indifference
-                            weights[(c, d)] += weight
-                            weights[(d, c)] += weight
-                    # Deal with ordered candidates with lower ranks
-                    if self.higher_vs_lower is not None or self.lower_vs_higher is not None:
-                        for lower_indifference_class in ballot.as_weak_order[i_class + 1:]:
-                            for d in lower_indifference_class:
-                                if self.higher_vs_lower is not None:
-                                    gross[(c, d)] += weight * self.higher_vs_lower
-                                    weights[(c, d)] += weight
-                                if self.lower_vs_higher is not None:
-                                    gross[(d, c)] += weight * self.lower_vs_higher
-                                    weights[(d, c)] += weight
-                    # Deal with unordered candidates
-                    if self.ordered_vs_unordered is not None or self.unordered_vs_ordered is not None:
-                        for d in ballot.candidates_not_in_b:
-                            if self.ordered_vs_unordered is not None:
-                                gross[(c, d)] += weight * self.ordered_vs_unordered
-                                weights[(c, d)] += weight
-                            if self.unordered_vs_ordered is not None:
-                                gross[(d, c)] += weight * self.unordered_vs_ordered
-                                weights[(d, c)] += weight
-                    # Deal with absent candidates
-                    if self.ordered_vs_absent is not None or self.absent_vs_ordered is not None:
-                        for d in absent:
-                            if self.ordered_vs_absent is not None:
-                                gross[(c, d)] += weight + self.ordered_vs_absent
-                                weights[(c, d)] += weight
-                            if self.absent_vs_ordered is not None:
-                                gross[(d, c)] += weight + self.absent_vs_ordered
-                                weights[(d, c)] += weight
-            if (self.unordered_vs_unordered is not None
-                    or self.unordered_vs_absent is not None
-                    or self.absent_vs_unordered is not None):
-                unordered_as_list = list(ballot.candidates_not_in_b)
-                for i, c in enumerate(unordered_as_list):
-                    # Deal with other unordered candidates
-                    if self.unordered_vs_unordered is not None:
-                        for d in unordered_as_list[i + 1:]:
-                            gross[(c, d)] += weight * self.unordered_vs_unordered
-                            gross[(d, c)] += weight * self.unordered_vs_unordered
-                            weights[(c, d)] += weight
-                            weights[(d, c)] += weight
-                    # Deal with absent candidates
-                    for d in absent:
-                        if self.unordered_vs_absent is not None:
-                            gross[(c, d)] += weight * self.unordered_vs_absent
-                            weights[(c, d)] += weight
-                        if self.absent_vs_unordered is not None:
-                            gross[(d, c)] += weight * self.absent_vs_unordered
-                            weights[(d, c)] += weight
-            if self.absent_vs_absent is not None:
-                absent_as_list = list(absent)
-                for i, c in enumerate(absent_as_list):
-                    for d in absent_as_list[i + 1:]:
-                        gross[(c, d)] += weight * self.absent_vs_absent
-                        gross[(d, c)] += weight * self.absent_vs_absent
-                        weights[(c, d)] += weight
-                        weights[(d, c)] += weight
-        return {'gross': gross, 'weights': weights}
+        gross, weights = self._tally(self.profile_converted_.ballots, self.profile_converted_.weights)
+        return {'gross': self._exact_array(gross), 'weights': self._exact_array(weights)}
+
+    def _patch_cache(self, ballot: BallotOrder, weight: Number, voter: object) -> list:
+        if '_gross_and_weights_' not in self._cached_properties:
+            return []
+        gross, weights = self._tally([ballot], [weight])
+        self._gross_and_weights_['gross'] = self._exact_array(self._gross_and_weights_['gross'] + gross)
+        self._gross_and_weights_['weights'] = self._exact_array(self._gross_and_weights_['weights'] + weights)
+        return ['_gross_and_weights_']
 
     @cached_property
     def gross_(self):
@@ -221,22 +299,22 @@ class MatrixWeightedMajority(Matrix):
 
         The "gross" matrix.
 
-        :return: a NiceDict. Keys are pairs of candidates. Each coefficient is the weighted number of points (used as
-            numerator in the average).
+        :return: a :class:`NiceMatrixView`. Keys are pairs of candidates. Each coefficient is the weighted number of
+            points (used as numerator in the average).
 
         >>> from whalrus import MatrixWeightedMajority
         >>> MatrixWeightedMajority(ballots=['a > b', 'a ~ b'], weights=[2, 1]).gross_
         {('a', 'a'): 0, ('a', 'b'): Fraction(5, 2), ('b', 'a'): Fraction(1, 2), ('b', 'b'): 0}
         """
-        return self._gross_and_weights_['gross']
+        return NiceMatrixView(self._gross_and_weights_['gross'], self.candidates_as_list_, self.candidates_indexes_)
 
     @cached_property
     def weights_(self):
         """
         The matrix of weights.
 
-        :return: a NiceDict. Keys are pairs of candidates. Each coefficient is the total weight (used as
-            denominator in the average).
+        :return: a :class:`NiceMatrixView`. Keys are pairs of candidates. Each coefficient is the total weight (used
+            as denominator in the average).
 
         In most usual cases, all non-diagonal coefficients are equal, and are equal to the total weight of all voters:
 
@@ -251,15 +329,18 @@ class MatrixWeightedMajority(Matrix):
         ...                        indifference=None).weights_
         {('a', 'a'): 0, ('a', 'b'): 2, ('b', 'a'): 2, ('b', 'b'): 0}
         """
-        return self._gross_and_weights_['weights']
+        return NiceMatrixView(self._gross_and_weights_['weights'], self.candidates_as_list_, self.candidates_indexes_)
 
     @cached_property
-    def as_dict_(self):
-        net_matrix = {
-            (c, d): self.diagonal_score if c == d else my_division(
-                self.gross_[(c, d)], w, divide_by_zero=self.default_score)
-            for (c, d), w in self.weights_.items()}
+    def as_array_(self):
+        gross = self._gross_and_weights_['gross'].tolist()
+        weights = self._gross_and_weights_['weights'].tolist()
+        n = len(weights)
+        net_matrix = np.array([
+            [self.diagonal_score if i == j else my_division(gross[i][j], weights[i][j],
+                                                            divide_by_zero=self.default_score)
+             for j in range(n)]
+            for i in range(n)], dtype=object).reshape(n, n)
         if self.antisymmetric:
-            return {(c, d): net_matrix[(c, d)] - net_matrix[(d, c)] for (c, d) in net_matrix.keys()}
-        else:
-            return net_matrix
+            net_matrix = net_matrix - net_matrix.T
+        return self._exact_array(net_matrix)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+Memory accounting: the memory retained by an object (typically a rule), split by component.
+
+>>> from whalrus.rule.RuleIRV import RuleIRV
+>>> from whalrus.generators.GeneratorImpartialCulture import GeneratorImpartialCulture
+>>> rule = RuleIRV(GeneratorImpartialCulture(['a', 'b', 'c', 'd'], seed=0)(1000))
+>>> rule.winner_
+'d'
+>>> sizes = report(rule)
+>>> sorted(sizes)
+['ballots', 'caches', 'candidates', 'matrices', 'other', 'parameters', 'rounds', 'total']
+>>> sizes['total'] == sum(size for category, size in sizes.items() if category != 'total')
+True
+
+Most of the memory is used by the profiles and by the rounds (each round has its own rule, with its own profiles).
+Cf. :meth:`Rule.release` to free it once the results are computed:
+
+>>> _ = rule.release(keep=('winner_', ))
+>>> report(rule)['total'] < sizes['total'] / 10
+True
+>>> rule.winner_
+'d'
+"""
+import sys
+import types
+import numpy as np
+from whalrus.utils.Utils import NiceDict
+
+CATEGORIES = ['ballots', 'candidates', 'matrices', 'caches', 'rounds', 'parameters', 'other']
+
+# Objects that are not counted (they are shared by the whole program).
+_SKIPPED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def _children(x: object) -> list:
+    """
+    The objects referenced by an object.
+
+    :param x: an object.
+    :return: a list of pairs `(name, child)`. The name is the name of the attribute or the key in a dictionary (or
+        None).
+    """
+    if isinstance(x, dict):
+        return [(None, key) for key in x.keys()] + [(key, value) for key, value in x.items()]
+    if isinstance(x, (list, tuple, set, frozenset)):
+        return [(None, y) for y in x]
+    if isinstance(x, np.ndarray):
+        result = [] if x.base is None else [(None, x.base)]
+        if x.dtype == object:
+            result += [(None, y) for y in x.flat]
+        return result
+    result = []
+    for cls in type(x).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            if hasattr(x, slot):
+                result.append((slot, getattr(x, slot)))
+    if hasattr(x, '__dict__'):
+        result += list(x.__dict__.items())
+    return result
+
+
+def _own_size(x: object) -> int:
+    """
+    The memory used by an object itself.
+
+    :param x: an object.
+    :return: the size in bytes, including the dictionary of its attributes (if any), but not the objects that it
+        references. For a numpy array that owns its data, the data is included.
+    """
+    size = sys.getsizeof(x)
+    if hasattr(x, '__dict__') and not isinstance(x, _SKIPPED):
+        size += sys.getsizeof(x.__dict__)
+    return size
+
+
+def _category(category: str, name: object, child: object) -> str:
+    """
+    The category of an object referenced by another one.
+
+    :param category: the category of the parent object.
+    :param name: the name of the attribute or the key (cf. :func:`_children`).
+    :param child: the child object.
+    :return: the category of the child.
+    """
+    from whalrus.rule.Rule import Rule
+    from whalrus.elimination.Elimination import Elimination
+    from whalrus.matrix.Matrix import Matrix
+    from whalrus.profile.Profile import Profile
+    from whalrus.ballot.Ballot import Ballot
+    if category in {'rounds', 'matrices'}:
+        return category
+    if category == 'caches' and isinstance(child, (Rule, Elimination)):
+        return 'rounds'
+    if isinstance(child, Matrix):
+        return 'matrices'
+    if isinstance(child, (Profile, Ballot)):
+        return 'ballots'
+    if name == '_cached_properties':
+        return 'caches'
+    if isinstance(name, str) and name.startswith('candidates'):
+        return 'candidates'
+    return category
+
+
+def report(obj: object) -> NiceDict:
+    """
+    Memory retained by an object.
+
+    :param obj: an object (typically a :class:`Rule`, but it can be any object).
+    :return: a :class:`NiceDict`. For each category, it gives the number of bytes of the objects that are reachable
+        from ``obj``, and ``'total'`` gives the sum. The categories are:
+
+        * ``'ballots'``: the profiles and their ballots,
+        * ``'candidates'``: the sets and lists of candidates,
+        * ``'matrices'``: the matrices, with everything that they retain,
+        * ``'caches'``: the cached properties (except the matrices and the rounds),
+        * ``'rounds'``: the rules and eliminations stored in the cached properties (such as the rounds of a
+          :class:`RuleIteratedElimination`), with everything that they retain,
+        * ``'parameters'``: the parameters of the object (converters, tie-breaks, base rules, etc.),
+        * ``'other'``: the other objects (e.g. the object itself).
+
+    Each object is counted once, in the category where it is found first: for example, the ballots that are shared by
+    the rule and its matrix are counted in ``'ballots'``. Classes, modules and functions are not counted.
+    """
+    sizes = {category: 0 for category in CATEGORIES}
+    seen = set()
+    stack = [(obj, 'other')]
+    while stack:
+        x, category = stack.pop()
+        if id(x) in seen or isinstance(x, _SKIPPED):
+            continue
+        seen.add(id(x))
+        sizes[category] += _own_size(x)
+        for name, child in reversed(_children(x)):
+            if x is obj:
+                child_category = 'parameters' if isinstance(name, str) and not name.endswith('_') and (
+                    name != '_cached_properties') else 'other'
+            else:
+                child_category = category
+            stack.append((child, _category(child_category, name, child)))
+    sizes['total'] = sum(sizes.values())
+    return NiceDict(sizes)
@@ -19,12 +19,34 @@ You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
 from whalrus.converter_ballot.ConverterBallotGeneral import ConverterBallotGeneral
-from whalrus.utils.Utils import cached_property, DeleteCacheMixin, convert_number
+from whalrus.utils.Utils import cached_property, DeleteCacheMixin, convert_number, set_to_list, small_int_array, \
+    encode_numbers, decode_numbers, encode_labels
 from whalrus.ballot.Ballot import Ballot
 from whalrus.ballot.BallotOrder import BallotOrder
-from typing import Union, Iterator
+from typing import Union, Iterator, Callable
+from collections.abc import Mapping
+from weakref import WeakMethod, ref
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from heapq import heapify, heappop, heappush
+import hashlib
 from numbers import Number
 
+# Placeholder for a deleted ballot in the internal lists of a profile.
+_DELETED = object()
+
+
+def _discard_subscriber(profile: 'Profile') -> Callable:
+    # Callback of the weak reference to a subscribed method: when its object is garbage collected, the subscription is
+    # removed from the profile. The profile itself is only weakly referenced, so that it can be garbage collected first.
+    profile_ref = ref(profile)
+
+    def discard(subscriber: WeakMethod) -> None:
+        profile_alive = profile_ref()
+        if profile_alive is not None and subscriber in profile_alive._subscribers:
+            profile_alive._subscribers.remove(subscriber)
+    return discard
+
 
 class Profile(DeleteCacheMixin):
     """
@@ -37,6 +59,8 @@ class Profile(DeleteCacheMixin):
         then use the weights of this profile; otherwise, all weights are 1.
     :param voters: a list representing the voters corresponding to the ballots. Default: if :attr:`ballots` is a
         Profile, then use the voters of this profile; otherwise, all voters are None.
+    :param indexed: if True, the profile maintains an index of the positions of each voter and each ballot, so that
+        :meth:`remove` and :meth:`update` do not need to scan the profile. In that case, voters must be hashable.
 
     Most general syntax:
 
@@ -93,14 +117,29 @@ class Profile(DeleteCacheMixin):
     >>> print(profile)
     (3): a > b
     (3): b > a
+
+    A rule (or a matrix) that is called with a profile and ``follow=True`` follows its changes: cf. :meth:`subscribe`.
+
+    For large electorates where ballots are corrected or withdrawn, use an indexed profile:
+
+    >>> profile = Profile(['a > b', 'b > a', 'a ~ b'], voters=['Alice', 'Bob', 'Cate'], indexed=True)
+    >>> profile.update('Bob', 'a > b')
+    >>> profile.remove(voter='Alice')
+    >>> print(profile)
+    Bob: a > b
+    Cate: a ~ b
+
+    Removing a ballot does not shift the other ones: its position is only marked as deleted, and the profile is
+    compacted later (when a list of ballots, weights or voters is read, or when half of the positions are deleted).
     """
 
-    def __init__(self, ballots: Union[list, 'Profile'], weights: list = None, voters: list = None):
+    def __init__(self, ballots: Union[list, 'Profile'], weights: list = None, voters: list = None,
+                 indexed: bool = False):
         converter = ConverterBallotGeneral()
         self._ballots = [converter(b) for b in ballots]
         if weights is None:
             if isinstance(ballots, Profile):
-                weights = ballots.weights
+                weights = list(ballots.weights)
             else:
                 weights = [1] * len(ballots)
         else:
@@ -108,11 +147,74 @@ class Profile(DeleteCacheMixin):
         self._weights = weights
         if voters is None:
             if isinstance(ballots, Profile):
-                self._voters = ballots.voters
+                self._voters = list(ballots.voters)
             else:
                 self._voters = [None] * len(ballots)
         else:
-            self._voters = voters
+            self._voters = list(voters)
+        self._subscribers = []
+        # Positions of the deleted ballots (sorted), not removed from the lists yet.
+        self._tombstones = []
+        # For an indexed profile: to each voter (resp. ballot), a heap of its positions. These heaps may contain
+        # obsolete positions, which are discarded when they are met.
+        self._indexed = indexed
+        self._voter_positions = None
+        self._ballot_positions = None
+        if indexed:
+            self._build_index()
+        self._frozen = False
+
+    def _build_index(self) -> None:
+        self._voter_positions = defaultdict(list)
+        self._ballot_positions = defaultdict(list)
+        for i, (ballot, voter) in enumerate(zip(self._ballots, self._voters)):
+            if ballot is not _DELETED:
+                self._voter_positions[voter].append(i)
+                self._ballot_positions[ballot].append(i)
+
+    @property
+    def indexed(self) -> bool:
+        """
+        Whether the profile is indexed.
+
+        Returns: True iff the profile maintains an index of the positions of each voter and each ballot.
+        """
+        return self._indexed
+
+    @property
+    def frozen(self) -> bool:
+        """
+        Whether the profile is frozen.
+
+        Returns: True iff the profile cannot be modified anymore (cf. :meth:`freeze`).
+        """
+        return self._frozen
+
+    def freeze(self) -> 'Profile':
+        """
+        Freeze the profile.
+
+        :return: the profile itself.
+
+        A frozen profile cannot be modified anymore: the methods that would modify it raise a TypeError. Since it
+        does not change, the rules and matrices that are called with it do not subscribe to it (cf.
+        :meth:`subscribe`), and its internal lists are never compacted again. Hence it can be shared by several
+        threads, which evaluate rules on it at the same time.
+
+        >>> profile = Profile(['a > b', 'b > a']).freeze()
+        >>> profile.append('a > b')
+        Traceback (most recent call last):
+        TypeError: This profile is frozen.
+        """
+        self._compact()
+        # The subscribers will never be notified.
+        self._subscribers = []
+        self._frozen = True
+        return self
+
+    def _check_not_frozen(self) -> None:
+        if self._frozen:
+            raise TypeError('This profile is frozen.')
 
     @property
     def ballots(self) -> list:
@@ -125,6 +227,7 @@ class Profile(DeleteCacheMixin):
         >>> profile.ballots
         [BallotOrder(['a', 'b'], candidates={'a', 'b'}), BallotOrder(['b', 'a'], candidates={'a', 'b'})]
         """
+        self._compact()
         return self._ballots
 
     @property
@@ -138,6 +241,7 @@ class Profile(DeleteCacheMixin):
         >>> profile.weights
         [1, 1]
         """
+        self._compact()
         return self._weights
 
     @property
@@ -151,6 +255,7 @@ class Profile(DeleteCacheMixin):
         >>> profile.voters
         ['Alice', 'Bob']
         """
+        self._compact()
         return self._voters
 
     @cached_property
@@ -179,6 +284,58 @@ class Profile(DeleteCacheMixin):
         """
         return any([voter is not None for voter in self.voters])
 
+    @cached_property
+    def _distinct(self) -> dict:
+        weights = {}
+        for ballot, weight in zip(self.ballots, self.weights):
+            weights[ballot] = weights.get(ballot, 0) + weight
+        return weights
+
+    @property
+    def distinct_ballots(self) -> list:
+        """
+        The distinct ballots.
+
+        :return: a list of the distinct ballots of the profile, in the order of their first appearance.
+
+        >>> profile = Profile(['a > b', 'b > a', 'a > b'], weights=[1, 2, 3])
+        >>> profile.distinct_ballots
+        [BallotOrder(['a', 'b'], candidates={'a', 'b'}), BallotOrder(['b', 'a'], candidates={'a', 'b'})]
+        """
+        return list(self._distinct.keys())
+
+    @property
+    def distinct_weights(self) -> list:
+        """
+        The weights of the distinct ballots.
+
+        :return: a list. For each ballot of :attr:`distinct_ballots`, the sum of its weights in the profile.
+
+        >>> profile = Profile(['a > b', 'b > a', 'a > b'], weights=[1, 2, 3])
+        >>> profile.distinct_weights
+        [4, 2]
+        """
+        return list(self._distinct.values())
+
+    @cached_property
+    def digest(self) -> str:
+        """
+        A stable digest of the profile.
+
+        :return: the SHA-256 digest (in hexadecimal) of the ballots, weights and voters. It does not depend on the
+            process or the session, so that it can be used as a key for persistent data (cf. :class:`ResultCache`).
+            The voters are represented by their ``repr``: they should be simple objects, such as strings or numbers.
+
+        >>> Profile(['a > b', 'b > a'], weights=[2, 1]).digest == Profile(['a > b', 'b > a'], weights=[2., 1]).digest
+        True
+        >>> Profile(['a > b', 'b > a']).digest == Profile(['b > a', 'a > b']).digest
+        False
+        """
+        h = hashlib.sha256()
+        for ballot, weight, voter in self.items():
+            h.update(('%r\t%r\t%r\n' % (ballot, convert_number(weight), voter)).encode())
+        return h.hexdigest()
+
     # Representation
     # ==============
 
@@ -217,10 +374,45 @@ class Profile(DeleteCacheMixin):
         a > b
         b > a
         """
-        self._ballots.append(ConverterBallotGeneral()(ballot))
-        self._weights.append(convert_number(weight))
-        self._voters.append(voter)
+        self.insert(len(self), ballot, weight=weight, voter=voter)
+
+    def insert(self, index: int, ballot: object, weight: Number = 1, voter: object = None) -> None:
+        """
+        Insert a ballot in the profile.
+
+        :param index: the position of the new ballot (like in ``list.insert``).
+        :param ballot: a ballot or, more generally, an input that can be interpreted by
+            :class:`ConverterBallotGeneral`.
+        :param weight: the weight of the ballot.
+        :param voter: the voter.
+
+        >>> profile = Profile(['a > b'])
+        >>> profile.insert(0, 'b > a')
+        >>> print(profile)
+        b > a
+        a > b
+        """
+        self._check_not_frozen()
+        n = len(self)
+        index = max(0, n + index) if index < 0 else min(index, n)
+        ballot = ConverterBallotGeneral()(ballot)
+        weight = convert_number(weight)
+        if index < n:
+            # The positions of the next ballots are shifted.
+            self._compact()
+            if self._indexed:
+                self._reindex(lambda i: i + 1 if i >= index else i)
+            position = index
+        else:
+            position = len(self._ballots)
+        self._ballots.insert(position, ballot)
+        self._weights.insert(position, weight)
+        self._voters.insert(position, voter)
+        if self._indexed:
+            heappush(self._voter_positions[voter], position)
+            heappush(self._ballot_positions[ballot], position)
         self.delete_cache()
+        self._notify(index, ballot, weight, voter, added=True)
 
     def remove(self, ballot: object=None, voter: object=None) -> None:
         """
@@ -238,18 +430,31 @@ class Profile(DeleteCacheMixin):
         >>> profile.remove('b > a')
         >>> print(profile)
         a > b
+
+        If there is no such ballot, a ValueError is raised.
         """
-        if ballot is None:
-            i = next(i for i, v in enumerate(self.voters) if v == voter)
-        elif voter is None:
-            i = next(i for i, b in enumerate(self.ballots) if b == ConverterBallotGeneral()(ballot))
-        else:
-            i = next(i for i, b in enumerate(self.ballots)
-                     if b == ConverterBallotGeneral()(ballot) and self.voters[i] == voter)
-        del self._ballots[i]
-        del self._voters[i]
-        del self._weights[i]
-        self.delete_cache()
+        if ballot is not None:
+            ballot = ConverterBallotGeneral()(ballot)
+        self._delete(self._find(ballot=ballot, voter=voter))
+
+    def update(self, voter: object, ballot: object) -> None:
+        """
+        Replace the ballot of a voter.
+
+        :param voter: the voter.
+        :param ballot: the new ballot or, more generally, an input that can be interpreted by
+            :class:`ConverterBallotGeneral`.
+
+        The weight is not modified. If the voter has several ballots, the first one is replaced. If the voter has no
+        ballot, a ValueError is raised.
+
+        >>> profile = Profile(['a > b', 'b > a'], voters=['Alice', 'Bob'])
+        >>> profile.update('Alice', 'b > a')
+        >>> print(profile)
+        Alice: b > a
+        Bob: b > a
+        """
+        self._set(self._find(voter=voter), ballot)
 
     def __len__(self) -> int:
         """
@@ -261,7 +466,15 @@ class Profile(DeleteCacheMixin):
         >>> len(profile)
         3
         """
-        return len(self.ballots)
+        return len(self._ballots) - len(self._tombstones)
+
+    def __iter__(self) -> Iterator:
+        """
+        Iterate over the ballots.
+
+        :return: an iterator over the ballots (without the weights or the voters).
+        """
+        return iter(self.ballots)
 
     def __getitem__(self, item: int) -> Ballot:
         """
@@ -274,6 +487,8 @@ class Profile(DeleteCacheMixin):
         >>> profile[0]
         BallotOrder(['a', 'b'], candidates={'a', 'b'})
         """
+        if isinstance(item, int):
+            return self._ballots[self._physical(range(len(self))[item])]
         return self.ballots[item]
 
     def __setitem__(self, key: int, value: object) -> None:
@@ -292,8 +507,7 @@ class Profile(DeleteCacheMixin):
         a ~ b
         b > a
         """
-        self._ballots[key] = ConverterBallotGeneral()(value)
-        self.delete_cache()
+        self._set(self._physical(range(len(self))[key]), value)
 
     def __delitem__(self, key: int) -> None:
         """
@@ -308,10 +522,354 @@ class Profile(DeleteCacheMixin):
         >>> print(profile)
         b > a
         """
-        del self._ballots[key]
-        del self._weights[key]
-        del self._voters[key]
+        indexes = range(len(self))[key]
+        if isinstance(indexes, int):
+            indexes = [indexes]
+        # Delete from the end, so that the indexes of the next ballots to delete do not change.
+        for i in sorted(indexes, reverse=True):
+            self._delete(self._physical(i))
+
+    # Storage
+    # =======
+
+    def _physical(self, index: int) -> int:
+        """
+        Convert an index to a position in the internal lists.
+
+        :param index: the index of a ballot (between 0 and ``len(self) - 1``).
+        :return: its position in the internal lists, which may contain deleted ballots.
+        """
+        if not self._tombstones:
+            return index
+        # Smallest position such that the number of ballots that are not deleted up to this position is index + 1.
+        low, high = index, index + len(self._tombstones)
+        while low < high:
+            middle = (low + high) // 2
+            if middle - bisect_right(self._tombstones, middle) < index:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find(self, ballot: Ballot = None, voter: object = None) -> int:
+        """
+        Find a ballot.
+
+        :param ballot: a ballot (already converted with :class:`ConverterBallotGeneral`).
+        :param voter: a voter.
+        :return: the position (in the internal lists) of the first ballot matching the description, in the sense of
+            :meth:`remove`.
+        """
+        if self._indexed:
+            if ballot is None:
+                return self._first_position(self._voter_positions, voter, lambda i: self._voters[i] == voter)
+            if voter is None:
+                return self._first_position(self._ballot_positions, ballot, lambda i: self._ballots[i] == ballot)
+            for i in sorted(self._voter_positions.get(voter, [])):
+                if i < len(self._ballots) and self._voters[i] == voter and self._ballots[i] == ballot:
+                    return i
+        else:
+            for i, (b, v) in enumerate(zip(self._ballots, self._voters)):
+                if b is _DELETED:
+                    continue
+                if (ballot is None and v == voter) or (
+                        ballot is not None and b == ballot and (voter is None or v == voter)):
+                    return i
+        raise ValueError('No ballot matches the description.')
+
+    def _first_position(self, positions_by_key: dict, key: object, is_valid: Callable) -> int:
+        heap = positions_by_key.get(key)
+        while heap:
+            i = heap[0]
+            if i < len(self._ballots) and self._ballots[i] is not _DELETED and is_valid(i):
+                return i
+            # Obsolete position.
+            heappop(heap)
+        raise ValueError('No ballot matches the description.')
+
+    def _set(self, position: int, value: object) -> None:
+        self._check_not_frozen()
+        old_ballot = self._ballots[position]
+        new_ballot = ConverterBallotGeneral()(value)
+        self._ballots[position] = new_ballot
+        if self._indexed:
+            heappush(self._ballot_positions[new_ballot], position)
+        index = position - bisect_left(self._tombstones, position)
+        self.delete_cache()
+        self._notify(index, old_ballot, self._weights[position], self._voters[position], added=False)
+        self._notify(index, new_ballot, self._weights[position], self._voters[position], added=True)
+
+    def _delete(self, position: int) -> None:
+        self._check_not_frozen()
+        ballot, weight, voter = self._ballots[position], self._weights[position], self._voters[position]
+        index = position - bisect_left(self._tombstones, position)
+        if position == len(self._ballots) - 1:
+            self._ballots.pop()
+            self._weights.pop()
+            self._voters.pop()
+        else:
+            self._ballots[position] = _DELETED
+            self._weights[position] = None
+            self._voters[position] = None
+            insort(self._tombstones, position)
         self.delete_cache()
+        self._notify(index, ballot, weight, voter, added=False)
+        if 2 * len(self._tombstones) > len(self._ballots):
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Remove the deleted ballots from the internal lists.
+        """
+        if not self._tombstones:
+            return
+        new_positions = []
+        n_ballots = 0
+        for b in self._ballots:
+            if b is _DELETED:
+                new_positions.append(None)
+            else:
+                new_positions.append(n_ballots)
+                n_ballots += 1
+        self._ballots[:] = [b for b in self._ballots if b is not _DELETED]
+        self._weights[:] = [w for w, i in zip(self._weights, new_positions) if i is not None]
+        self._voters[:] = [v for v, i in zip(self._voters, new_positions) if i is not None]
+        self._tombstones = []
+        if self._indexed:
+            self._reindex(lambda i: new_positions[i] if i < len(new_positions) else None)
+
+    def _reindex(self, new_position: Callable) -> None:
+        """
+        Update the index when the positions change.
+
+        :param new_position: a function that maps a former position to the new one (or to None if the ballot is
+            deleted). It must be increasing.
+        """
+        for positions_by_key in [self._voter_positions, self._ballot_positions]:
+            for key in list(positions_by_key.keys()):
+                heap = [j for j in (new_position(i) for i in positions_by_key[key]) if j is not None]
+                if heap:
+                    heapify(heap)
+                    positions_by_key[key] = heap
+                else:
+                    del positions_by_key[key]
+
+    # Subscriptions
+    # =============
+
+    def subscribe(self, callback: Callable) -> None:
+        """
+        Subscribe to the changes of the profile.
+
+        :param callback: a function with arguments ``index``, ``ballot``, ``weight``, ``voter`` and ``added``. Each
+            time a ballot is added to the profile or removed from it, the function is called with the position of the
+            ballot, the ballot itself, its weight, its voter, and a boolean that is True if the ballot was added and
+            False if it was removed. Replacing a ballot (with ``__setitem__``) is seen as a removal followed by an
+            addition. If ``callback`` is a bound method, the profile only keeps a weak reference to its object, and the
+            subscription is removed when the object is garbage collected. If the profile is frozen (cf.
+            :meth:`freeze`), nothing is done, since the profile will not change.
+
+        Rules and matrices called with ``follow=True`` use this mechanism to update their results when the profile
+        they were called with changes. When it is possible, they patch their tallies instead of computing them from
+        scratch:
+
+        >>> from whalrus import RuleBorda
+        >>> profile = Profile(['a > b > c', 'b > a > c'])
+        >>> borda = RuleBorda(profile, follow=True)
+        >>> borda.gross_scores_
+        {'a': 3, 'b': 3, 'c': 0}
+        >>> profile.append('c > b > a', weight=2)
+        >>> borda.gross_scores_
+        {'a': 3, 'b': 5, 'c': 4}
+        >>> borda.winner_
+        'b'
+        >>> del profile[0]
+        >>> borda.gross_scores_
+        {'a': 1, 'b': 4, 'c': 4}
+        """
+        if self._frozen:
+            return
+        if hasattr(callback, '__self__'):
+            self._subscribers.append(WeakMethod(callback, _discard_subscriber(self)))
+        else:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """
+        Unsubscribe from the changes of the profile.
+
+        :param callback: a function that was given to :meth:`subscribe`.
+        """
+        if self._frozen:
+            return
+        self._subscribers[:] = [subscriber for subscriber in self._subscribers
+                                if (subscriber() if isinstance(subscriber, WeakMethod) else subscriber) != callback]
+
+    def _notify(self, index: int, ballot: Ballot, weight: Number, voter: object, added: bool) -> None:
+        for subscriber in list(self._subscribers):
+            callback = subscriber() if isinstance(subscriber, WeakMethod) else subscriber
+            if callback is None:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+            else:
+                callback(index, ballot, weight, voter, added)
+
+    # Serialization
+    # =============
+
+    def _encode(self) -> dict:
+        """
+        Compact encoding of the profile.
+
+        :return: a dictionary. The ballots are represented by a table of candidates (``candidates``), the distinct
+            ballots of type :class:`BallotOrder` as a numpy array of ranks (``ranks``), the other distinct ballots
+            (``others``), and for each ballot, the position of its distinct ballot (``index``, a numpy array; the
+            positions of the ``others`` come after the rows of ``ranks``). In ``ranks``, each row corresponds to a
+            distinct ballot and each column to a candidate of the table: it gives the position of the indifference
+            class of the candidate, or -1 if the candidate is unordered, or -2 if it is not a candidate of the ballot.
+            The weights are given by :func:`encode_numbers` when possible (``weights``, or ``weights_numerators``
+            and ``weights_denominators``), and by a list otherwise (``weights_list``). The voters are a list, or
+            None if they are all None. Finally, ``indexed`` and ``frozen`` are booleans.
+        """
+        self._compact()
+        positions = {}
+        index = [positions.setdefault(ballot, len(positions)) for ballot in self._ballots]
+        orders = [ballot for ballot in positions if type(ballot) is BallotOrder]
+        others = [ballot for ballot in positions if type(ballot) is not BallotOrder]
+        new_positions = {ballot: i for i, ballot in enumerate(orders + others)}
+        permutation = [new_positions[ballot] for ballot in positions]
+        candidates = set_to_list(set().union(*[ballot.candidates for ballot in orders]))
+        columns = {c: j for j, c in enumerate(candidates)}
+        ranks = []
+        for ballot in orders:
+            row = [-2] * len(candidates)
+            for c in ballot.candidates:
+                row[columns[c]] = -1
+            for rank, indifference_class in enumerate(ballot.as_weak_order):
+                for c in indifference_class:
+                    row[columns[c]] = rank
+            ranks.extend(row)
+        encoding = {
+            'candidates': candidates,
+            'ranks': small_int_array(ranks).reshape(len(orders), len(candidates)),
+            'others': others,
+            'index': small_int_array([permutation[i] for i in index]),
+            'voters': None if all(voter is None for voter in self._voters) else list(self._voters),
+            'indexed': self._indexed,
+            'frozen': self._frozen
+        }
+        encoded_weights = encode_numbers(self._weights, 'weights')
+        if encoded_weights is None:
+            encoding['weights_list'] = list(self._weights)
+        else:
+            encoding.update(encoded_weights)
+        return encoding
+
+    @classmethod
+    def _decode(cls, encoding: Mapping) -> 'Profile':
+        """
+        Decode a profile.
+
+        :param encoding: a mapping, as given by :meth:`_encode`.
+        :return: a profile. Equal ballots are represented by the same :class:`Ballot` object.
+        """
+        candidates = list(encoding['candidates'])
+        distinct = []
+        for row in encoding['ranks'].tolist():
+            classes = [set() for _ in range(max(row, default=-1) + 1)]
+            for c, rank in zip(candidates, row):
+                if rank >= 0:
+                    classes[rank].add(c)
+            if -1 in row:
+                distinct.append(BallotOrder(classes, candidates={c for c, rank in zip(candidates, row) if rank > -2}))
+            else:
+                distinct.append(BallotOrder(classes))
+        distinct.extend(encoding['others'])
+        profile = cls.__new__(cls)
+        profile._ballots = [distinct[i] for i in encoding['index'].tolist()]
+        if 'weights_list' in encoding:
+            profile._weights = list(encoding['weights_list'])
+        else:
+            profile._weights = decode_numbers(encoding, 'weights')
+        if encoding['voters'] is None:
+            profile._voters = [None] * len(profile._ballots)
+        else:
+            profile._voters = list(encoding['voters'])
+        profile._subscribers = []
+        profile._tombstones = []
+        profile._indexed = bool(encoding['indexed'])
+        profile._voter_positions = None
+        profile._ballot_positions = None
+        if profile._indexed:
+            profile._build_index()
+        profile._frozen = bool(encoding['frozen'])
+        return profile
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle the profile compactly.
+
+        The ballots are encoded as arrays of integers (cf. :meth:`to_npz`), the cached properties and the
+        subscriptions are not pickled (nor copied). With pickle protocol 5, the arrays can be transmitted as
+        out-of-band buffers:
+
+        >>> import pickle
+        >>> profile = Profile(['a > b > c', 'b > a > c', 'a > b > c'], weights=[2, 1, 1])
+        >>> buffers = []
+        >>> data = pickle.dumps(profile, protocol=5, buffer_callback=buffers.append)
+        >>> print(pickle.loads(data, buffers=buffers))
+        (2): a > b > c
+        (1): b > a > c
+        (1): a > b > c
+        """
+        return self.__class__._decode, (self._encode(), )
+
+    def to_npz(self, file) -> None:
+        """
+        Save the profile in the ``.npz`` format of numpy.
+
+        :param file: a file name or a file-like object (cf. ``numpy.savez_compressed``).
+
+        The file contains only numpy arrays (cf. :meth:`from_npz`), so that it can be read without unpickling
+        anything, e.g. by another program. Hence the ballots must be :class:`BallotOrder` objects, the candidates
+        (and the voters, if any) must all be strings or all be integers, and the weights must all be integers or
+        fractions, or all be floats.
+
+        >>> import io
+        >>> f = io.BytesIO()
+        >>> Profile(['a > b ~ c', 'c > a'], weights=[2.5, 1], voters=['Alice', 'Bob']).to_npz(f)
+        >>> _ = f.seek(0)
+        >>> print(Profile.from_npz(f))
+        Alice (5/2): a > b ~ c
+        Bob (1): c > a
+        """
+        import numpy as np
+        encoding = self._encode()
+        if encoding['others']:
+            raise TypeError('Only profiles of BallotOrder objects can be saved in the npz format.')
+        if 'weights_list' in encoding:
+            raise TypeError('The weights must all be integers or fractions, or all be floats.')
+        arrays = {key: value for key, value in encoding.items() if key not in {'candidates', 'others', 'voters'}}
+        arrays['candidates'] = encode_labels(encoding['candidates'], 'candidates')
+        if encoding['voters'] is not None:
+            arrays['voters'] = encode_labels(encoding['voters'], 'voters')
+        np.savez_compressed(file, **arrays)
+
+    @classmethod
+    def from_npz(cls, file) -> 'Profile':
+        """
+        Load a profile saved with :meth:`to_npz`.
+
+        :param file: a file name or a file-like object.
+        :return: a profile.
+        """
+        import numpy as np
+        with np.load(file, allow_pickle=False) as data:
+            encoding = {key: data[key] for key in data.files}
+        encoding['candidates'] = encoding['candidates'].tolist()
+        encoding['voters'] = encoding['voters'].tolist() if 'voters' in encoding else None
+        encoding['others'] = []
+        return cls._decode(encoding)
 
     # Dict-like behavior
     def items(self) -> Iterator:
@@ -348,7 +906,7 @@ class Profile(DeleteCacheMixin):
         if isinstance(other, list):
             other = Profile(other)
         return Profile(ballots=self.ballots + other.ballots, weights=self.weights + other.weights,
-                       voters=self.voters + other.voters)
+                       voters=self.voters + other.voters, indexed=self.indexed)
 
     def __mul__(self, other: Number) -> 'Profile':
         """
@@ -364,4 +922,4 @@ class Profile(DeleteCacheMixin):
         """
         other = convert_number(other)
         return Profile(ballots=self.ballots, weights=[convert_number(w * other) for w in self.weights],
-                       voters=self.voters)
+                       voters=self.voters, indexed=self.indexed)
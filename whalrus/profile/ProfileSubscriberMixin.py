@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from whalrus.utils.Utils import NiceSet
+from whalrus.ballot.Ballot import Ballot
+from whalrus.profile.Profile import Profile
+from collections import Counter
+from numbers import Number
+from typing import Union
+
+
+class ProfileSubscriberMixin:
+    """
+    Mixin used by the objects that load a profile (such as :class:`Rule` and :class:`Matrix`) to follow its changes.
+
+    When such an object is called with a :class:`Profile` and ``follow=True`` (without giving other weights or
+    voters), it subscribes to this profile (cf. :meth:`Profile.subscribe`). Then, each time a ballot is added to the
+    profile or removed from it, the object updates ``profile_original_``, ``profile_converted_`` and ``candidates_``.
+    The cached properties that can be patched with the new ballot are kept (cf. :meth:`_patch_cache`), as well as the
+    sub-objects (such as the matrix of a rule) that follow ``profile_converted_`` themselves (cf.
+    :attr:`follows_profile`). All the other cached properties are deleted, hence computed again on demand.
+
+    By default (``follow=False``), the object does not subscribe: it uses the profile as it is at the time of the call.
+
+    Cf. :meth:`Profile.subscribe` for an example.
+    """
+
+    @property
+    def follows_profile(self) -> bool:
+        """
+        Whether the object follows the changes of its profile.
+
+        :return: True iff the object was called with a :class:`Profile` and ``follow=True``. In that case, the
+            sub-objects that it calls with ``profile_converted_`` (such as the matrix of a rule) follow it too.
+        """
+        return getattr(self, '_profile_source_', None) is not None
+
+    def _subscribe(self, ballots: Union[list, Profile], weights: list, voters: list, candidates: set,
+                   follow: bool) -> None:
+        """
+        Subscribe to the profile given in ``__call__`` (if relevant).
+
+        :param ballots: cf. ``__call__``.
+        :param weights: cf. ``__call__``.
+        :param voters: cf. ``__call__``.
+        :param candidates: cf. ``__call__``.
+        :param follow: cf. ``__call__``.
+
+        It must be called in ``__call__``, once ``profile_converted_`` is computed.
+        """
+        profile_source = getattr(self, '_profile_source_', None)
+        if profile_source is not None:
+            profile_source.unsubscribe(self._on_profile_change)
+        self._profile_source_ = None
+        if follow and isinstance(ballots, Profile) and weights is None and voters is None:
+            ballots.subscribe(self._on_profile_change)
+            self._profile_source_ = ballots
+            self._candidates_argument_ = candidates
+            # When the candidates are not given, count in how many ballots each candidate appears.
+            self._candidates_counter_ = None if candidates is not None else Counter(
+                c for b in self.profile_converted_ for c in b.candidates)
+
+    def _on_profile_change(self, index: int, ballot: Ballot, weight: Number, voter: object, added: bool) -> None:
+        """
+        Update the object when a ballot is added to the profile or removed from it.
+
+        Cf. :meth:`Profile.subscribe` for the parameters.
+        """
+        if self.profile_converted_ is None:
+            # The profiles were discarded, e.g. by a :class:`RuleIteratedElimination` with ``keep_profiles=False``.
+            return
+        if added:
+            converted = self.converter(ballot, self._candidates_argument_)
+            self.profile_original_.insert(index, ballot, weight=weight, voter=voter)
+            self.profile_converted_.insert(index, converted, weight=weight, voter=voter)
+        else:
+            converted = self.profile_converted_[index]
+            del self.profile_original_[index]
+            del self.profile_converted_[index]
+        if self._candidates_counter_ is not None:
+            candidates_changed = False
+            for c in converted.candidates:
+                self._candidates_counter_[c] += 1 if added else -1
+                if self._candidates_counter_[c] == (1 if added else 0):
+                    candidates_changed = True
+                if self._candidates_counter_[c] == 0:
+                    del self._candidates_counter_[c]
+            if candidates_changed:
+                self.candidates_ = NiceSet(self._candidates_counter_.keys())
+                self.delete_cache()
+                return
+        cache = getattr(self, '_cached_properties', dict())
+        self._cached_properties = cache
+        kept = {name: cache[name] for name in self._patch_cache(converted, weight if added else -weight, voter)}
+        kept.update({name: value for name, value in cache.items() if isinstance(value, ProfileSubscriberMixin)
+                     and value._profile_source_ is self.profile_converted_})
+        self._cached_properties = kept
+
+    def _patch_cache(self, ballot: Ballot, weight: Number, voter: object) -> list:
+        """
+        Patch the cached properties when a ballot is added to the profile or removed from it.
+
+        :param ballot: the ballot, once converted (as in ``profile_converted_``).
+        :param weight: the weight of the ballot if it is added, the opposite of its weight if it is removed.
+        :param voter: the voter.
+        :return: the list of the names of the cached properties that are patched (hence still valid). By default,
+            nothing is patched and the result is an empty list.
+        """
+        return []
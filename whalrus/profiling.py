@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+Instrumentation of the computations: time and number of computations of each cached property and of the main
+methods (loading a profile in a rule or a matrix, converting a ballot, computing the scores of a ballot, eliminating
+candidates, breaking ties), and number of cache hits.
+
+The instrumentation is opt-in: it is installed when entering :func:`record` and removed when leaving it. Outside of
+:func:`record`, the classes are untouched, so there is no overhead at all. The computations are only recorded in the
+thread (or, more generally, the context) that entered :func:`record`: the computations done in other threads at the
+same time are not counted.
+
+>>> from whalrus.rule.RuleCopeland import RuleCopeland
+>>> with record() as stats:
+...     rule = RuleCopeland(['a > b > c', 'b > a > c', 'c > a > b'])
+...     winner = rule.winner_
+...     winner = rule.winner_
+>>> stats[('RuleCopeland', 'winner_')]  # doctest: +ELLIPSIS
+{'calls': 1, 'hits': 1, 'time': ...}
+>>> stats[('MatrixMajority', 'as_array_')]['calls']
+1
+
+The statistics of the computations done on behalf of a rule (including its matrices, scorers, etc.) are also
+available with :meth:`Rule.profile_stats_`:
+
+>>> rule.profile_stats_()[('MatrixWeightedMajority', 'as_array_')]['calls']
+1
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from whalrus.utils.Utils import _cached_properties_owners, _CachedProperty
+
+
+class Stats(dict):
+    """
+    Statistics of computations.
+
+    Keys are pairs `(class name, attribute name)`. Each value is a dictionary with:
+
+    * ``'calls'``: the number of computations (for a cached property, it is the number of cache misses),
+    * ``'hits'``: the number of accesses served by the cache (always 0 for a method),
+    * ``'time'``: the total time of the computations, in seconds. It includes the nested computations, e.g. the
+      time of :attr:`Rule.winner_` includes the time of :attr:`Rule.order_`.
+    """
+
+    def _add(self, key: tuple, duration: float, hit: bool) -> None:
+        try:
+            value = self[key]
+        except KeyError:
+            value = self[key] = {'calls': 0, 'hits': 0, 'time': 0.}
+        if hit:
+            value['hits'] += 1
+        else:
+            value['calls'] += 1
+            value['time'] += duration
+
+    def report(self, n: int = None) -> str:
+        """
+        Report of the statistics.
+
+        :param n: if given, only the `n` most time-consuming entries are reported.
+        :return: a string, with one line per entry, by decreasing time.
+        """
+        items = sorted(self.items(), key=lambda item: - item[1]['time'])[:n]
+        lines = ['%-60s %10s %10s %12s' % ('', 'calls', 'hits', 'time (s)')]
+        for (class_name, name), value in items:
+            lines.append('%-60s %10d %10d %12.6f' % (class_name + '.' + name, value['calls'], value['hits'],
+                                                     value['time']))
+        return '\n'.join(lines)
+
+
+# The active statistics of the current context (one per nested call of `record`).
+_recorders = ContextVar('_recorders', default=())
+# The objects whose computations are in progress in the current context (the innermost one is the last).
+_stack = ContextVar('_stack', default=())
+# The pairs (id of the object, name) whose computations are in progress in the current context.
+_active = ContextVar('_active', default=frozenset())
+# The original attributes of the classes, as triples (class, name, attribute), while the instrumentation is installed.
+_originals = []
+# The number of calls of `record` in progress (in all the threads), and the lock that protects it and `_originals`.
+_n_records = 0
+_lock = threading.Lock()
+
+
+def _event(obj: object, name: str, duration: float, hit: bool) -> None:
+    """
+    Record a computation or a cache hit.
+
+    :param obj: the object.
+    :param name: the name of the property or method.
+    :param duration: the time of the computation.
+    :param hit: True for a cache hit.
+    """
+    from whalrus.rule.Rule import Rule
+    key = (type(obj).__name__, name)
+    for stats in _recorders.get():
+        stats._add(key, duration, hit)
+    rules = {id(o): o for o in _stack.get() + (obj,) if isinstance(o, Rule)}
+    for rule in rules.values():
+        if rule.__dict__.get('_profile_stats_') is None:
+            rule._profile_stats_ = Stats()
+        rule._profile_stats_._add(key, duration, hit)
+
+
+def _timed(function, obj: object, name: str, *args, **kwargs):
+    """
+    Call a function and record its computation.
+
+    :param function: a function whose first argument is ``obj``.
+    :param obj: the object.
+    :param name: the name of the property or method.
+    :return: the result of the function. If the same computation is already in progress (e.g. a method that calls
+        the same method of the parent class), it is not recorded twice. If the current context is not recording, it
+        is not recorded at all.
+    """
+    key = (id(obj), name)
+    active = _active.get()
+    if not _recorders.get() or key in active:
+        return function(obj, *args, **kwargs)
+    active_token = _active.set(active | {key})
+    stack_token = _stack.set(_stack.get() + (obj,))
+    start = time.perf_counter()
+    try:
+        return function(obj, *args, **kwargs)
+    finally:
+        duration = time.perf_counter() - start
+        _stack.reset(stack_token)
+        _active.reset(active_token)
+        _event(obj, name, duration, hit=False)
+
+
+def _instrumented_property(prop: property, name: str) -> property:
+    compute = prop.fget
+
+    def fget(obj):
+        cache = getattr(obj, '_cached_properties', None)
+        if cache is None or name not in cache:
+            return _timed(compute, obj, name)
+        if _recorders.get():
+            _event(obj, name, 0., hit=True)
+        return cache[name]
+    return property(fget, doc=prop.__doc__)
+
+
+def _instrumented_method(method, name: str):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return _timed(method, self, name, *args, **kwargs)
+    return wrapper
+
+
+def _subclasses(cls: type) -> list:
+    result = [cls]
+    for subclass in cls.__subclasses__():
+        result += [c for c in _subclasses(subclass) if c not in result]
+    return result
+
+
+def _install() -> None:
+    from whalrus.rule.Rule import Rule
+    from whalrus.matrix.Matrix import Matrix
+    from whalrus.converter_ballot.ConverterBallot import ConverterBallot
+    from whalrus.scorer.Scorer import Scorer
+    from whalrus.elimination.Elimination import Elimination
+    from whalrus.priority.Priority import Priority
+    import whalrus
+    # The classes of the package are imported lazily: load them all, so that they are instrumented.
+    for name in whalrus.__all__:
+        getattr(whalrus, name)
+    for owner in list(_cached_properties_owners):
+        for name, attribute in list(vars(owner).items()):
+            if isinstance(attribute, _CachedProperty):
+                _originals.append((owner, name, attribute))
+                setattr(owner, name, _instrumented_property(attribute, name))
+    methods = [(Rule, '__call__'), (Matrix, '__call__'), (ConverterBallot, '__call__'), (Scorer, '__call__'),
+               (Elimination, '__call__'), (Priority, 'choice'), (Priority, 'sort'), (Priority, 'sort_pairs_rp')]
+    for base, name in methods:
+        for owner in _subclasses(base):
+            if name in vars(owner):
+                attribute = vars(owner)[name]
+                _originals.append((owner, name, attribute))
+                setattr(owner, name, _instrumented_method(attribute, name))
+
+
+def _uninstall() -> None:
+    while _originals:
+        owner, name, attribute = _originals.pop()
+        setattr(owner, name, attribute)
+
+
+@contextmanager
+def record():
+    """
+    Record the computations.
+
+    :return: a context manager. It gives a :class:`Stats` object, which is filled during the execution of the
+        context. The calls of :func:`record` can be nested: each one gets the computations done during its own
+        context. Several threads can use :func:`record` at the same time: each one only gets its own computations.
+    """
+    global _n_records
+    stats = Stats()
+    with _lock:
+        if _n_records == 0:
+            _install()
+        _n_records += 1
+    token = _recorders.set(_recorders.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _recorders.reset(token)
+        with _lock:
+            _n_records -= 1
+            if _n_records == 0:
+                _uninstall()
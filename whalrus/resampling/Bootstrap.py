@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from whalrus.matrix.MatrixMajority import MatrixMajority
+from whalrus.matrix.MatrixWeightedMajority import MatrixWeightedMajority
+from whalrus.rule.Rule import Rule
+from whalrus.rule.RuleMaximin import RuleMaximin
+from whalrus.rule.RuleScoreNumAverage import RuleScoreNumAverage
+from whalrus.rule.RuleScoreNumRowSum import RuleScoreNumRowSum
+from whalrus.utils.Utils import cached_property, DeleteCacheMixin, CloneMixin, NiceDict, my_division, set_to_list, \
+    wilson_interval
+
+
+class Bootstrap(DeleteCacheMixin, CloneMixin):
+    """
+    Bootstrap estimate of the stability of the winner.
+
+    :param `*args`: if present, these parameters will be passed to ``__call__`` immediately after initialization.
+    :param n: the number of resamples.
+    :param seed: an int. Batch number `k` is drawn with the seed ``[seed, k]``, so that the results do not depend on
+        :attr:`n_jobs`. Default: a fresh seed.
+    :param batch_size: the number of resamples in a batch. A batch is the unit of work of the vectorized tallies and
+        of the process pool.
+    :param n_jobs: the number of processes. If 1 (default), everything is done in the current process.
+    :param confidence: the confidence level of the confidence intervals.
+    :param `**kwargs`: if present, these parameters will be passed to ``__call__`` immediately after initialization.
+
+    A :class:`Bootstrap` object is a callable whose input is a :class:`Rule` (which has already loaded a profile).
+    When it is called, it loads the rule and returns itself. After the call, you can access to the computed
+    variables, such as :attr:`winner_frequencies_`.
+
+    Each resample draws ballots with replacement from the profile of the rule, as many as there are voters: if the
+    weights are integers, they are considered as numbers of voters, otherwise each ballot counts as one voter. Since
+    only the number of draws of each distinct ballot matters, a resample is a vector of weights for the distinct
+    ballots of ``rule.profile_converted_`` (cf. :attr:`Profile.distinct_ballots`), drawn from a multinomial
+    distribution. Then the rule is evaluated on each resample.
+
+    >>> from whalrus.rule.RuleBorda import RuleBorda
+    >>> from whalrus.priority.Priority import Priority
+    >>> rule = RuleBorda(['a > b > c', 'b > c > a', 'c > a > b'], weights=[40, 35, 25], tie_break=Priority.ASCENDING)
+    >>> rule.winner_
+    'b'
+    >>> bootstrap = Bootstrap(rule, n=1000, seed=42)
+    >>> bootstrap.winner_counts_
+    {'a': 380, 'b': 614, 'c': 6}
+    >>> bootstrap.winner_frequencies_['b']
+    Fraction(307, 500)
+
+    For the subclasses of :class:`RuleScoreNumAverage` (when each ballot gives a score to each candidate), for
+    :class:`RuleMaximin` with a :class:`MatrixWeightedMajority`, and for the subclasses of
+    :class:`RuleScoreNumRowSum` (such as :class:`RuleCopeland`) with a :class:`MatrixWeightedMajority` or a
+    :class:`MatrixMajority` based on a :class:`MatrixWeightedMajority`, the resamples of a batch are evaluated
+    together, with :meth:`RuleScoreNumAverage.scores_batch` or :meth:`MatrixWeightedMajority.as_array_batch`. Other
+    rules are evaluated on each resample, which is a profile with the distinct ballots and their new weights (the
+    process pool is then especially useful).
+
+    :ivar rule\\_: this attribute stores the rule given in argument of the ``__call__``.
+    """
+
+    def __init__(self, *args, n: int = 1000, seed: int = None, batch_size: int = 1000, n_jobs: int = 1,
+                 confidence: float = .95, **kwargs):
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.n = n
+        self.seed = seed
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.confidence = confidence
+        # Computed variables
+        self.rule_ = None
+        # Optional: load a rule at initialization
+        if args or kwargs:
+            self(*args, **kwargs)
+
+    def __call__(self, rule: Rule):
+        self.rule_ = rule
+        self.delete_cache()
+        return self
+
+    # Resamples
+    # =========
+
+    @cached_property
+    def candidates_as_list_(self) -> list:
+        """
+        The candidates of the election, as a list.
+
+        :return: a list. The indexes of the candidates in the internal arrays refer to this list.
+        """
+        return set_to_list(self.rule_.candidates_)
+
+    @cached_property
+    def n_draws_(self) -> int:
+        """
+        The number of ballots drawn in each resample.
+
+        :return: the total weight of the profile if all weights are integers, its number of ballots otherwise.
+        """
+        profile = self.rule_.profile_original_
+        if all(weight == int(weight) for weight in profile.weights):
+            return int(sum(profile.weights))
+        return len(profile)
+
+    def _resamples(self, k: int) -> np.ndarray:
+        """
+        The resamples of a batch.
+
+        :param k: the index of the batch.
+        :return: an array of shape (number of resamples in the batch, number of distinct ballots): the weights of the
+            distinct ballots in each resample.
+        """
+        weights = np.array([float(weight) for weight in self.rule_.profile_converted_.distinct_weights])
+        size = min(self.batch_size, self.n - k * self.batch_size)
+        return np.random.default_rng([self.seed, k]).multinomial(self.n_draws_, weights / weights.sum(), size=size)
+
+    # Vectorized tallies
+    # ==================
+
+    @cached_property
+    def _matrix_(self) -> MatrixWeightedMajority:
+        """
+        The weighted majority matrix on which the scores of the rule are based, if any.
+
+        :return: a :class:`MatrixWeightedMajority` (once computed with the profile of the rule), or None if the rule
+            cannot be evaluated in batch with it.
+        """
+        rule = self.rule_
+        if isinstance(rule, RuleMaximin) and type(rule).scores_ is RuleMaximin.scores_:
+            matrix = rule.matrix_weighted_majority_
+        elif isinstance(rule, RuleScoreNumRowSum) and type(rule).scores_ is RuleScoreNumRowSum.scores_:
+            matrix = rule.matrix_
+            if type(matrix) is MatrixMajority:
+                matrix = matrix.matrix_weighted_majority_
+        else:
+            return None
+        # The resamples are weights for the distinct ballots of the rule: they must also be those of the matrix.
+        if (type(matrix) is not MatrixWeightedMajority
+                or matrix.profile_converted_.distinct_ballots != rule.profile_converted_.distinct_ballots):
+            return None
+        return matrix
+
+    @cached_property
+    def is_batched_(self) -> bool:
+        """
+        Whether the resamples are evaluated in batch.
+
+        :return: True if the tallies of the rule are vectorized (cf. above), False if the rule is evaluated on each
+            resample.
+        """
+        rule = self.rule_
+        return ((isinstance(rule, RuleScoreNumAverage) and type(rule).scores_ is RuleScoreNumAverage.scores_)
+                or self._matrix_ is not None)
+
+    def _batch_scores(self, resamples: np.ndarray) -> np.ndarray:
+        """
+        The scores of the candidates in a batch of resamples.
+
+        :param resamples: an array of shape (number of resamples, number of distinct ballots).
+        :return: an array of shape (number of resamples, number of candidates), as floats.
+        """
+        rule = self.rule_
+        if isinstance(rule, RuleScoreNumAverage):
+            return rule.scores_batch(resamples)
+        matrices = self._matrix_.as_array_batch(resamples)
+        off_diagonal = ~np.eye(len(self.candidates_as_list_), dtype=bool)
+        if isinstance(rule, RuleMaximin):
+            return np.where(off_diagonal, matrices, np.inf).min(axis=2)
+        if type(rule.matrix_) is MatrixMajority:
+            transposed = matrices.transpose(0, 2, 1)
+            matrices = np.where(matrices > transposed, float(rule.matrix_.greater),
+                                np.where(matrices < transposed, float(rule.matrix_.lower), float(rule.matrix_.equal)))
+        return np.where(off_diagonal, matrices, 0.).sum(axis=2)
+
+    def _winners(self, scores: np.ndarray) -> list:
+        """
+        The winners, given the scores.
+
+        :param scores: an array of shape (number of resamples, number of candidates).
+        :return: a list of candidate indexes (or None when the tie-breaking rule cannot break a tie).
+        """
+        best = scores.max(axis=1, keepdims=True)
+        is_best = scores >= best - 1e-9 * np.maximum(1., np.abs(best))
+        winners = scores.argmax(axis=1).tolist()
+        for i in np.flatnonzero(is_best.sum(axis=1) > 1).tolist():
+            tied = [c for c, b in zip(self.candidates_as_list_, is_best[i]) if b]
+            try:
+                winners[i] = self.candidates_as_list_.index(self.rule_.tie_break.sort(tied)[0])
+            except ValueError:
+                winners[i] = None
+        return winners
+
+    # Work on the batches
+    # ===================
+
+    def _batch_counts(self, k: int) -> list:
+        """
+        Counts of a batch.
+
+        :param k: the index of the batch.
+        :return: a list: for each candidate, the number of resamples that it wins; then the number of resamples
+            without a winner.
+        """
+        resamples = self._resamples(k)
+        if self.is_batched_:
+            winners = self._winners(self._batch_scores(resamples))
+        else:
+            ballots = self.rule_.profile_converted_.distinct_ballots
+            winners = []
+            for weights in resamples.tolist():
+                rule = self.rule_.clone()
+                rule(ballots=[b for b, w in zip(ballots, weights) if w], weights=[w for w in weights if w],
+                     candidates=self.rule_.candidates_)
+                try:
+                    winners.append(self.candidates_as_list_.index(rule.winner_))
+                except ValueError:
+                    winners.append(None)
+        n_candidates = len(self.candidates_as_list_)
+        counts = [0] * (n_candidates + 1)
+        for winner in winners:
+            counts[n_candidates if winner is None else winner] += 1
+        return counts
+
+    @cached_property
+    def _counts_(self) -> list:
+        # The counts of all the batches (cf. :meth:`_batch_counts`).
+        batches = range(-(-self.n // self.batch_size))
+        if self.n_jobs == 1:
+            results = [self._batch_counts(k) for k in batches]
+        else:
+            _ = self.is_batched_
+            with ProcessPoolExecutor(self.n_jobs) as executor:
+                results = list(executor.map(_batch_counts, [self] * len(batches), batches))
+        return [sum(counts) for counts in zip(*results)] if results else [0] * (len(self.candidates_as_list_) + 1)
+
+    # Statistics
+    # ==========
+
+    @cached_property
+    def winner_counts_(self) -> NiceDict:
+        """
+        The number of wins of each candidate.
+
+        :return: a :class:`NiceDict`. For each candidate, the number of resamples where it wins.
+        """
+        return NiceDict(zip(self.candidates_as_list_, self._counts_[:-1]))
+
+    @cached_property
+    def n_no_winner_(self) -> int:
+        """
+        The number of resamples without a winner.
+
+        :return: an int. It can be positive only if the tie-breaking rule is unable to break some ties.
+        """
+        return self._counts_[-1]
+
+    @cached_property
+    def winner_frequencies_(self) -> NiceDict:
+        """
+        The frequency of victory of each candidate.
+
+        :return: a :class:`NiceDict`. For each candidate, the proportion of resamples where it wins (or None if there
+            is no resample).
+        """
+        return NiceDict({c: my_division(count, self.n) if self.n else None for c, count in self.winner_counts_.items()})
+
+    @cached_property
+    def winner_frequencies_interval_(self) -> NiceDict:
+        """
+        Confidence intervals of the frequencies of victory.
+
+        :return: a :class:`NiceDict`. For each candidate, a pair of floats (cf. :func:`wilson_interval`).
+        """
+        return NiceDict({c: wilson_interval(count, self.n, self.confidence)
+                         for c, count in self.winner_counts_.items()})
+
+
+def _batch_counts(bootstrap: Bootstrap, k: int) -> list:
+    """
+    Counts of a batch, in a worker process.
+
+    :param bootstrap: the bootstrap.
+    :param k: the index of the batch.
+    :return: the counts of the batch.
+    """
+    # noinspection PyProtectedMember
+    return bootstrap._batch_counts(k)
@@ -19,15 +19,16 @@ You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
 import logging
-from whalrus.utils.Utils import DeleteCacheMixin, cached_property, NiceSet
+from whalrus.utils.Utils import DeleteCacheMixin, CloneMixin, cached_property, NiceSet
 from whalrus.priority.Priority import Priority
 from whalrus.converter_ballot.ConverterBallotGeneral import ConverterBallotGeneral
 from whalrus.profile.Profile import Profile
+from whalrus.profile.ProfileSubscriberMixin import ProfileSubscriberMixin
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
 from typing import Union
 
 
-class Rule(DeleteCacheMixin):
+class Rule(DeleteCacheMixin, CloneMixin, ProfileSubscriberMixin):
     """
     A voting rule.
 
@@ -40,13 +41,18 @@ class Rule(DeleteCacheMixin):
     A :class:`Rule` object is a callable whose inputs are ballots and optionally weights, voters and candidates.
     When the rule is called, it loads the profile. The output of the call is the rule itself. But
     after the call, you can access to the computed variables (ending with an underscore), such as
-    :attr:`cowinners_`.
+    :attr:`cowinners_`. If the rule is called with a :class:`Profile` and ``follow=True``, then it follows the changes
+    of this profile (cf. :meth:`Profile.subscribe`).
 
     At the initialization of a :class:`Rule` object, some options can be given, such as a tie-break rule or a
     converter. In some subclasses, there can also be an option about the way to count abstentions, etc.
 
     Cf. :class:`RulePlurality` for some examples.
 
+    Evaluating a rule does not modify its parameters: the scorer is used through :meth:`Scorer.scores`, and the
+    matrices are cloned before being loaded with the profile. Hence several rules can share the same parameters, and
+    several threads can evaluate rules at the same time on the same frozen profile (cf. :meth:`Profile.freeze`).
+
     :ivar profile_original\_: the profile as it is entered by the user. Since it uses the constructor of
         :class:`Profile`, it indirectly uses :class:`ConverterBallotGeneral` to ensure, for example, that strings like
         ``'a > b > c'`` are converted to :class:`Ballot` objects.
@@ -74,10 +80,11 @@ class Rule(DeleteCacheMixin):
             self(*args, **kwargs)
 
     def __call__(self, ballots: Union[list, Profile] = None, weights: list = None, voters: list = None,
-                 candidates: set = None):
+                 candidates: set = None, follow: bool = False):
         self.profile_original_ = Profile(ballots, weights=weights, voters=voters)
         self.profile_converted_ = Profile([self.converter(b, candidates) for b in self.profile_original_],
                                           weights=self.profile_original_.weights, voters=self.profile_original_.voters)
+        self._subscribe(ballots, weights=weights, voters=voters, candidates=candidates, follow=follow)
         if candidates is None:
             candidates = NiceSet(set().union(*[b.candidates for b in self.profile_converted_]))
         self.candidates_ = candidates
@@ -85,6 +92,86 @@ class Rule(DeleteCacheMixin):
         self.delete_cache()
         return self
 
+    def release(self, keep: tuple = ('order_', )) -> 'Rule':
+        """
+        Release the memory used by the rule, except for some results.
+
+        :param keep: the names of the computed variables to keep (e.g. ``('order_', 'scores_')``). They are computed
+            first if needed.
+        :return: the rule itself.
+
+        All the other computed variables (the profiles, the cached properties, the matrices, the rounds, etc.) are
+        discarded, and the rule stops following its profile (cf. :class:`ProfileSubscriberMixin`). Afterwards, only
+        the kept variables are available (until the rule is called with a new profile). Cf. :mod:`whalrus.memory` to
+        measure the memory retained by a rule.
+
+        >>> from whalrus.rule.RuleBorda import RuleBorda
+        >>> rule = RuleBorda(['a > b > c', 'b > a > c'], weights=[3, 2]).release(keep=('order_', 'gross_scores_'))
+        >>> rule.order_, rule.gross_scores_
+        ([{'a'}, {'b'}, {'c'}], {'a': 8, 'b': 7, 'c': 0})
+        >>> rule.profile_converted_ is None
+        True
+        """
+        values = {name: getattr(self, name) for name in keep}
+        profile_source = getattr(self, '_profile_source_', None)
+        if profile_source is not None:
+            profile_source.unsubscribe(self._on_profile_change)
+        for name in list(self.__dict__):
+            if name.endswith('_') and name not in keep:
+                self.__dict__[name] = None
+        self._cached_properties = {name: value for name, value in values.items() if name not in self.__dict__}
+        return self
+
+    def profile_stats_(self) -> object:
+        """
+        Statistics of the computations of the rule.
+
+        :return: a :class:`whalrus.profiling.Stats`. It gives the computations recorded with
+            :func:`whalrus.profiling.record` that were done on behalf of this rule, including the ones of its matrices,
+            scorers, tie-breaks, etc. If nothing was recorded, it is empty.
+        """
+        from whalrus.profiling import Stats
+        stats = self.__dict__.get('_profile_stats_')
+        return Stats() if stats is None else stats
+
+    def matrix_parameters(self) -> list:
+        """
+        The matrix parameters of the rule.
+
+        :return: the names of the parameters that are :class:`Matrix` objects and that the rule computes with its
+            converted profile, in a cached property of the same name followed by an underscore (e.g.
+            ``'matrix_majority'`` for :attr:`matrix_majority_`).
+
+        >>> from whalrus.rule.RuleSchulze import RuleSchulze
+        >>> RuleSchulze().matrix_parameters()
+        ['matrix_schulze']
+        """
+        from whalrus.matrix.Matrix import Matrix
+        return [name for name, value in vars(self).items()
+                if isinstance(value, Matrix) and isinstance(getattr(type(self), name + '_', None), property)]
+
+    def use_matrix(self, name: str, matrix: object) -> 'Rule':
+        """
+        Use a precomputed matrix.
+
+        :param name: the name of a matrix parameter of the rule (cf. :meth:`matrix_parameters`).
+        :param matrix: a :class:`Matrix`, computed with the same parameters as the parameter ``name`` on the converted
+            profile of the rule (or an equivalent one). It is used as the computed variable ``name + '_'``, until the
+            rule is called with a new profile.
+        :return: the rule itself.
+
+        >>> from whalrus.matrix.MatrixMajority import MatrixMajority
+        >>> from whalrus.rule.RuleCondorcet import RuleCondorcet
+        >>> rule = RuleCondorcet(['a > b > c', 'b > a > c'])
+        >>> matrix = MatrixMajority()(rule.profile_converted_)
+        >>> rule.use_matrix('matrix_majority', matrix).matrix_majority_ is matrix
+        True
+        """
+        if name not in self.matrix_parameters():
+            raise ValueError('%r is not a matrix parameter of %s.' % (name, type(self).__name__))
+        self._cached_properties[name + '_'] = matrix
+        return self
+
     def _check_profile(self, candidates: set) -> None:
         if any([b.candidates != candidates for b in self.profile_converted_]):
             logging.warning('Some ballots do not have the same set of candidates as the whole election.')
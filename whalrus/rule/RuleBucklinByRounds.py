@@ -75,11 +75,10 @@ class RuleBucklinByRounds(RuleScoreNum):
         n_candidates = len(self.candidates_)
         detailed_scores = []
         for k in range(1, n_candidates + 1):
-            self.scorer.k = k
             gross_scores = NiceDict({c: 0 for c in self.candidates_})
             weights = NiceDict({c: 0 for c in self.candidates_})
             for ballot, weight, voter in self.profile_converted_.items():
-                for c, value in self.scorer(ballot=ballot, voter=voter, candidates=self.candidates_).scores_.items():
+                for c, value in self.scorer.scores(ballot, voter=voter, candidates=self.candidates_, k=k).items():
                     gross_scores[c] += weight * value
                     weights[c] += weight
             scores = NiceDict({c: my_division(score, weights[c], divide_by_zero=0)
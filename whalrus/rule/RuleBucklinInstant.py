@@ -20,15 +20,15 @@ along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
 from whalrus.scorer.Scorer import Scorer
 from whalrus.scorer.ScorerBorda import ScorerBorda
-from whalrus.rule.RuleScore import RuleScore
+from whalrus.rule.RuleScoreMedian import RuleScoreMedian
 from whalrus.rule.RuleBucklinByRounds import RuleBucklinByRounds
 from whalrus.converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
-from whalrus.utils.Utils import cached_property, NiceDict, my_division, convert_number
+from whalrus.utils.Utils import cached_property, NiceDict, convert_number
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
 from whalrus.profile.Profile import Profile
 
 
-class RuleBucklinInstant(RuleScore):
+class RuleBucklinInstant(RuleScoreMedian):
     """
     Bucklin's rule (instant version).
 
@@ -83,59 +83,15 @@ class RuleBucklinInstant(RuleScore):
         if scorer is None:
             scorer = ScorerBorda(absent_give_points=True, absent_receive_points=None,
                                  unordered_give_points=True, unordered_receive_points=False)
-        # Parameters
-        self.scorer = scorer
-        self.default_median = default_median
-        super().__init__(*args, converter=converter, **kwargs)
+        super().__init__(*args, converter=converter, scorer=scorer, default_median=default_median, **kwargs)
 
     @cached_property
     def scores_(self) -> NiceDict:
-        levels_ = NiceDict({c: [] for c in self.candidates_})
-        weights_ = NiceDict({c: [] for c in self.candidates_})
-        for ballot, weight, voter in self.profile_converted_.items():
-            for c, level in self.scorer(ballot=ballot, voter=voter, candidates=self.candidates_).scores_.items():
-                levels_[c].append(level)
-                weights_[c].append(weight)
         scores_ = NiceDict()
         for c in self.candidates_:
-            if not levels_[c]:
+            if c not in self._medians_and_weights_:
                 scores_[c] = (self.default_median, 0)
                 continue
-            indexes = self.scorer.scale.argsort(levels_[c])
-            levels_[c] = [levels_[c][i] for i in indexes]
-            weights_[c] = [weights_[c][i] for i in indexes]
-            total_weight = sum(weights_[c])
-            half_total_weight = my_division(total_weight, 2)
-            cumulative_weight = 0
-            median = None
-            for i, weight in enumerate(weights_[c]):
-                cumulative_weight += weight
-                if cumulative_weight >= half_total_weight:
-                    median = levels_[c][i]
-                    break
-            support = convert_number(sum([
-                weights_[c][i] for i, level in enumerate(levels_[c]) if self.scorer.scale.ge(level, median)]))
-            scores_[c] = (median, support)
+            median, weight_below, _, total_weight = self._medians_and_weights_[c]
+            scores_[c] = (median, convert_number(total_weight - weight_below))
         return scores_
-
-    def compare_scores(self, one: tuple, another: tuple) -> int:
-        if one == another:
-            return 0
-        if self.scorer.scale.lt(one[0], another[0]):
-            return -1
-        if self.scorer.scale.gt(one[0], another[0]):
-            return 1
-        return -1 if one[1] < another[1] else 1
-
-    @cached_property
-    def scores_as_floats_(self) -> NiceDict:
-        """
-
-        :return: :attr:`scores_`, converted to floats.
-        """
-        def my_float(x):
-            try:
-                return float(x)
-            except ValueError:
-                return x
-        return NiceDict({c: (my_float(s), float(x)) for c, (s, x) in self.scores_.items()})
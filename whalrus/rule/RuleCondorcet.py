@@ -72,12 +72,12 @@ class RuleCondorcet(Rule):
 
         :return: the majority matrix (once computed with the given profile).
         """
-        return self.matrix_majority(self.profile_converted_)
+        return self.matrix_majority.clone()(self.profile_converted_, follow=self.follows_profile)
 
     @cached_property
     def order_(self) -> list:
         matrix = self.matrix_majority_
-        condorcet_winners = {c for c in matrix.candidates_
-                             if min({v for (i, j), v in matrix.as_dict_.items() if i == c and j != c}) == 1}
+        is_winner = (matrix.as_array_off_diagonal_ == 1).all(axis=1).tolist()
+        condorcet_winners = {c for c, winner in zip(matrix.candidates_as_list_, is_winner) if winner}
         other_candidates = self.candidates_ - condorcet_winners
         return [NiceSet(tie_class) for tie_class in [condorcet_winners, other_candidates] if tie_class]
@@ -21,6 +21,7 @@ along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 from whalrus.rule.Rule import Rule
 from whalrus.rule.RuleIteratedElimination import RuleIteratedElimination
 from whalrus.rule.RuleVeto import RuleVeto
+from whalrus.rule.RulePlurality import RulePlurality
 from whalrus.elimination.Elimination import Elimination
 from whalrus.elimination.EliminationLast import EliminationLast
 
@@ -32,6 +33,8 @@ class RuleCoombs(RuleIteratedElimination):
     :param `*args`: cf. parent class.
     :param base_rule: the default is :class:`RuleVeto`.
     :param elimination: the default is :class:`EliminationLast` with ``k=1``.
+    :param stop_at_majority: if True, then a candidate wins as soon as it has a strict majority of first places (among
+        the remaining candidates). Default: False.
     :param `**kwargs`: cf. parent class.
 
     At each round, the candidate with the worst Veto score is eliminated.
@@ -45,11 +48,41 @@ class RuleCoombs(RuleIteratedElimination):
     {'a': -9}
     >>> rule.winner_
     'a'
+
+    In the classic definition of Coombs' rule, a candidate wins as soon as it has a strict majority of first places.
+    Use ``stop_at_majority=True`` for this version, which may have a different winner:
+
+    >>> from whalrus.priority.Priority import Priority
+    >>> ballots = ['a > b > c > d', 'a > c > d > b', 'a > d > b > c', 'b > c > d > a', 'c > d > b > a']
+    >>> weights = [2, 2, 1, 2, 2]
+    >>> rule = RuleCoombs(ballots, weights=weights, tie_break=Priority.ASCENDING)
+    >>> rule.eliminations_[0].rule_.gross_scores_
+    {'a': -4, 'b': -2, 'c': -1, 'd': -2}
+    >>> rule.winner_
+    'b'
+    >>> rule = RuleCoombs(ballots, weights=weights, tie_break=Priority.ASCENDING, stop_at_majority=True)
+    >>> rule.winner_
+    'a'
+
+    In that case, the computation of the winner stops at the round where it has a majority. The other candidates are
+    sorted by the complete elimination process:
+
+    >>> rule.order_
+    [{'a'}, {'b'}, {'c'}, {'d'}]
     """
 
-    def __init__(self, *args, base_rule: Rule = None, elimination: Elimination = None, **kwargs):
+    def __init__(self, *args, base_rule: Rule = None, elimination: Elimination = None, stop_at_majority: bool = False,
+                 **kwargs):
         if base_rule is None:
             base_rule = RuleVeto()
         if elimination is None:
             elimination = EliminationLast(k=1)
+        self.stop_at_majority = stop_at_majority
         super().__init__(*args, base_rule=base_rule, elimination=elimination, **kwargs)
+
+    def _majority_winner(self, rule: Rule) -> object:
+        if not self.stop_at_majority:
+            return None
+        rule_plurality = RulePlurality(tie_break=rule.tie_break)(ballots=self.profile_converted_,
+                                                                 candidates=rule.candidates_)
+        return self._majority_candidate(rule_majority=rule_plurality)
@@ -21,9 +21,16 @@ along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 from whalrus.rule.Rule import Rule
 from whalrus.rule.RuleIteratedElimination import RuleIteratedElimination
 from whalrus.rule.RulePlurality import RulePlurality
+from whalrus.rule.RuleScoreNumAverage import RuleScoreNumAverage
 from whalrus.elimination.Elimination import Elimination
 from whalrus.elimination.EliminationLast import EliminationLast
 from whalrus.priority.Priority import Priority
+from whalrus.ballot.BallotOrder import BallotOrder
+from whalrus.utils.Utils import cached_property, set_to_list
+from typing import Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class RuleIRV(RuleIteratedElimination):
@@ -33,6 +40,10 @@ class RuleIRV(RuleIteratedElimination):
     :param `*args`: cf. parent class.
     :param base_rule: the default is :class:`RulePlurality`.
     :param elimination: the default is :class:`EliminationLast` with ``k=1``.
+    :param stop_at_majority: if True, then the computation of the winner stops as soon as a candidate has a strict
+        majority of the (non-abstaining) weight in the base rule. Default: False.
+    :param margin_max_orders: the maximal number of elimination orders for which the computation of
+        :attr:`margin_of_victory_bounds_` builds an alteration of the profile.
     :param `**kwargs`: cf. parent class.
 
     At each round, the candidate with the worst Plurality score is eliminated.
@@ -59,11 +70,373 @@ class RuleIRV(RuleIteratedElimination):
     {'a': 4}
     >>> rule.winner_
     'a'
+
+    With ``stop_at_majority=True``, the computation of the winner stops as soon as a candidate has a strict majority.
+    This does not change the winner, but it saves the computation of the next rounds. They are computed only if they
+    are needed, e.g. for :attr:`order_`:
+
+    >>> rule = RuleIRV(['a > b > c', 'b > c > a', 'c > b > a'], weights=[5, 2, 2], tie_break=Priority.ASCENDING,
+    ...                stop_at_majority=True)
+    >>> rule.winner_
+    'a'
+    >>> rule.order_
+    [{'a'}, {'b'}, {'c'}]
+
+    The margin of victory is the minimal number of voters who must change their ballots so that another candidate
+    wins:
+
+    >>> rule = RuleIRV(['a > b > c', 'b > a > c', 'c > b > a'], weights=[4, 3, 2], tie_break=Priority.ASCENDING)
+    >>> rule.winner_
+    'b'
+    >>> rule.margin_of_victory_
+    1
     """
 
-    def __init__(self, *args, base_rule: Rule = None, elimination: Elimination = None, **kwargs):
+    def __init__(self, *args, base_rule: Rule = None, elimination: Elimination = None, stop_at_majority: bool = False,
+                 margin_max_orders: int = 1000, **kwargs):
         if base_rule is None:
             base_rule = RulePlurality()
         if elimination is None:
             elimination = EliminationLast(k=1)
+        self.stop_at_majority = stop_at_majority
+        self.margin_max_orders = margin_max_orders
         super().__init__(*args, base_rule=base_rule, elimination=elimination, **kwargs)
+
+    def _majority_winner(self, rule: RuleScoreNumAverage) -> object:
+        if not self.stop_at_majority:
+            return None
+        return self._majority_candidate(rule_majority=rule)
+
+    # Margin of victory
+    # -----------------
+
+    @cached_property
+    def _margin_ballots_(self) -> dict:
+        # The distinct ballots, as an array of positions (the unranked candidates have position `n_candidates`), and
+        # their weights.
+        import numpy as np
+        if not (isinstance(self.base_rule, RulePlurality) and isinstance(self.elimination, EliminationLast)
+                and self.elimination.k == 1):
+            raise NotImplementedError('The margin of victory is only implemented for RuleIRV with its default base '
+                                      'rule and elimination.')
+        candidates = set_to_list(self.candidates_)
+        index = {c: i for i, c in enumerate(candidates)}
+        weights = {}
+        for ballot, weight, _ in self.profile_converted_.items():
+            weights[ballot] = weights.get(ballot, 0) + weight
+        positions = np.full((len(weights), len(candidates)), len(candidates), dtype=int)
+        for i, ballot in enumerate(weights):
+            if not isinstance(ballot, BallotOrder) or any(len(tie_class) > 1 for tie_class in ballot.as_weak_order):
+                raise NotImplementedError('The margin of victory is only implemented for strict orders.')
+            for position, tie_class in enumerate(ballot.as_weak_order):
+                for c in tie_class:
+                    if c in index:
+                        positions[i, index[c]] = position
+        if any(weight != int(weight) for weight in weights.values()):
+            raise NotImplementedError('The margin of victory is only implemented for integer weights.')
+        return {'candidates': candidates, 'positions': positions,
+                'weights': np.array([int(weight) for weight in weights.values()], dtype=np.int64)}
+
+    def _margin_tops(self, remaining: list, rows: 'np.ndarray' = None) -> 'np.ndarray':
+        """
+        The candidate supported by each ballot, among the remaining candidates.
+
+        :param remaining: the indexes of the remaining candidates.
+        :param rows: if given, only these ballots are considered.
+        :return: an array of candidate indexes (-1 for the ballots that rank none of the remaining candidates).
+        """
+        import numpy as np
+        positions = self._margin_ballots_['positions']
+        if rows is not None:
+            positions = positions[rows]
+        n_candidates = positions.shape[1]
+        mask = np.zeros(n_candidates, dtype=bool)
+        mask[remaining] = True
+        masked = np.where(mask, positions, n_candidates)
+        tops = masked.argmin(axis=1)
+        tops[masked[np.arange(len(tops)), tops] == n_candidates] = -1
+        return tops
+
+    def _margin_tally(self, tops: 'np.ndarray') -> 'np.ndarray':
+        """
+        The Plurality tally.
+
+        :param tops: the candidate supported by each ballot (cf. :meth:`_margin_tops`).
+        :return: an array of int: the score of each candidate.
+        """
+        import numpy as np
+        weights = self._margin_ballots_['weights']
+        voting = tops >= 0
+        return np.bincount(tops[voting], weights=weights[voting],
+                           minlength=len(self._margin_ballots_['candidates'])).round().astype(np.int64)
+
+    @cached_property
+    def _margin_deltas_(self) -> 'np.ndarray':
+        # `deltas[x, e]` is 0 if `x` survives a tie with `e`, and 1 otherwise: to eliminate `e`, the score of `x` must
+        # be at least the score of `e` plus this value.
+        import numpy as np
+        candidates = self._margin_ballots_['candidates']
+        tie_break = self.tie_break if self.propagate_tie_break else self.base_rule.tie_break
+        deltas = np.ones((len(candidates), len(candidates)), dtype=np.int64)
+        try:
+            order = tie_break.sort(candidates)
+        except ValueError:
+            return deltas
+        rank = {c: r for r, c in enumerate(order)}
+        for x, c in enumerate(candidates):
+            for e, d in enumerate(candidates):
+                if rank[c] < rank[d]:
+                    deltas[x, e] = 0
+        return deltas
+
+    def _round_lower_bound(self, tally: 'np.ndarray', remaining: list, e: int) -> int:
+        """
+        A lower bound on the number of changed ballots for a round.
+
+        :param tally: the Plurality tally of the round, in the original profile.
+        :param remaining: the indexes of the candidates of the round.
+        :param e: the index of the candidate to eliminate.
+        :return: the minimum, over the possible new scores `level` of `e`, of the maximum between the number of
+            ballots to remove from `e` and the number of ballots to add to the other candidates so that they are
+            above `e`.
+        """
+        import numpy as np
+        others = [x for x in remaining if x != e]
+        thresholds = tally[others] - self._margin_deltas_[others, e]
+
+        def cost_add(level):
+            return int(np.maximum(level - thresholds, 0).sum())
+
+        low, high = 0, int(tally[e])
+        while low < high:
+            level = (low + high) // 2
+            if cost_add(level) >= tally[e] - level:
+                high = level
+            else:
+                low = level + 1
+        result = max(tally[e] - low, cost_add(low))
+        if low > 0:
+            result = min(result, max(tally[e] - low + 1, cost_add(low - 1)))
+        return int(result)
+
+    def _margin_upper_bound(self, order: list) -> Union[int, float]:
+        """
+        Number of changed ballots in an alteration of the profile where `order` is the beginning of the elimination
+        order.
+
+        :param order: a list of candidate indexes. Its last element is the index of the winner.
+        :return: the number of changed ballots (or ``inf`` if no alteration is found).
+
+        Removing a ballot lowers the candidate that it supports in each round. The added ballots are built like in
+        :class:`ManipulationIRV`: a new ballot votes for a candidate until it is eliminated, and at each round, each
+        candidate receives just enough new ballots to be above the eliminated candidate. The ballots to remove are
+        chosen greedily, in batches, until there are enough of them to build the added ballots.
+        """
+        import numpy as np
+        n_candidates = len(self._margin_ballots_['candidates'])
+        weights = self._margin_ballots_['weights']
+        remaining = list(range(n_candidates))
+        supports = []
+        for e in order:
+            supports.append(self._margin_tops(remaining))
+            remaining.remove(e)
+        # The classes of ballots that support the same candidate in each round.
+        classes, inverse = np.unique(np.array(supports).T, axis=0, return_inverse=True)
+        available = np.bincount(inverse.ravel(), weights=weights).round().astype(np.int64)
+        n_rounds = len(order)
+        one_hot = np.zeros((len(classes), n_rounds, n_candidates), dtype=np.int64)
+        for r in range(n_rounds):
+            voting = classes[:, r] >= 0
+            one_hot[np.flatnonzero(voting), r, classes[voting, r]] = 1
+        base = np.einsum('k,krc->rc', available, one_hot)
+        others = np.ones((n_rounds, n_candidates), dtype=np.int64)
+        remaining = list(range(n_candidates))
+        for r, e in enumerate(order):
+            others[r, [x for x in range(n_candidates) if x not in remaining or x == e]] = 0
+            remaining.remove(e)
+        deltas = self._margin_deltas_[:, order].T
+
+        def n_added(tallies: 'np.ndarray') -> 'np.ndarray':
+            # Number of added ballots needed, for a batch of tallies of shape (batch, rounds, candidates).
+            locked = np.zeros((tallies.shape[0], n_candidates), dtype=np.int64)
+            floating = np.zeros(tallies.shape[0], dtype=np.int64)
+            created = np.zeros(tallies.shape[0], dtype=np.int64)
+            for r, e in enumerate(order):
+                totals = tallies[:, r, :] + locked
+                needs = np.maximum(totals[:, e:e + 1] + deltas[r] - totals, 0) * others[r]
+                total_needs = needs.sum(axis=1)
+                shortage = np.maximum(total_needs - floating, 0)
+                created += shortage
+                floating += shortage - total_needs
+                locked += needs
+                floating += locked[:, e]
+                locked[:, e] = 0
+            return created
+
+        removed = np.zeros(len(classes), dtype=np.int64)
+        current = base.copy()
+        n_removed = 0
+        deficit = int(n_added(current[np.newaxis])[0])
+        while deficit > 0:
+            batch = np.minimum(max(1, deficit // (2 * n_candidates)), available - removed)
+            candidates = np.flatnonzero(batch > 0)
+            if len(candidates) == 0:
+                return float('inf')
+            new_deficits = (n_added(current[np.newaxis] - batch[candidates, np.newaxis, np.newaxis]
+                                    * one_hot[candidates]) - n_removed - batch[candidates])
+            best = int(np.argmin(new_deficits))
+            if new_deficits[best] >= deficit:
+                return float('inf')
+            k, amount = candidates[best], int(batch[candidates[best]])
+            if new_deficits[best] < 0 and amount > 1:
+                # Remove just enough ballots of this class.
+                low, high = 1, amount
+                while low < high:
+                    middle = (low + high) // 2
+                    if n_added(current[np.newaxis] - middle * one_hot[k][np.newaxis])[0] <= n_removed + middle:
+                        high = middle
+                    else:
+                        low = middle + 1
+                amount = low
+            removed[k] += amount
+            n_removed += amount
+            current -= amount * one_hot[k]
+            deficit = int(n_added(current[np.newaxis])[0]) - n_removed
+        return n_removed
+
+    @cached_property
+    def margin_of_victory_bounds_(self) -> tuple:
+        """
+        Bounds on the margin of victory.
+
+        :return: a pair (lower bound, upper bound) on :attr:`margin_of_victory_` (or (None, None) if there is only one
+            candidate).
+
+        The winner `w` is not the winner anymore as soon as it is eliminated, so only the beginning of the elimination
+        order matters, up to the elimination of `w`. A round is only possible if enough ballots are removed from the
+        eliminated candidate, or enough ballots are added to the other candidates (cf. :meth:`_round_lower_bound`). The
+        lower bound of an elimination order is the maximum of the lower bounds of its rounds. Since the Plurality tally
+        of a round only depends on its candidates, the minimum over all the orders is computed by a branch and bound
+        search over the sets of remaining candidates, with memoization. The tallies of the rounds of the rule are
+        reused, and each new tally is obtained from the previous one by transferring the ballots of the eliminated
+        candidate.
+
+        For the upper bound, an alteration of the profile is built for some elimination orders
+        (cf. :meth:`_margin_upper_bound`): first along a greedy order, then along the orders whose lower bound is less
+        than the best upper bound found so far, by increasing lower bound, until the bounds meet or
+        :attr:`margin_max_orders` orders have been tried.
+        """
+        import numpy as np
+        if len(self.candidates_) == 1:
+            return None, None
+        candidates = self._margin_ballots_['candidates']
+        n_candidates = len(candidates)
+        w = candidates.index(self.winner_)
+        tallies = {}
+        for elimination in self.eliminations_:
+            key = frozenset(candidates.index(c) for c in elimination.rule_.candidates_)
+            tallies[key] = np.array([elimination.rule_.gross_scores_.get(c, 0) for c in candidates]).astype(np.int64)
+        round_bounds = {}
+
+        def tally(remaining: frozenset, tops) -> 'np.ndarray':
+            if remaining not in tallies:
+                tallies[remaining] = self._margin_tally(tops())
+            return tallies[remaining]
+
+        def child_tops(tops, remaining: frozenset, e: int):
+            # Lazy computation of the supported candidates, when `e` is eliminated: only its ballots are transferred.
+            cache = []
+
+            def f():
+                if not cache:
+                    parent = tops().copy()
+                    rows = np.flatnonzero(parent == e)
+                    parent[rows] = self._margin_tops(sorted(remaining - {e}), rows)
+                    cache.append(parent)
+                return cache[0]
+            return f
+
+        def round_bound(remaining: frozenset, tops, e: int) -> int:
+            if (remaining, e) not in round_bounds:
+                round_bounds[(remaining, e)] = self._round_lower_bound(tally(remaining, tops), sorted(remaining), e)
+            return round_bounds[(remaining, e)]
+
+        # `memo[remaining]` is a pair (value, exact). If exact, the value is the minimal lower bound of the orders from
+        # these remaining candidates. Otherwise, it is only known to be at least the value.
+        memo = {}
+
+        def cost_to_go(remaining: frozenset, tops, bound) -> Union[int, float]:
+            if len(remaining) == 1:
+                return float('inf')
+            if remaining in memo:
+                value, exact = memo[remaining]
+                if exact or value >= bound:
+                    return value
+            best = bound
+            for e in sorted(remaining, key=lambda x: round_bound(remaining, tops, x)):
+                value = round_bound(remaining, tops, e)
+                if value >= best:
+                    break
+                if e == w:
+                    best = value
+                else:
+                    best = min(best, max(value, cost_to_go(remaining - {e}, child_tops(tops, remaining, e), best)))
+            memo[remaining] = (best, best < bound)
+            return best
+
+        full = frozenset(range(n_candidates))
+        root_cache = []
+
+        def root_tops():
+            if not root_cache:
+                root_cache.append(self._margin_tops(list(range(n_candidates))))
+            return root_cache[0]
+
+        # Upper bound for a greedy order.
+        order, remaining, tops = [], full, root_tops
+        while w not in order:
+            e = min(remaining, key=lambda x: (round_bound(remaining, tops, x), x != w))
+            if len(remaining) == 2:
+                e = w
+            order.append(e)
+            tops = child_tops(tops, remaining, e)
+            remaining = remaining - {e}
+        upper = self._margin_upper_bound(order)
+        lower = cost_to_go(full, root_tops, upper)
+        if lower >= upper:
+            return upper, upper
+        # Branch and bound on the orders, to improve the upper bound.
+        n_orders = 1
+
+        def explore(remaining: frozenset, tops, order: list, path_bound: int) -> None:
+            nonlocal upper, n_orders
+            for e in sorted(remaining, key=lambda x: round_bound(remaining, tops, x)):
+                if upper <= lower or n_orders >= self.margin_max_orders:
+                    return
+                value = max(path_bound, round_bound(remaining, tops, e))
+                if e == w:
+                    if value < upper:
+                        n_orders += 1
+                        upper = min(upper, self._margin_upper_bound(order + [w]))
+                    continue
+                new_tops = child_tops(tops, remaining, e)
+                if max(value, cost_to_go(remaining - {e}, new_tops, upper)) < upper:
+                    explore(remaining - {e}, new_tops, order + [e], value)
+
+        explore(full, root_tops, [], 0)
+        return lower, upper
+
+    @cached_property
+    def margin_of_victory_(self) -> Union[int, None]:
+        """
+        The margin of victory.
+
+        :return: the minimal number of voters who must change their ballots so that another candidate than
+            :attr:`winner_` wins. It is None if it is not known exactly, i.e. if the two bounds of
+            :attr:`margin_of_victory_bounds_` are different (or if there is only one candidate).
+
+        Unlike a brute force search, the computation never evaluates the rule again. With an unambiguous tie-breaking
+        rule, the eliminations must be strict.
+        """
+        lower, upper = self.margin_of_victory_bounds_
+        return lower if lower == upper else None
@@ -18,13 +18,13 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
-from whalrus.utils.Utils import cached_property
+from whalrus.utils.Utils import cached_property, NiceSet
 from whalrus.rule.Rule import Rule
 from whalrus.rule.RulePlurality import RulePlurality
+from whalrus.rule.RuleScoreNumAverage import RuleScoreNumAverage
 from whalrus.priority.Priority import Priority
 from whalrus.elimination.Elimination import Elimination
 from whalrus.elimination.EliminationLast import EliminationLast
-from copy import deepcopy
 from itertools import chain
 
 
@@ -38,6 +38,9 @@ class RuleIteratedElimination(Rule):
     :param elimination: the elimination algorithm. Default: ``EliminationLast(k=1)``.
     :param propagate_tie_break: if True (default), then the tie-breaking rule of this object is also used for the
         base rule (cf. below).
+    :param keep_profiles: if True (default), then the rule of each round keeps its profiles (``profile_original_``
+        and ``profile_converted_``). If False, they are discarded as soon as the round is computed, so that the memory
+        used by the rounds does not depend on the number of voters (cf. below).
     :param `**kwargs`: cf. parent class.
 
     >>> irv = RuleIteratedElimination(['a > b > c', 'b > a > c', 'c > a > b'], weights=[2, 3, 4],
@@ -98,21 +101,109 @@ class RuleIteratedElimination(Rule):
 
     >>> rule.strict_order_
     ['a', 'c', 'b', 'd', 'e']
+
+    The rounds are computed lazily. In particular, the computation of :attr:`cowinners_` (hence, in most cases, of
+    :attr:`winner_`) stops as soon as only one candidate is qualified:
+
+    >>> irv = RuleIteratedElimination(['a > b > c > d', 'b > a > c > d', 'c > a > b > d'], weights=[2, 3, 4],
+    ...                               base_rule=RulePlurality())
+    >>> irv.winner_
+    'b'
+
+    The rounds can also be iterated lazily with :meth:`iter_eliminations`. With ``keep_profiles=False``, the rule of
+    each round does not keep its profiles, but the results that were computed during the round remain available:
+
+    >>> irv = RuleIteratedElimination(['a > b > c > d', 'b > a > c > d', 'c > a > b > d'], weights=[2, 3, 4],
+    ...                               base_rule=RulePlurality(), keep_profiles=False)
+    >>> for elimination in irv.iter_eliminations():
+    ...     print(elimination.rule_.gross_scores_, elimination.rule_.profile_converted_)
+    {'a': 2, 'b': 3, 'c': 4, 'd': 0} None
+    {'a': 2, 'b': 3, 'c': 4} None
+    {'b': 5, 'c': 4} None
+    {'b': 9} None
     """
 
     def __init__(self, *args, base_rule: Rule = None, elimination: Elimination = None, propagate_tie_break=True,
-                 **kwargs):
+                 keep_profiles=True, **kwargs):
         if elimination is None:
             elimination = EliminationLast(k=1)
         self.base_rule = base_rule
         self.elimination = elimination
         self.propagate_tie_break = propagate_tie_break
+        self.keep_profiles = keep_profiles
         super().__init__(*args, **kwargs)
 
     def _check_profile(self, candidates: set) -> None:
         # We delegate this task to the base rule.
         pass
 
+    @cached_property
+    def _rounds_computed_(self) -> dict:
+        # The rounds that have been computed so far (cf. :meth:`iter_eliminations`), and the first candidate found to
+        # have a strict majority in one of them (cf. :meth:`_majority_winner`).
+        return {'eliminations': [], 'majority_winner': None}
+
+    def _majority_winner(self, rule: Rule) -> object:
+        """
+        Candidate that wins at this round, before the end of the elimination process.
+
+        :param rule: the base rule, once applied to the candidates of this round.
+        :return: None if the winner is not known yet (which is always the case by default). Otherwise, the winner.
+
+        This method is meant to be overridden by subclasses, such as :class:`RuleIRV` with the option
+        ``stop_at_majority``. The rounds are still computed until the end when :attr:`order_` is needed, but
+        :attr:`cowinners_` (hence, in most cases, :attr:`winner_`) does not compute the rounds after this one.
+        """
+        return None
+
+    @staticmethod
+    def _majority_candidate(rule_majority: RuleScoreNumAverage) -> object:
+        """
+        Auxiliary method for the implementations of :meth:`_majority_winner` based on a strict majority.
+
+        :param rule_majority: a rule (such as :class:`RulePlurality`) whose gross scores are compared to its weights.
+        :return: the candidate whose gross score is strictly greater than half its weight, or None if there is none.
+        """
+        for c, score in rule_majority.gross_scores_.items():
+            if 2 * score > rule_majority.weights_[c]:
+                return c
+        return None
+
+    def _compute_round(self, candidates: set) -> Elimination:
+        rule = self.base_rule.clone()
+        if self.propagate_tie_break:
+            rule.tie_break = self.tie_break
+        rule(ballots=self.profile_converted_, candidates=candidates)
+        computed = self._rounds_computed_
+        if computed['majority_winner'] is None:
+            computed['majority_winner'] = self._majority_winner(rule)
+        elimination = self.elimination.clone()
+        elimination(rule=rule)
+        # Compute the results of the round before possibly discarding the profiles.
+        _ = elimination.qualified_
+        if not self.keep_profiles:
+            rule.profile_original_ = None
+            rule.profile_converted_ = None
+        return elimination
+
+    def iter_eliminations(self):
+        """
+        Iterate over the elimination rounds.
+
+        :return: a generator of :class:`Elimination` objects. The first one corresponds to the first round, etc. Each
+            round is computed only when it is needed (and only once).
+        """
+        eliminations = self._rounds_computed_['eliminations']
+        i = 0
+        while True:
+            if i == len(eliminations):
+                candidates = eliminations[-1].qualified_ if eliminations else self.candidates_
+                if not candidates:
+                    return
+                eliminations.append(self._compute_round(candidates))
+            yield eliminations[i]
+            i += 1
+
     @cached_property
     def eliminations_(self) -> list:
         """
@@ -120,21 +211,25 @@ class RuleIteratedElimination(Rule):
 
         :return: a list of :class:`Elimination` objects. The first one corresponds to the first round, etc.
         """
-        self.elimination.delete_cache()
-        self.base_rule.delete_cache()
-        eliminations = []
-        candidates = self.candidates_
-        while candidates:
-            elimination = deepcopy(self.elimination)
-            rule = deepcopy(self.base_rule)
-            if self.propagate_tie_break:
-                rule.tie_break = self.tie_break
-            rule(ballots=self.profile_converted_, candidates=candidates)
-            elimination(rule=rule)
-            eliminations.append(elimination)
-            candidates = elimination.qualified_
-        return eliminations
+        return list(self.iter_eliminations())
+
+    @cached_property
+    def cowinners_(self) -> NiceSet:
+        for elimination in self.iter_eliminations():
+            if self._rounds_computed_['majority_winner'] is not None:
+                return NiceSet({self._rounds_computed_['majority_winner']})
+            if len(elimination.qualified_) == 1:
+                # The last qualified candidate will be eliminated alone at the next round.
+                return elimination.qualified_
+            if not elimination.qualified_:
+                return elimination.eliminated_order_[0]
 
     @cached_property
     def order_(self) -> list:
-        return list(chain(*[elimination.eliminated_order_ for elimination in self.eliminations_[::-1]]))
+        order = list(chain(*[elimination.eliminated_order_ for elimination in self.eliminations_[::-1]]))
+        majority_winner = self._rounds_computed_['majority_winner']
+        if majority_winner is None:
+            return order
+        # The candidate who won by majority comes first, even if the remaining rounds would eliminate it.
+        others = [NiceSet(tie_class - {majority_winner}) for tie_class in order]
+        return [NiceSet({majority_winner})] + [tie_class for tie_class in others if tie_class]
@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import time
+import numpy as np
+from whalrus.rule.Rule import Rule
+from whalrus.converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
+from whalrus.converter_ballot.ConverterBallot import ConverterBallot
+from whalrus.matrix.Matrix import Matrix
+from whalrus.matrix.MatrixWeightedMajority import MatrixWeightedMajority
+from whalrus.utils.Utils import cached_property, NiceSet, convert_number, strongly_connected_components
+
+
+class RuleKemeny(Rule):
+    """
+    Kemeny-Young rule.
+
+    :param `*args`: cf. parent class.
+    :param converter: the default is :class:`ConverterBallotToOrder`.
+    :param matrix_weighted_majority: a :class:`Matrix`. Default: :class:`MatrixWeightedMajority`.
+    :param max_candidates_dp: the maximal number of candidates of a component (cf. below) for which the dynamic
+        programming is used. Larger components are dealt with by branch and bound.
+    :param max_nodes: if not None, the maximal number of nodes explored by the branch and bound (in total).
+    :param max_time: if not None, the maximal time (in seconds) spent in the branch and bound (in total).
+    :param `**kwargs`: cf. parent class.
+
+    The Kemeny score of a strict order is the sum of the coefficients `W(c, d)` of the weighted majority matrix, for
+    all the pairs of candidates such that `c` is before `d` in the order. A Kemeny order is a strict order with the
+    maximal Kemeny score.
+
+    >>> rule = RuleKemeny(['a > b > c', 'b > c > a', 'c > a > b'], weights=[4, 3, 2])
+    >>> rule.kemeny_order_
+    ['a', 'b', 'c']
+    >>> rule.kemeny_score_
+    Fraction(17, 9)
+    >>> rule.winner_
+    'a'
+
+    There may be several Kemeny orders. The cowinners are the candidates that are first in at least one of them. Then,
+    the next equivalence class of :attr:`order_` is obtained in the same way with the remaining candidates, etc.
+
+    >>> rule = RuleKemeny(['a > b > c', 'b > c > a', 'c > a > b'])
+    >>> rule.order_
+    [{'a', 'b', 'c'}]
+
+    The candidates are first split into components: if all the candidates of a component beat all the candidates of
+    another one in the weighted majority matrix, then they are before them in all the Kemeny orders (this is the
+    extended Condorcet criterion). Each component of at most :attr:`max_candidates_dp` candidates is solved by dynamic
+    programming over the subsets of its candidates. Larger components are solved by branch and bound: the orders are
+    built from the first candidate on, and the upper bound of the remaining candidates is the sum, for each pair of
+    them, of the best of the two coefficients. Two partial orders with the same remaining candidates have the same best
+    completion, so only the best of them is explored. If the branch and bound reaches :attr:`max_nodes` or
+    :attr:`max_time`, then the best order found is used and :attr:`is_exact_` is False.
+    """
+
+    def __init__(self, *args, converter: ConverterBallot = None, matrix_weighted_majority: Matrix = None,
+                 max_candidates_dp: int = 20, max_nodes: int = None, max_time: float = None, **kwargs):
+        if converter is None:
+            converter = ConverterBallotToOrder()
+        if matrix_weighted_majority is None:
+            matrix_weighted_majority = MatrixWeightedMajority()
+        self.matrix_weighted_majority = matrix_weighted_majority
+        self.max_candidates_dp = max_candidates_dp
+        self.max_nodes = max_nodes
+        self.max_time = max_time
+        super().__init__(*args, converter=converter, **kwargs)
+
+    @cached_property
+    def matrix_weighted_majority_(self):
+        """
+        The weighted majority matrix.
+
+        :return: the weighted majority matrix (once computed with the given profile).
+        """
+        return self.matrix_weighted_majority.clone()(self.profile_converted_, candidates=self.candidates_,
+                                                     follow=self.follows_profile)
+
+    @cached_property
+    def _weights_(self) -> np.ndarray:
+        # The weighted majority matrix as floats, with a null diagonal.
+        weights = self.matrix_weighted_majority_.as_array_of_floats_.copy()
+        np.fill_diagonal(weights, 0)
+        return weights
+
+    @cached_property
+    def _tolerance_(self) -> float:
+        # The tolerance used to compare the Kemeny scores, computed with floats.
+        return 1e-9 * max(1., float(np.abs(self._weights_).sum()))
+
+    # Components
+    # ==========
+
+    @cached_property
+    def components_(self) -> list:
+        """
+        The components of the candidates.
+
+        :return: a list of :class:`NiceSet`. All the candidates of a component beat all the candidates of the next
+            components in the weighted majority matrix, and the components are minimal for this property.
+        """
+        weights = self._weights_
+        candidates = self.matrix_weighted_majority_.candidates_as_list_
+        components = strongly_connected_components(weights >= weights.T - self._tolerance_)
+        return [NiceSet(candidates[i] for i in component) for component in components]
+
+    # Dynamic programming
+    # ===================
+
+    @staticmethod
+    def _dynamic_programming(weights: np.ndarray) -> np.ndarray:
+        """
+        Best Kemeny scores of the subsets of candidates.
+
+        :param weights: the weighted majority matrix of some candidates (with a null diagonal).
+        :return: an array `f` such that, for each subset `S` of the candidates (coded as a bit mask), `f[S]` is the best
+            Kemeny score of a strict order over `S`. It is computed by increasing size of `S`: the first candidate `c`
+            in an order over `S` gets ``weights[c, d]`` for each other `d` in `S`, then the rest is an order over
+            ``S - {c}``.
+        """
+        n = len(weights)
+        subsets = np.arange(2 ** n)
+        sizes = np.zeros(2 ** n, dtype=int)
+        for c in range(n):
+            sizes += (subsets >> c) & 1
+        best = np.zeros(2 ** n)
+        singletons = 1 << np.arange(n)
+        for size in range(2, n + 1):
+            layer = subsets[sizes == size]
+            members = (layer[:, np.newaxis] & singletons) != 0
+            # Sum of the coefficients of each candidate against the members of the subset.
+            gains = members.astype(float) @ weights.T
+            best[layer] = np.where(members, gains + best[layer[:, np.newaxis] ^ singletons], -np.inf).max(axis=1)
+        return best
+
+    def _first_candidates_dp(self, weights: np.ndarray, best: np.ndarray, subset: int) -> list:
+        """
+        Candidates that are first in a Kemeny order over a subset.
+
+        :param weights: the weighted majority matrix.
+        :param best: the result of :meth:`_dynamic_programming`.
+        :param subset: a subset of the candidates (bit mask).
+        :return: the list of the candidates `c` of the subset that are first in an optimal order over the subset.
+        """
+        members = [c for c in range(len(weights)) if subset >> c & 1]
+        return [c for c in members
+                if weights[c, members].sum() + best[subset ^ (1 << c)] >= best[subset] - self._tolerance_]
+
+    def _component_order_dp(self, weights: np.ndarray) -> tuple:
+        """
+        Solve a component by dynamic programming.
+
+        :param weights: the weighted majority matrix of the candidates of the component.
+        :return: a pair: a Kemeny order (list of indexes) and the list of the equivalence classes (lists of indexes).
+        """
+        best = self._dynamic_programming(weights)
+        subset = 2 ** len(weights) - 1
+        order = []
+        while subset:
+            c = self._first_candidates_dp(weights, best, subset)[0]
+            order.append(c)
+            subset ^= 1 << c
+        subset = 2 ** len(weights) - 1
+        classes = []
+        while subset:
+            first = self._first_candidates_dp(weights, best, subset)
+            classes.append(first)
+            for c in first:
+                subset ^= 1 << c
+        return order, classes
+
+    # Branch and bound
+    # ================
+
+    @cached_property
+    def _budget_(self) -> dict:
+        # The resources used by the branch and bound so far.
+        return {'nodes': 0, 'start': time.perf_counter(), 'exceeded': False}
+
+    def _out_of_budget(self) -> bool:
+        """
+        Check the budget of the branch and bound, and count one node.
+
+        :return: True if :attr:`max_nodes` or :attr:`max_time` is exceeded.
+        """
+        budget = self._budget_
+        budget['nodes'] += 1
+        if (self.max_nodes is not None and budget['nodes'] > self.max_nodes) or (
+                self.max_time is not None and time.perf_counter() - budget['start'] > self.max_time):
+            budget['exceeded'] = True
+        return budget['exceeded']
+
+    @staticmethod
+    def _score(weights: np.ndarray, order: list) -> float:
+        """
+        Kemeny score of an order.
+
+        :param weights: the weighted majority matrix.
+        :param order: a list of candidate indexes.
+        :return: the Kemeny score.
+        """
+        return float(np.triu(weights[np.ix_(order, order)], 1).sum())
+
+    @staticmethod
+    def _local_search(weights: np.ndarray, order: list) -> list:
+        """
+        Improve an order by moving one candidate at a time.
+
+        :param weights: the weighted majority matrix.
+        :param order: a list of candidate indexes.
+        :return: an order where no candidate can be moved to another position to increase the Kemeny score.
+        """
+        order = list(order)
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(order)):
+                c = order[i]
+                others = order[:i] + order[i + 1:]
+                # Gain of putting `c` at each position `j` of `others`, compared to the first position.
+                differences = weights[others, c] - weights[c, others]
+                gains = np.concatenate([[0.], np.cumsum(differences)])
+                j = int(np.argmax(gains))
+                if gains[j] > gains[i] + 1e-12:
+                    order = others[:j] + [c] + others[j:]
+                    improved = True
+                    break
+        return order
+
+    def _branch_and_bound(self, weights: np.ndarray, candidates: list, target: float = None) -> tuple:
+        """
+        Branch and bound for Kemeny orders.
+
+        :param weights: the weighted majority matrix.
+        :param candidates: a list of candidate indexes.
+        :param target: if given, the search stops as soon as an order with at least this score is found, and the
+            incumbent is not used.
+        :return: a pair: the best score and the best order found (or None, None if the target is not reached).
+        """
+        tolerance = self._tolerance_
+        bests = np.maximum(weights, weights.T)
+        best_order, best_score = None, -np.inf
+        if target is None:
+            start = sorted(candidates, key=lambda c: - weights[c, candidates].sum())
+            best_order = self._local_search(weights, start)
+            best_score = self._score(weights, best_order)
+            threshold = best_score + tolerance
+        else:
+            threshold = target - tolerance
+        # Best prefix score for each set of remaining candidates.
+        seen = {}
+
+        def explore(prefix: list, remaining: list, score: float, bound: float) -> bool:
+            # Returns True if the search must stop.
+            nonlocal best_order, best_score, threshold
+            if not remaining:
+                if score > best_score:
+                    best_order, best_score = prefix, score
+                    if target is not None:
+                        return True
+                    threshold = best_score + tolerance
+                return False
+            if self._out_of_budget():
+                return True
+            key = frozenset(remaining)
+            if seen.get(key, -np.inf) >= score - tolerance:
+                return False
+            seen[key] = score
+            gains = weights[np.ix_(remaining, remaining)].sum(axis=1)
+            losses = bests[np.ix_(remaining, remaining)].sum(axis=1)
+            for i in np.argsort(-gains, kind='stable').tolist():
+                if score + gains[i] + bound - losses[i] < threshold:
+                    continue
+                c = remaining[i]
+                if explore(prefix + [c], remaining[:i] + remaining[i + 1:], score + gains[i], bound - losses[i]):
+                    return True
+            return False
+
+        bound = float(np.triu(bests[np.ix_(candidates, candidates)], 1).sum())
+        explore([], list(candidates), 0., bound)
+        if best_order is None:
+            return None, None
+        return best_score, best_order
+
+    def _component_order_bb(self, weights: np.ndarray) -> tuple:
+        """
+        Solve a component by branch and bound.
+
+        :param weights: the weighted majority matrix of the candidates of the component.
+        :return: a pair: a Kemeny order (list of indexes) and the list of the equivalence classes (lists of indexes).
+        """
+        tolerance = self._tolerance_
+        bests = np.maximum(weights, weights.T)
+        remaining = list(range(len(weights)))
+        score, order = self._branch_and_bound(weights, remaining)
+        kemeny_order = order
+        classes = []
+        while remaining:
+            first = [order[0]]
+            for c in remaining:
+                if c == order[0] or self._budget_['exceeded']:
+                    continue
+                others = [d for d in remaining if d != c]
+                gain = weights[c, others].sum()
+                if gain + np.triu(bests[np.ix_(others, others)], 1).sum() < score - tolerance:
+                    continue
+                if not others or self._branch_and_bound(weights, others, target=score - gain)[1] is not None:
+                    first.append(c)
+            classes.append(sorted(first))
+            gain = weights[order[0], [d for d in remaining if d != order[0]]].sum()
+            remaining = [c for c in remaining if c not in first]
+            if len(first) == 1:
+                score, order = score - gain, order[1:]
+            elif remaining:
+                score, order = self._branch_and_bound(weights, remaining)
+        return kemeny_order, classes
+
+    # Results
+    # =======
+
+    @cached_property
+    def _results_(self) -> dict:
+        candidates = self.matrix_weighted_majority_.candidates_as_list_
+        index = {c: i for i, c in enumerate(candidates)}
+        kemeny_order = []
+        order = []
+        for component in self.components_:
+            indexes = [index[c] for c in sorted(component, key=index.get)]
+            weights = self._weights_[np.ix_(indexes, indexes)]
+            if len(indexes) <= self.max_candidates_dp:
+                component_order, classes = self._component_order_dp(weights)
+            else:
+                component_order, classes = self._component_order_bb(weights)
+            kemeny_order += [candidates[indexes[i]] for i in component_order]
+            order += [NiceSet(candidates[indexes[i]] for i in tie_class) for tie_class in classes]
+        return {'kemeny_order': kemeny_order, 'order': order, 'exact': not self._budget_['exceeded']}
+
+    @cached_property
+    def order_(self) -> list:
+        return self._results_['order']
+
+    @cached_property
+    def kemeny_order_(self) -> list:
+        """
+        A Kemeny order.
+
+        :return: a list of candidates: a strict order with the maximal Kemeny score.
+        """
+        return self._results_['kemeny_order']
+
+    @cached_property
+    def kemeny_score_(self) -> object:
+        """
+        The Kemeny score of :attr:`kemeny_order_`.
+
+        :return: a number (computed exactly with the weighted majority matrix).
+        """
+        matrix = self.matrix_weighted_majority_
+        order = self.kemeny_order_
+        return convert_number(sum(matrix.as_dict_[(c, d)] for i, c in enumerate(order) for d in order[i + 1:]))
+
+    @cached_property
+    def is_exact_(self) -> bool:
+        """
+        Whether the result is exact.
+
+        :return: False if the branch and bound has reached :attr:`max_nodes` or :attr:`max_time`. In that case,
+            :attr:`kemeny_order_` is only the best order found, and :attr:`order_` may be inaccurate.
+        """
+        return self._results_['exact']
@@ -22,13 +22,13 @@ from whalrus.scorer.Scorer import Scorer
 from whalrus.scorer.ScorerLevels import ScorerLevels
 from whalrus.scale.Scale import Scale
 from whalrus.scale.ScaleFromList import ScaleFromList
-from whalrus.rule.RuleScore import RuleScore
+from whalrus.rule.RuleScoreMedian import RuleScoreMedian
 from whalrus.converter_ballot.ConverterBallotToLevels import ConverterBallotToLevels
 from whalrus.utils.Utils import cached_property, NiceDict, my_division
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
 
 
-class RuleMajorityJudgment(RuleScore):
+class RuleMajorityJudgment(RuleScoreMedian):
     """
     Majority Judgment.
 
@@ -83,10 +83,7 @@ class RuleMajorityJudgment(RuleScore):
             scorer = ScorerLevels(scale=scale)
         if converter is None:
             converter = ConverterBallotToLevels(scale=scorer.scale)
-        # Parameters
-        self.scorer = scorer
-        self.default_median = default_median
-        super().__init__(*args, converter=converter, **kwargs)
+        super().__init__(*args, converter=converter, scorer=scorer, default_median=default_median, **kwargs)
 
     @cached_property
     def scores_(self) -> NiceDict:
@@ -95,55 +92,14 @@ class RuleMajorityJudgment(RuleScore):
 
         :return: a :class:`NiceDict` of triples.
         """
-        levels_ = NiceDict({c: [] for c in self.candidates_})
-        weights_ = NiceDict({c: [] for c in self.candidates_})
-        for ballot, weight, voter in self.profile_converted_.items():
-            for c, level in self.scorer(ballot=ballot, voter=voter, candidates=self.candidates_).scores_.items():
-                levels_[c].append(level)
-                weights_[c].append(weight)
         scores_ = NiceDict()
         for c in self.candidates_:
-            if not levels_[c]:
+            if c not in self._medians_and_weights_:
                 scores_[c] = (self.default_median, 0, 0)
                 continue
-            indexes = self.scorer.scale.argsort(levels_[c])
-            levels_[c] = [levels_[c][i] for i in indexes]
-            weights_[c] = [weights_[c][i] for i in indexes]
-            total_weight = sum(weights_[c])
-            half_total_weight = my_division(total_weight, 2)
-            cumulative_weight = 0
-            median = None
-            for i, weight in enumerate(weights_[c]):
-                cumulative_weight += weight
-                if cumulative_weight >= half_total_weight:
-                    median = levels_[c][i]
-                    break
-            p = sum([weights_[c][i] for i, level in enumerate(levels_[c]) if self.scorer.scale.gt(level, median)])
-            q = sum([weights_[c][i] for i, level in enumerate(levels_[c]) if self.scorer.scale.lt(level, median)])
+            median, q, p, total_weight = self._medians_and_weights_[c]
             if p > q:
                 scores_[c] = (median, my_division(p, total_weight), -my_division(q, total_weight))
             else:
                 scores_[c] = (median, -my_division(q, total_weight), my_division(p, total_weight))
         return scores_
-
-    def compare_scores(self, one: tuple, another: tuple) -> int:
-        if one == another:
-            return 0
-        if self.scorer.scale.lt(one[0], another[0]):
-            return -1
-        if self.scorer.scale.gt(one[0], another[0]):
-            return 1
-        return -1 if (one[1], one[2]) < (another[1], another[2]) else 1
-
-    @cached_property
-    def scores_as_floats_(self) -> NiceDict:
-        """
-
-        :return: :attr:`scores_`, converted to floats.
-        """
-        def my_float(x):
-            try:
-                return float(x)
-            except ValueError:
-                return x
-        return NiceDict({c: (my_float(s), float(x), float(y)) for c, (s, x, y) in self.scores_.items()})
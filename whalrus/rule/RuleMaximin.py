@@ -63,10 +63,12 @@ class RuleMaximin(RuleScoreNum):
 
         :return: the weighted majority matrix (once computed with the given profile).
         """
-        return self.matrix_weighted_majority(self.profile_converted_)
+        return self.matrix_weighted_majority.clone()(self.profile_converted_, follow=self.follows_profile)
 
     @cached_property
     def scores_(self) -> NiceDict:
         matrix = self.matrix_weighted_majority_
-        return NiceDict({c: min({v for (i, j), v in matrix.as_dict_.items() if i == c and j != c})
-                         for c in matrix.candidates_})
+        if len(matrix.candidates_as_list_) <= 1:
+            # There is no opponent: the minimum is taken over an empty row.
+            return NiceDict({c: 0 for c in matrix.candidates_as_list_})
+        return NiceDict(zip(matrix.candidates_as_list_, matrix.as_array_off_diagonal_.min(axis=1).tolist()))
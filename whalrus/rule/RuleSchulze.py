@@ -18,9 +18,10 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
+import numpy as np
 from whalrus.rule.Rule import Rule
 from whalrus.converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
-from whalrus.utils.Utils import cached_property, NiceSet
+from whalrus.utils.Utils import cached_property, NiceSet, strongly_connected_components
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
 from whalrus.matrix.Matrix import Matrix
 from whalrus.matrix.MatrixSchulze import MatrixSchulze
@@ -44,6 +45,13 @@ class RuleSchulze(Rule):
            [Fraction(5, 9), Fraction(5, 9), 0]], dtype=object)
     >>> rule.winner_
     'a'
+
+    When the weighted majority matrix is constant-sum (i.e. `W(c, d) + W(d, c)` is the same for all pairs of distinct
+    candidates, which is the case by default when all the ballots are complete orders) and the Schulze matrix is a
+    :class:`MatrixSchulze`, the candidates are split into the components of the majority graph (cf.
+    :attr:`MatrixMajority.components_`). Each candidate of a component is then above all the candidates of the next
+    components, and the widest paths between two candidates of a component stay in this component. Hence, the order is
+    computed separately in each component, without computing the whole Schulze matrix.
     """
 
     def __init__(self, *args, converter: ConverterBallot = None, matrix_schulze: Matrix = None, **kwargs):
@@ -61,17 +69,38 @@ class RuleSchulze(Rule):
 
         :return: the Schulze matrix (once computed with the given profile).
         """
-        return self.matrix_schulze(self.profile_converted_)
+        return self.matrix_schulze.clone()(self.profile_converted_, follow=self.follows_profile)
+
+    @cached_property
+    def _widest_paths_by_component_(self) -> list:
+        """
+        The Schulze matrix of each component.
+
+        :return: a list of pairs: a list of candidates and their Schulze matrix (as an array). The components are
+            sorted so that each candidate is above the candidates of the next components.
+        """
+        m = self.matrix_schulze_
+        if isinstance(m, MatrixSchulze):
+            weighted = m.matrix_weighted_majority_.as_array_
+            n = weighted.shape[0]
+            sums = (weighted + weighted.T)[~np.eye(n, dtype=bool)]
+            if n > 1 and (sums == sums[0]).all():
+                return [([m.candidates_as_list_[i] for i in component],
+                         MatrixSchulze._widest_paths(weighted[np.ix_(component, component)]))
+                        for component in strongly_connected_components((weighted >= weighted.T).astype(bool))]
+        return [(m.candidates_as_list_, m.as_array_)]
 
     @cached_property
     def order_(self) -> list:
         m = self.matrix_schulze_
-        victories = {(c, d) for (c, d) in m.as_dict_.keys() if m.as_dict_[(c, d)] > m.as_dict_[(d, c)]}
-        to_sort = self.candidates_.copy()
-        result = []
-        while to_sort:
-            losers = {d for (c, d) in victories}
-            result.append(to_sort - losers)
-            to_sort = losers
-            victories = {(c, d) for (c, d) in victories if c in to_sort and d in to_sort}
-        return result
+        # Candidates that are not in the matrix have no defeat.
+        result = [NiceSet(self.candidates_ - set(m.candidates_as_list_))]
+        for candidates, widest_paths in self._widest_paths_by_component_:
+            victories = widest_paths > widest_paths.T
+            to_sort = np.ones(len(candidates), dtype=bool)
+            while to_sort.any():
+                losers = (victories & to_sort[:, np.newaxis] & to_sort[np.newaxis, :]).any(axis=0)
+                result[-1] |= {c for c, winner in zip(candidates, (to_sort & ~losers).tolist()) if winner}
+                result.append(NiceSet())
+                to_sort = losers
+        return [tie_class for tie_class in result if tie_class]
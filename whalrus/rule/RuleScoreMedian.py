@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from whalrus.rule.RuleScore import RuleScore
+from whalrus.scorer.Scorer import Scorer
+from whalrus.utils.Utils import cached_property, NiceDict, weighted_quantile_index
+
+
+class RuleScoreMedian(RuleScore):
+    """
+    A voting rule where each candidate's score is based on its median level.
+
+    :param `*args`: cf. parent class.
+    :param scorer: the :class:`Scorer`. For each ballot, it gives a level to each candidate (these levels are compared
+        with the scale of the scorer).
+    :param default_median: the median level of a candidate when it receives no level whatsoever.
+    :param `**kwargs`: cf. parent class.
+
+    The levels given to each candidate are counted in a histogram (cf. :attr:`histograms_`), then its median is found
+    by a scan of the histogram (cf. :func:`weighted_quantile_index`). On a bounded scale, only the distinct levels are
+    sorted (with the scale of the scorer), not the ballots. When a candidate has two medians, the lower one is
+    considered.
+
+    The scores are tuples, whose first element is the median (compared with the scale of the scorer) and whose other
+    elements are numbers (compared lexicographically). Cf. :class:`RuleMajorityJudgment` and
+    :class:`RuleBucklinInstant` for some examples.
+
+    >>> from whalrus.rule.RuleMajorityJudgment import RuleMajorityJudgment
+    >>> rule = RuleMajorityJudgment([{'a': 1, 'b': 1}, {'a': .5, 'b': .6}, {'a': .5, 'b': .4}, {'a': .3, 'b': .2}])
+    >>> rule.histograms_['a']
+    {Fraction(3, 10): 1, Fraction(1, 2): 2, 1: 1}
+    >>> rule.medians_
+    {'a': Fraction(1, 2), 'b': Fraction(2, 5)}
+    """
+
+    def __init__(self, *args, scorer: Scorer = None, default_median: object = None, **kwargs):
+        self.scorer = scorer
+        self.default_median = default_median
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def _levels_and_weights_(self) -> NiceDict:
+        # For each candidate: its distinct levels, in the order of the scale, and the corresponding total weights.
+        # On a bounded scale, the levels are counted in a histogram, so that only the distinct levels are sorted. On
+        # an unbounded scale (e.g. real numbers), the levels are generally all distinct and they are sorted directly.
+        bounded = self.scorer.scale.is_bounded
+        histograms = {c: dict() for c in self.candidates_}
+        levels_ = {c: [] for c in self.candidates_}
+        weights_ = {c: [] for c in self.candidates_}
+        for ballot, weight, voter in self.profile_converted_.items():
+            for c, level in self.scorer.scores(ballot, voter=voter, candidates=self.candidates_).items():
+                if bounded:
+                    histogram = histograms[c]
+                    histogram[level] = histogram.get(level, 0) + weight
+                else:
+                    levels_[c].append(level)
+                    weights_[c].append(weight)
+        results = NiceDict()
+        for c in self.candidates_:
+            if bounded:
+                levels, weights = list(histograms[c].keys()), list(histograms[c].values())
+                indexes = self.scorer.scale.argsort(levels)
+                results[c] = ([levels[i] for i in indexes], [weights[i] for i in indexes])
+                continue
+            # Merge the equal levels, which are now adjacent.
+            sorted_levels, sorted_weights = [], []
+            for i in self.scorer.scale.argsort(levels_[c]):
+                if sorted_levels and self.scorer.scale.eq(sorted_levels[-1], levels_[c][i]):
+                    sorted_weights[-1] += weights_[c][i]
+                else:
+                    sorted_levels.append(levels_[c][i])
+                    sorted_weights.append(weights_[c][i])
+            results[c] = (sorted_levels, sorted_weights)
+        return results
+
+    @cached_property
+    def histograms_(self) -> NiceDict:
+        """
+        The histograms of the levels.
+
+        :return: a :class:`NiceDict`. To each candidate, it associates a dictionary that, to each level given to the
+            candidate, associates the total weight of the ballots that give this level. The levels are in the order
+            of the scale, from the lowest to the highest.
+        """
+        return NiceDict({c: dict(zip(levels, weights)) for c, (levels, weights) in self._levels_and_weights_.items()})
+
+    @cached_property
+    def _medians_and_weights_(self) -> NiceDict:
+        # For each candidate that receives at least one level: its median, the total weight of the levels below it,
+        # the total weight of the levels above it, and the total weight.
+        results = NiceDict()
+        for c, (levels, weights) in self._levels_and_weights_.items():
+            if not levels:
+                continue
+            i = weighted_quantile_index(weights)
+            results[c] = (levels[i], sum(weights[:i]), sum(weights[i + 1:]), sum(weights))
+        return results
+
+    @cached_property
+    def medians_(self) -> NiceDict:
+        """
+        The medians.
+
+        :return: a :class:`NiceDict`. To each candidate, it associates its median level (or ``default_median`` if it
+            receives no level).
+        """
+        return NiceDict({c: self._medians_and_weights_[c][0] if c in self._medians_and_weights_
+                         else self.default_median for c in self.candidates_})
+
+    def compare_scores(self, one: tuple, another: tuple) -> int:
+        if one == another:
+            return 0
+        if self.scorer.scale.lt(one[0], another[0]):
+            return -1
+        if self.scorer.scale.gt(one[0], another[0]):
+            return 1
+        return -1 if one[1:] < another[1:] else 1
+
+    @cached_property
+    def scores_as_floats_(self) -> NiceDict:
+        """
+        The scores, as floats.
+
+        :return: :attr:`scores_`, converted to floats (except the medians that are not numbers).
+        """
+        def my_float(x):
+            try:
+                return float(x)
+            except ValueError:
+                return x
+        return NiceDict({c: tuple(my_float(x) for x in score) for c, score in self.scores_.items()})
@@ -20,8 +20,15 @@ along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
 from whalrus.rule.RuleScoreNum import RuleScoreNum
 from whalrus.scorer.Scorer import Scorer
-from whalrus.utils.Utils import cached_property, NiceDict, my_division
+from whalrus.ballot.Ballot import Ballot
+from whalrus.ballot.BallotOrder import BallotOrder
+from whalrus.utils.Utils import cached_property, NiceDict, my_division, set_to_list
 from numbers import Number
+from typing import TYPE_CHECKING
+import math
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class RuleScoreNumAverage(RuleScoreNum):
@@ -37,6 +44,13 @@ class RuleScoreNumAverage(RuleScoreNum):
     :param `**kwargs`: cf. parent class.
 
     Cf. :class:`RuleRangeVoting` for some examples.
+
+    The margin of victory is the minimal number of voters who must change their ballots so that the winner changes:
+
+    >>> from whalrus.rule.RulePlurality import RulePlurality
+    >>> from whalrus.priority.Priority import Priority
+    >>> RulePlurality(['a', 'a', 'a', 'a', 'b', 'b', 'c'], tie_break=Priority.ASCENDING).margin_of_victory_
+    2
     """
 
     def __init__(self, *args, scorer: Scorer = None, default_average: Number = 0, **kwargs):
@@ -49,11 +63,21 @@ class RuleScoreNumAverage(RuleScoreNum):
         gross_scores = NiceDict({c: 0 for c in self.candidates_})
         weights = NiceDict({c: 0 for c in self.candidates_})
         for ballot, weight, voter in self.profile_converted_.items():
-            for c, value in self.scorer(ballot=ballot, voter=voter, candidates=self.candidates_).scores_.items():
+            for c, value in self.scorer.scores(ballot, voter=voter, candidates=self.candidates_).items():
                 gross_scores[c] += weight * value
                 weights[c] += weight
         return {'gross_scores': gross_scores, 'weights': weights}
 
+    def _patch_cache(self, ballot: Ballot, weight: Number, voter: object) -> list:
+        if '_gross_scores_and_weights_' not in self._cached_properties:
+            return []
+        gross_scores = self._gross_scores_and_weights_['gross_scores']
+        weights = self._gross_scores_and_weights_['weights']
+        for c, value in self.scorer.scores(ballot, voter=voter, candidates=self.candidates_).items():
+            gross_scores[c] += weight * value
+            weights[c] += weight
+        return ['_gross_scores_and_weights_']
+
     @cached_property
     def gross_scores_(self) -> NiceDict:
         """
@@ -80,6 +104,148 @@ class RuleScoreNumAverage(RuleScoreNum):
         return NiceDict({c: my_division(score, self.weights_[c], divide_by_zero=self.default_average)
                          for c, score in self.gross_scores_.items()})
 
+    # Distinct ballots
+    # ----------------
+
+    @cached_property
+    def _ballot_scores_(self) -> list:
+        # For each ballot of ``profile_converted_.distinct_ballots``, the scores that it gives.
+        return [self.scorer.scores(ballot, candidates=self.candidates_)
+                for ballot in self.profile_converted_.distinct_ballots]
+
+    @cached_property
+    def _ballot_scores_as_floats_(self) -> 'np.ndarray':
+        # An array of shape (number of distinct ballots, 2 * number of candidates). For each distinct ballot, the
+        # scores that it gives, then 1 for each candidate that it scores and 0 for the others.
+        import numpy as np
+        candidates = set_to_list(self.candidates_)
+        return np.array([[float(ballot_scores.get(c, 0)) for c in candidates]
+                         + [float(c in ballot_scores) for c in candidates]
+                         for ballot_scores in self._ballot_scores_]).reshape(-1, 2 * len(candidates))
+
+    def scores_batch(self, weights: 'np.ndarray') -> 'np.ndarray':
+        """
+        The scores for several weight vectors.
+
+        :param weights: an array of shape (k, number of distinct ballots). Each row gives a weight to each ballot of
+            ``profile_converted_.distinct_ballots`` (cf. :attr:`Profile.distinct_ballots`).
+        :return: an array of floats, of shape (k, number of candidates). Each row gives the scores of the candidates
+            (in the order of :func:`set_to_list`), like :attr:`scores_` would with the corresponding weights.
+
+        The contribution of each distinct ballot is computed only once, so that the `k` evaluations cost one matrix
+        product:
+
+        >>> from whalrus.rule.RuleBorda import RuleBorda
+        >>> rule = RuleBorda(['a > b > c', 'b > c > a', 'a > b > c'])
+        >>> for ballot in rule.profile_converted_.distinct_ballots:
+        ...     print(ballot)
+        a > b > c
+        b > c > a
+        >>> rule.scores_batch([[1, 1], [1, 3]])
+        array([[1.  , 1.5 , 0.5 ],
+               [0.5 , 1.75, 0.75]])
+        """
+        import numpy as np
+        n_candidates = len(self.candidates_)
+        totals = np.asarray(weights, dtype=float) @ self._ballot_scores_as_floats_
+        gross_scores, weights = totals[:, :n_candidates], totals[:, n_candidates:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(weights == 0, float(self.default_average), gross_scores / weights)
+
+    # Margin of victory
+    # -----------------
+
+    @cached_property
+    def _scores_by_ballot_(self) -> tuple:
+        """
+        The scores given by the distinct ballots.
+
+        :return: a pair of arrays. The first one is of shape (number of distinct ballots, number of candidates) and
+            gives the scores (the candidates being in the order of :func:`set_to_list`). The second one gives the total
+            weight of each distinct ballot.
+        """
+        import numpy as np
+        candidates = set_to_list(self.candidates_)
+        if any(len(ballot_scores) != len(candidates) for ballot_scores in self._ballot_scores_):
+            raise NotImplementedError('The margin of victory is only implemented when each ballot gives a score to '
+                                      'each candidate.')
+        scores = [[ballot_scores[c] for c in candidates] for ballot_scores in self._ballot_scores_]
+        return (np.array(scores).reshape(len(scores), len(candidates)),
+                np.array(self.profile_converted_.distinct_weights))
+
+    def _max_swing(self, c: object, d: object) -> Number:
+        """
+        The maximal difference of score between two candidates in a ballot.
+
+        :param c: a candidate.
+        :param d: another candidate.
+        :return: the score of `c` minus the score of `d`, in a ballot that prefers `c` to all the other candidates and
+            all of them to `d`.
+        """
+        others = [x for x in set_to_list(self.candidates_) if x not in {c, d}]
+        ballot = self.converter(BallotOrder([c] + others + [d], candidates=self.candidates_), self.candidates_)
+        scores = self.scorer.scores(ballot, candidates=self.candidates_)
+        return scores[c] - scores[d]
+
+    @cached_property
+    def margin_of_victory_(self) -> Number:
+        """
+        The margin of victory.
+
+        :return: the minimal number of voters who must change their ballots so that :attr:`winner_` is not the winner
+            anymore (or None if it is impossible, e.g. with only one candidate). If some weights are not integers, it
+            is the infimum of the total weight of the ballots to change, when a part of the weight of a ballot can be
+            changed.
+
+        It is computed from the scores given by each distinct ballot, without evaluating the rule again. For each
+        challenger `d` of the winner `w`, changing a ballot reduces the difference between the gross scores of `w`
+        and `d` by the difference given by this ballot, plus the maximal difference that a ballot can give to `d` over
+        `w`. So the voters are taken greedily, by decreasing reduction, until `d` beats `w` (taking the
+        tie-breaking rule into account). Like :attr:`scores_`, this assumes that all the ballots give a score to all
+        the candidates.
+        """
+        import numpy as np
+        candidates = set_to_list(self.candidates_)
+        scores, weights = self._scores_by_ballot_
+        integers = all(weight == int(weight) for weight in weights.tolist())
+        w = self.winner_
+        i_w = candidates.index(w)
+        margins = []
+        for i_d, d in enumerate(candidates):
+            if d == w:
+                continue
+            try:
+                tie_is_enough = self.tie_break.sort([w, d])[0] == d
+            except ValueError:
+                # With an unambiguous priority, a tie is enough to make `w` lose.
+                tie_is_enough = True
+            gap = self.gross_scores_[w] - self.gross_scores_[d]
+            reductions = scores[:, i_w] - scores[:, i_d] + self._max_swing(d, w)
+            order = np.argsort(-reductions, kind='stable')
+            reductions = reductions[order].tolist()
+            group_weights = weights[order].tolist()
+            changed = 0
+            for reduction, weight in zip(reductions, group_weights):
+                if gap < 0 or (gap == 0 and tie_is_enough):
+                    break
+                if reduction <= 0:
+                    break
+                if integers:
+                    # Number of voters of this group needed to reach (or pass) the gap.
+                    n_voters = math.floor(gap / reduction) + 1 if not tie_is_enough else math.ceil(gap / reduction)
+                    n_voters = max(n_voters, 1)
+                else:
+                    n_voters = my_division(gap, reduction)
+                if n_voters <= weight:
+                    changed += n_voters
+                    gap = -1
+                    break
+                changed += weight
+                gap -= weight * reduction
+            if gap < 0 or (gap == 0 and tie_is_enough):
+                margins.append(changed)
+        return min(margins) if margins else None
+
     # Conversion to floats
     # --------------------
 
@@ -47,10 +47,9 @@ class RuleScoreNumRowSum(RuleScoreNum):
 
         :return: the matrix (once computed with the given profile).
         """
-        return self.matrix(self.profile_converted_)
+        return self.matrix.clone()(self.profile_converted_, follow=self.follows_profile)
 
     @cached_property
     def scores_(self) -> NiceDict:
         m = self.matrix_
-        return NiceDict({c: sum([v for (i, j), v in m.as_dict_.items() if i == c and j != c])
-                         for c in m.candidates_})
+        return NiceDict(zip(m.candidates_as_list_, m.as_array_off_diagonal_.sum(axis=1).tolist()))
@@ -26,7 +26,6 @@ from whalrus.elimination.Elimination import Elimination
 from whalrus.elimination.EliminationLast import EliminationLast
 from whalrus.elimination.EliminationBelowAverage import EliminationBelowAverage
 from typing import Union
-from copy import deepcopy
 from itertools import chain
 
 
@@ -93,11 +92,9 @@ class RuleSequentialElimination(Rule):
         else:
             n_rounds = 1
         if isinstance(rules, Rule):
-            rules.delete_cache()
-            rules = [deepcopy(rules) for _ in range(n_rounds)]
+            rules = [rules.clone() for _ in range(n_rounds)]
         if isinstance(eliminations, Elimination):
-            eliminations.delete_cache()
-            eliminations = [deepcopy(eliminations) for _ in range(n_rounds - 1)]
+            eliminations = [eliminations.clone() for _ in range(n_rounds - 1)]
         # Record variables and initialize
         self.rules = rules
         self.eliminations = eliminations
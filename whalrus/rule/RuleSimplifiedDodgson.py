@@ -18,6 +18,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
+import numpy as np
 from whalrus.rule.RuleScoreNum import RuleScoreNum
 from whalrus.converter_ballot.ConverterBallotToOrder import ConverterBallotToOrder
 from whalrus.utils.Utils import cached_property, NiceDict, convert_number
@@ -66,11 +67,11 @@ class RuleSimplifiedDodgson(RuleScoreNum):
 
         :return: the weighted majority matrix (once computed with the given profile).
         """
-        return self.matrix_weighted_majority(self.profile_converted_)
+        return self.matrix_weighted_majority.clone()(self.profile_converted_, follow=self.follows_profile)
 
     @cached_property
     def scores_(self) -> NiceDict:
         matrix = self.matrix_weighted_majority_
-        return NiceDict({
-            c: convert_number(sum([v for (i, j), v in matrix.as_dict_.items() if i == c and j != c and v < 0]))
-            for c in matrix.candidates_})
+        off_diagonal = matrix.as_array_off_diagonal_
+        negative_sums = np.where(off_diagonal < 0, off_diagonal, 0).sum(axis=1).tolist()
+        return NiceDict({c: convert_number(v) for c, v in zip(matrix.candidates_as_list_, negative_sums)})
@@ -21,10 +21,12 @@ along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 import logging
 from whalrus.rule.RuleScoreNumAverage import RuleScoreNumAverage
 from whalrus.scorer.Scorer import Scorer
+from whalrus.ballot.Ballot import Ballot
 from whalrus.scorer.ScorerVeto import ScorerVeto
 from whalrus.converter_ballot.ConverterBallotToVeto import ConverterBallotToVeto
 from whalrus.utils.Utils import cached_property, NiceDict
 from whalrus.converter_ballot.ConverterBallot import ConverterBallot
+from numbers import Number
 
 
 class RuleVeto(RuleScoreNumAverage):
@@ -68,6 +70,20 @@ class RuleVeto(RuleScoreNumAverage):
         weights = NiceDict({c: total_weight for c in self.candidates_})
         return {'gross_scores': gross_scores, 'weights': weights}
 
+    def _patch_cache(self, ballot: Ballot, weight: Number, voter: object) -> list:
+        patched = super()._patch_cache(ballot, weight, voter)
+        if (not isinstance(self.scorer, ScorerVeto)
+                or '_gross_scores_and_weights_quicker_' not in self._cached_properties):
+            return patched
+        if ballot.candidate is None and not self.scorer.count_abstention:
+            return patched + ['_gross_scores_and_weights_quicker_']
+        if ballot.candidate is not None:
+            self._gross_scores_and_weights_quicker_['gross_scores'][ballot.candidate] -= weight
+        weights = self._gross_scores_and_weights_quicker_['weights']
+        for c in weights.keys():
+            weights[c] += weight
+        return patched + ['_gross_scores_and_weights_quicker_']
+
     @cached_property
     def gross_scores_(self) -> NiceDict:
         return self._gross_scores_and_weights_quicker_['gross_scores']
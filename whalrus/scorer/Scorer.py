@@ -20,10 +20,10 @@ along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
 from whalrus.ballot.Ballot import Ballot
 from whalrus.scale.Scale import Scale
-from whalrus.utils.Utils import DeleteCacheMixin, cached_property, NiceDict
+from whalrus.utils.Utils import DeleteCacheMixin, CloneMixin, cached_property, NiceDict
 
 
-class Scorer(DeleteCacheMixin):
+class Scorer(DeleteCacheMixin, CloneMixin):
     """
     A "scorer".
 
@@ -74,6 +74,34 @@ class Scorer(DeleteCacheMixin):
         self.delete_cache()
         return self
 
+    def scores(self, ballot: Ballot, voter: object = None, candidates: set = None, **kwargs) -> NiceDict:
+        """
+        The scores of a ballot, computed without modifying the scorer.
+
+        :param ballot: cf. ``__call__``.
+        :param voter: cf. ``__call__``.
+        :param candidates: cf. ``__call__``.
+        :param kwargs: some parameters of the scorer, to be used instead of its own ones (e.g. ``k`` for
+            :class:`ScorerBucklin`).
+        :return: the :attr:`scores_` that the scorer would give with these arguments (and these parameters).
+
+        The arguments are loaded in a shallow copy of the scorer. Hence the same scorer can be used by several rules,
+        or by several threads, at the same time. This is how the rules use their scorer:
+
+        >>> from whalrus.ballot.BallotOrder import BallotOrder
+        >>> from whalrus.scorer.ScorerBucklin import ScorerBucklin
+        >>> scorer = ScorerBucklin(k=1)
+        >>> scorer.scores(BallotOrder('a > b > c'), candidates={'a', 'b', 'c'}, k=2)
+        {'a': 1, 'b': 1, 'c': 0}
+        >>> scorer.k, scorer.ballot_
+        (1, None)
+        """
+        scorer = self.__class__.__new__(self.__class__)
+        scorer.__dict__.update(self.__dict__)
+        for key, value in kwargs.items():
+            setattr(scorer, key, value)
+        return scorer(ballot, voter=voter, candidates=candidates).scores_
+
     @cached_property
     def scores_(self) -> NiceDict:
         """
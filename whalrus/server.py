@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+
+A small HTTP server that tallies ballots as they arrive (e.g. on an election night).
+
+The server only uses the standard library (:mod:`asyncio`). It answers the following requests, in JSON:
+
+* ``POST /ballots``: add ballots. The body is either a JSON list of ballots, or one ballot per line. The ballots are
+  any input that can be interpreted by :class:`ConverterBallotGeneral`, e.g. ``a > b ~ c`` or ``{"a": 10, "b": 7}``.
+* ``GET /results``: the current results of the rules.
+* ``GET /metrics``: the throughput of the ingestion and the latencies of the requests.
+
+The ballots are added to the profile by batches, and the identical ballots share a single entry of the profile (with
+their total weight), so that the memory depends on the number of distinct ballots. The rules follow the profile
+(cf. :class:`ProfileSubscriberMixin`): when it is possible, their tallies are patched with the new ballots instead of
+being computed again. Cf. :class:`TallyServer`.
+"""
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from http import HTTPStatus
+from numbers import Number
+from urllib.parse import urlsplit
+import click
+from whalrus.cli import RULES, TIE_BREAKS, _rule_result
+from whalrus.converter_ballot.ConverterBallotGeneral import ConverterBallotGeneral
+from whalrus.profile.Profile import Profile
+
+
+def _summary(values: list) -> dict:
+    """
+    Summary of some durations.
+
+    :param values: a list of durations, in seconds.
+    :return: a dictionary with the number of values, their mean, median, 95th percentile and maximum.
+
+    >>> _summary([.1, .3, .2])
+    {'count': 3, 'mean': 0.2, 'p50': 0.2, 'p95': 0.3, 'max': 0.3}
+    """
+    if not values:
+        return {'count': 0}
+    values = sorted(values)
+    n = len(values)
+    return {'count': n, 'mean': round(sum(values) / n, 6), 'p50': values[(n - 1) // 2],
+            'p95': values[min(n - 1, int(.95 * n))], 'max': values[-1]}
+
+
+class TallyServer:
+    """
+    An HTTP server that tallies ballots as they arrive.
+
+    :param rules: a dictionary whose keys are names and whose values are :class:`Rule` objects. Their tie-breaking
+        rules must be able to deal with all ties (otherwise, the results show an error for the rule).
+    :param candidates: the candidates of the election. Default: the candidates that appear in the ballots.
+    :param batch_size: the maximal number of ballots that are added to the profile at once (except if one request
+        has more ballots).
+    :param batch_delay: the time (in seconds) to wait for more ballots before adding an incomplete batch.
+    :param max_pending: the maximal number of requests whose ballots are waiting to be added. When it is reached, the
+        next requests wait for some room (back-pressure on the clients).
+    :param pending_timeout: the maximal time (in seconds) that a request waits for some room. After this delay, it is
+        rejected with the status 503 and the header ``Retry-After``.
+    :param max_body: the maximal size of a request body, in bytes.
+    :param window: the number of recent requests and batches used to compute the latencies.
+    :param max_parsed: the maximal number of ballot strings whose parsing is remembered (the strings of the ballots
+        are often repeated).
+
+    The server can also be used without HTTP: :meth:`add_ballots`, :meth:`results` and :meth:`metrics` give the same
+    information as the requests.
+
+    >>> from whalrus.rule.RuleBorda import RuleBorda
+    >>> from whalrus.rule.RulePlurality import RulePlurality
+    >>> from whalrus.priority.Priority import Priority
+    >>> server = TallyServer({'Borda': RuleBorda(tie_break=Priority.ASCENDING),
+    ...                       'Plurality': RulePlurality(tie_break=Priority.ASCENDING)})
+    >>> server.add_ballots(['a > b > c', 'b > a > c', 'a > b > c'])
+    >>> server.results()['rules']['Borda']['order']
+    [['a'], ['b'], ['c']]
+    >>> server.add_ballots(['c > b > a'] * 3)
+    >>> server.results()['rules']['Plurality']['winner']
+    'c'
+    >>> len(server.profile_)
+    3
+
+    To run the server on the port 8000, use ``asyncio.run(server.serve('127.0.0.1', 8000))``, or the command
+    ``whalrus-server`` (cf. :func:`main`).
+
+    :ivar profile\\_: the profile of the election. Each distinct ballot appears once, with its total weight.
+    :ivar port\\_: the port of the server, once it is started.
+    """
+
+    def __init__(self, rules: dict, candidates: set = None, batch_size: int = 1000, batch_delay: float = .05,
+                 max_pending: int = 100, pending_timeout: float = 5., max_body: int = 2 ** 24, window: int = 1000,
+                 max_parsed: int = 100000):
+        self.rules = rules
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self.pending_timeout = pending_timeout
+        self.max_body = max_body
+        self.window = window
+        self.max_parsed = max_parsed
+        # Computed variables
+        self.profile_ = Profile([])
+        self.port_ = None
+        for rule in rules.values():
+            rule(self.profile_, candidates=candidates, follow=True)
+        self._weights = dict()
+        self._results = None
+        self._converter = ConverterBallotGeneral()
+        self._parsed = dict()
+        self._queue = None
+        self._ingestion = None
+        self._server = None
+        self._start_time = time.monotonic()
+        self._counts = Counter()
+        self._tallied = deque(maxlen=window)
+        self._latencies = dict()
+
+    # Tally
+    # =====
+
+    def add_ballots(self, ballots: list, weights: list = None) -> None:
+        """
+        Add ballots to the profile, immediately.
+
+        :param ballots: a list of ballots (or, more generally, of inputs that can be interpreted by
+            :class:`ConverterBallotGeneral`).
+        :param weights: their weights. Default: 1 for each ballot.
+        """
+        if weights is None:
+            weights = [1] * len(ballots)
+        self._add_batch([(time.monotonic(), self._convert(ballots), weights)])
+
+    def _convert(self, inputs: list) -> list:
+        """
+        Convert inputs to ballots.
+
+        :param inputs: a list of inputs that can be interpreted by :class:`ConverterBallotGeneral`.
+        :return: the list of ballots. The strings are parsed only once (the memory used is bounded by
+            :attr:`max_parsed`).
+        """
+        ballots = []
+        for x in inputs:
+            if not isinstance(x, str):
+                ballots.append(self._converter(x))
+                continue
+            ballot = self._parsed.get(x)
+            if ballot is None:
+                if len(self._parsed) >= self.max_parsed:
+                    self._parsed.clear()
+                ballot = self._parsed[x] = self._converter(x)
+            ballots.append(ballot)
+        return ballots
+
+    def _add_batch(self, items: list) -> None:
+        """
+        Add a batch of ballots to the profile.
+
+        :param items: a list of triples ``(reception_time, ballots, weights)``, where the ballots are already converted
+            by :class:`ConverterBallotGeneral`.
+        """
+        start = time.monotonic()
+        counts = Counter()
+        for _, ballots, weights in items:
+            for ballot, weight in zip(ballots, weights):
+                counts[ballot] += weight
+        for ballot, weight in counts.items():
+            # The ballot replaces its previous entry, with the total weight: the rules see a removal and an addition,
+            # which they can both patch.
+            if ballot in self._weights:
+                self.profile_.remove(ballot)
+                weight += self._weights[ballot]
+            self._weights[ballot] = weight
+            self.profile_.append(ballot, weight=weight)
+        self._results = None
+        end = time.monotonic()
+        n_ballots = sum(len(ballots) for _, ballots, _ in items)
+        self._counts['ballots_tallied'] += n_ballots
+        self._counts['batches'] += 1
+        self._tallied.append((end, n_ballots))
+        self._record('batch', end - start)
+        self._record('ingestion delay', end - min(reception for reception, _, _ in items))
+
+    def results(self) -> dict:
+        """
+        The current results.
+
+        :return: a dictionary with the total weight of the ballots (``'ballots'``) and, for each rule, its results
+            (cf. :func:`whalrus.cli.evaluate`). They are computed again only when new ballots have been added.
+        """
+        if self._results is None:
+            results = {}
+            for name, rule in self.rules.items():
+                try:
+                    results[name] = _rule_result(rule)
+                except Exception as e:
+                    results[name] = {'error': '%s: %s' % (type(e).__name__, e)}
+            self._results = {'ballots': sum(self._weights.values()), 'rules': results}
+        return self._results
+
+    # Metrics
+    # =======
+
+    def _record(self, name: str, duration: float) -> None:
+        self._latencies.setdefault(name, deque(maxlen=self.window)).append(round(duration, 6))
+
+    def metrics(self) -> dict:
+        """
+        Metrics of the server.
+
+        :return: a dictionary with the uptime, the counters (ballots received and tallied, batches, rejected requests),
+            the number of distinct ballots, the number of pending requests, the throughput of the ingestion (in
+            ballots per second, since the start and over the recent batches) and, for each kind of request, for the
+            batches and for the delay between the reception of a ballot and its tally, a summary of the recent
+            latencies in seconds (cf. :attr:`window`).
+        """
+        now = time.monotonic()
+        uptime = now - self._start_time
+        recent = [n for t, n in self._tallied]
+        recent_duration = now - self._tallied[0][0] if self._tallied else 0
+        return {
+            'uptime': round(uptime, 6),
+            'ballots_received': self._counts['ballots_received'],
+            'ballots_tallied': self._counts['ballots_tallied'],
+            'batches': self._counts['batches'],
+            'requests_rejected': self._counts['requests_rejected'],
+            'distinct_ballots': len(self.profile_),
+            'pending_requests': self._queue.qsize() if self._queue is not None else 0,
+            'throughput': round(self._counts['ballots_tallied'] / uptime, 3) if uptime else None,
+            'recent_throughput': round(sum(recent) / recent_duration, 3) if recent_duration else None,
+            'latency': {name: _summary(list(values)) for name, values in self._latencies.items()},
+        }
+
+    # Ingestion
+    # =========
+
+    async def _ingest(self) -> None:
+        """
+        Add the pending ballots to the profile, by batches.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            items = [await self._queue.get()]
+            n_ballots = len(items[0][1])
+            deadline = loop.time() + self.batch_delay
+            while n_ballots < self.batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    items.append(self._queue.get_nowait())
+                n_ballots += len(items[-1][1])
+            self._add_batch(items)
+
+    def _flush(self) -> None:
+        """
+        Add all the pending ballots to the profile.
+        """
+        items = []
+        while self._queue is not None and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        if items:
+            self._add_batch(items)
+
+    # HTTP
+    # ====
+
+    async def _post_ballots(self, headers: dict, body: bytes) -> tuple:
+        text = body.decode('utf-8')
+        if 'json' in headers.get('content-type', '') or text.lstrip().startswith('['):
+            inputs = json.loads(text)
+            if not isinstance(inputs, list):
+                raise ValueError('The body must be a JSON list of ballots.')
+        else:
+            inputs = [line.strip() for line in text.splitlines() if line.strip()]
+        ballots = self._convert(inputs)
+        try:
+            await asyncio.wait_for(self._queue.put((time.monotonic(), ballots, [1] * len(ballots))),
+                                   self.pending_timeout)
+        except asyncio.TimeoutError:
+            self._counts['requests_rejected'] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'Too many pending ballots.'}, {'Retry-After': '1'}
+        self._counts['ballots_received'] += len(ballots)
+        return HTTPStatus.ACCEPTED, {'accepted': len(ballots)}, {}
+
+    async def _route(self, method: str, path: str, headers: dict, body: bytes) -> tuple:
+        """
+        Answer a request.
+
+        :return: a triple ``(status, content, headers)``.
+        """
+        routes = {'/ballots': 'POST', '/results': 'GET', '/metrics': 'GET'}
+        if path not in routes:
+            return HTTPStatus.NOT_FOUND, {'error': 'Unknown path.'}, {}
+        if method != routes[path]:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use %s.' % routes[path]}, {'Allow': routes[path]}
+        if path == '/ballots':
+            try:
+                return await self._post_ballots(headers, body)
+            except (ValueError, TypeError) as e:
+                return HTTPStatus.BAD_REQUEST, {'error': '%s: %s' % (type(e).__name__, e)}, {}
+        if path == '/results':
+            return HTTPStatus.OK, self.results(), {}
+        return HTTPStatus.OK, self.metrics(), {}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answer the requests of a connection (which is kept alive unless the client closes it).
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                start = time.monotonic()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    self._write(writer, HTTPStatus.BAD_REQUEST, {'error': 'Malformed request.'}, {}, close=True)
+                    break
+                if length > self.max_body:
+                    self._write(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'Body too large.'}, {},
+                                close=True)
+                    break
+                body = await reader.readexactly(length)
+                path = urlsplit(target).path
+                status, content, extra_headers = await self._route(method, path, headers, body)
+                close = headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0'
+                self._write(writer, status, content, extra_headers, close)
+                await writer.drain()
+                self._record('%s %s' % (method, path), time.monotonic() - start)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: HTTPStatus, content: dict, headers: dict, close: bool) -> None:
+        data = json.dumps(content, default=lambda x: float(x) if isinstance(x, Number) else str(x)).encode()
+        lines = ['HTTP/1.1 %s %s' % (status.value, status.phrase), 'Content-Type: application/json',
+                 'Content-Length: %s' % len(data), 'Connection: %s' % ('close' if close else 'keep-alive')]
+        lines += ['%s: %s' % item for item in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data)
+
+    # Life cycle
+    # ==========
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8000) -> None:
+        """
+        Start the server.
+
+        :param host: the host.
+        :param port: the port (0 to choose a free port, cf. :attr:`port_`).
+        """
+        self._queue = asyncio.Queue(self.max_pending)
+        self._ingestion = asyncio.ensure_future(self._ingest())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self.port_ = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """
+        Stop the server. The pending ballots are added to the profile.
+        """
+        self._server.close()
+        await self._server.wait_closed()
+        self._ingestion.cancel()
+        try:
+            await self._ingestion
+        except asyncio.CancelledError:
+            pass
+        self._flush()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8000) -> None:
+        """
+        Start the server and run it until it is cancelled.
+
+        :param host: the host.
+        :param port: the port.
+        """
+        await self.start(host, port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+
+@click.command()
+@click.option('--rule', '-r', 'rules', multiple=True, type=click.Choice(RULES, case_sensitive=False),
+              default=['Plurality'], show_default=True, help='A voting rule (repeat the option for several rules).')
+@click.option('--tie-break', '-t', type=click.Choice(TIE_BREAKS), default='ascending', show_default=True,
+              help='The tie-breaking rule.')
+@click.option('--host', default='127.0.0.1', show_default=True, help='The host.')
+@click.option('--port', '-p', type=int, default=8000, show_default=True, help='The port.')
+@click.option('--batch-size', type=click.IntRange(min=1), default=1000, show_default=True,
+              help='The maximal number of ballots added to the profile at once.')
+@click.option('--batch-delay', type=float, default=.05, show_default=True,
+              help='The time (in seconds) to wait for more ballots before adding an incomplete batch.')
+def main(rules, tie_break, host, port, batch_size, batch_delay):
+    """
+    Run a server that tallies ballots as they arrive (cf. whalrus.server).
+    """
+    import whalrus
+    server = TallyServer({name: getattr(whalrus, 'Rule' + name)(tie_break=getattr(whalrus.Priority, tie_break.upper()))
+                          for name in rules}, batch_size=batch_size, batch_delay=batch_delay)
+    click.echo('Serving on http://%s:%s' % (host, port))
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
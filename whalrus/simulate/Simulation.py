@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright Sylvain Bouveret, Yann Chevaleyre and François Durand
+sylvain.bouveret@imag.fr, yann.chevaleyre@dauphine.fr, fradurand@gmail.com
+
+This file is part of Whalrus.
+
+Whalrus is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Whalrus is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import copy
+import json
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from whalrus.generators.Generator import Generator
+from whalrus.matrix.Matrix import Matrix
+from whalrus.matrix.MatrixMajority import MatrixMajority
+from whalrus.profile.Profile import Profile
+from whalrus.utils.Utils import cached_property, DeleteCacheMixin, NiceDict, my_division, share_matrices, \
+    shared_matrix_key, wilson_interval
+
+
+class Simulation(DeleteCacheMixin):
+    """
+    A Monte Carlo simulation: Condorcet efficiency of some rules and agreement between them.
+
+    :param generator: a :class:`Generator` of profiles. Its own seed is not used (cf. :attr:`seed`).
+    :param rules: a dictionary whose keys are names and whose values are :class:`Rule` objects.
+    :param n_voters: the number of voters in each profile.
+    :param batch_size: the number of profiles in a batch. A batch is the unit of work of the process pool and of the
+        checkpoints.
+    :param seed: an int. Batch number `k` is generated with the seed ``[seed, k]``, so that the results do not depend
+        on :attr:`n_jobs`, nor on the interruptions of the simulation. Default: a fresh seed.
+    :param matrix_majority: the matrix used to decide whether a candidate is a Condorcet winner. Default:
+        :class:`MatrixMajority`.
+    :param n_jobs: the number of processes. If 1 (default), everything is done in the current process.
+    :param checkpoint: the path of a JSON file. If given, the statistics are saved there after each batch, and loaded
+        from there at the beginning of each call.
+    :param confidence: the confidence level of the confidence intervals.
+
+    A :class:`Simulation` object is a callable whose input is a number of profiles. When it is called, it runs the
+    batches that are not done yet (the number of profiles is rounded up to a multiple of :attr:`batch_size`), then it
+    returns itself. The profiles are not kept: only the counts are accumulated in :attr:`counts_`. After the call,
+    you can access to the statistics, such as :attr:`condorcet_efficiency_` or :attr:`agreement_`. The winner of a
+    rule is its attribute ``winner_``: the rules must have a tie-breaking rule that can deal with all ties.
+
+    >>> from whalrus.generators.GeneratorImpartialCulture import GeneratorImpartialCulture
+    >>> from whalrus.rule.RuleCopeland import RuleCopeland
+    >>> from whalrus.rule.RulePlurality import RulePlurality
+    >>> from whalrus.priority.Priority import Priority
+    >>> matrix = MatrixMajority()
+    >>> simulation = Simulation(
+    ...     GeneratorImpartialCulture(['a', 'b', 'c'], weighted=True),
+    ...     rules={'Copeland': RuleCopeland(matrix=matrix, tie_break=Priority.ASCENDING),
+    ...            'Plurality': RulePlurality(tie_break=Priority.ASCENDING)},
+    ...     n_voters=25, seed=42, matrix_majority=matrix)
+    >>> simulation(200).n_profiles_
+    200
+    >>> simulation.condorcet_efficiency_['Copeland']
+    1
+    >>> low, high = simulation.condorcet_efficiency_interval_['Plurality']
+    >>> low < simulation.condorcet_efficiency_['Plurality'] < high
+    True
+    >>> 0 < simulation.agreement_[('Copeland', 'Plurality')] < 1
+    True
+
+    Calling the simulation again only runs the new batches:
+
+    >>> simulation(300).n_profiles_
+    300
+
+    Intermediate results are shared between the rules of a given profile (cf. :func:`share_matrices`): the
+    :class:`Matrix` parameters of the rules that have the same parameters and the same converters (like ``matrix``
+    above, which is also used to detect the Condorcet winner) are computed only once per profile.
+
+    :ivar counts\\_: the raw counts: number of profiles, number of profiles with a Condorcet winner, number of times
+        each rule elects the Condorcet winner, number of profiles where each pair of rules have the same winner.
+    :ivar batches\\_: the set of the indexes of the batches that are done.
+    """
+
+    def __init__(self, generator: Generator, rules: dict, n_voters: int, batch_size: int = 100, seed: int = None,
+                 matrix_majority: Matrix = None, n_jobs: int = 1, checkpoint: str = None, confidence: float = .95):
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        if matrix_majority is None:
+            matrix_majority = MatrixMajority()
+        self.generator = generator
+        self.rules = rules
+        self.n_voters = n_voters
+        self.batch_size = batch_size
+        self.seed = seed
+        self.matrix_majority = matrix_majority
+        self.n_jobs = n_jobs
+        self.checkpoint = checkpoint
+        self.confidence = confidence
+        # Computed variables
+        self.counts_ = self._empty_counts()
+        self.batches_ = set()
+
+    def __call__(self, n_profiles: int):
+        if self.checkpoint is not None and os.path.exists(self.checkpoint):
+            self._load_checkpoint()
+        n_batches = -(-n_profiles // self.batch_size)
+        batches_to_do = [k for k in range(n_batches) if k not in self.batches_]
+        if self.n_jobs == 1:
+            for k in batches_to_do:
+                self._add_batch(k, self._batch_counts(k))
+        else:
+            with ProcessPoolExecutor(self.n_jobs) as executor:
+                futures = {executor.submit(_batch_counts, self, k): k for k in batches_to_do}
+                for future in as_completed(futures):
+                    self._add_batch(futures[future], future.result())
+        self.delete_cache()
+        return self
+
+    # Work on the batches
+    # ===================
+
+    def _empty_counts(self) -> dict:
+        """
+        Counts of an empty set of profiles.
+
+        :return: a dictionary (with string keys, so that it can be saved as JSON).
+        """
+        names = list(self.rules.keys())
+        return {
+            'profiles': 0,
+            'condorcet': 0,
+            'condorcet_elected': {name: 0 for name in names},
+            'agreement': {name: {other: 0 for other in names[i + 1:]} for i, name in enumerate(names)}
+        }
+
+    def _batch_counts(self, k: int) -> dict:
+        """
+        Counts of a batch.
+
+        :param k: the index of the batch.
+        :return: the counts of the profiles of this batch (in the same format as :attr:`counts_`).
+        """
+        generator = copy.copy(self.generator)
+        generator.rng = np.random.default_rng([self.seed, k])
+        counts = self._empty_counts()
+        for _ in range(self.batch_size):
+            self._count_profile(generator(self.n_voters), counts)
+        return counts
+
+    def _count_profile(self, profile: Profile, counts: dict) -> None:
+        """
+        Evaluate the rules on a profile and update the counts.
+
+        :param profile: a profile.
+        :param counts: the counts (in the same format as :attr:`counts_`), modified in place.
+        """
+        matrix = self.matrix_majority.clone()(profile)
+        # The matrix converts the ballots with its own converter: it is the same as a matrix computed for a rule
+        # that uses this converter.
+        shared = {shared_matrix_key(self.matrix_majority, self.matrix_majority.converter, matrix.candidates_): matrix}
+        winners = {}
+        for name, rule in self.rules.items():
+            rule(profile)
+            share_matrices(rule, shared)
+            winners[name] = rule.winner_
+        counts['profiles'] += 1
+        is_winner = (matrix.as_array_off_diagonal_ == matrix.greater).all(axis=1).tolist()
+        condorcet_winners = [c for c, winner in zip(matrix.candidates_as_list_, is_winner) if winner]
+        if len(condorcet_winners) == 1:
+            counts['condorcet'] += 1
+            for name, winner in winners.items():
+                counts['condorcet_elected'][name] += winner == condorcet_winners[0]
+        for name, other in combinations(winners.keys(), 2):
+            counts['agreement'][name][other] += winners[name] == winners[other]
+
+    def _add_batch(self, k: int, counts: dict) -> None:
+        """
+        Add the counts of a batch to :attr:`counts_`, and save the checkpoint.
+
+        :param k: the index of the batch.
+        :param counts: the counts of the batch.
+        """
+        self.counts_['profiles'] += counts['profiles']
+        self.counts_['condorcet'] += counts['condorcet']
+        for name, value in counts['condorcet_elected'].items():
+            self.counts_['condorcet_elected'][name] += value
+        for name, d in counts['agreement'].items():
+            for other, value in d.items():
+                self.counts_['agreement'][name][other] += value
+        self.batches_.add(k)
+        if self.checkpoint is not None:
+            self._save_checkpoint()
+
+    # Checkpoints
+    # ===========
+
+    def _configuration(self) -> dict:
+        """
+        The parameters that a checkpoint must match.
+
+        :return: a dictionary.
+        """
+        return {'seed': self.seed, 'batch_size': self.batch_size, 'n_voters': self.n_voters,
+                'rules': list(self.rules.keys())}
+
+    def _save_checkpoint(self) -> None:
+        """
+        Save the counts in the checkpoint file (atomically, so that an interruption cannot corrupt it).
+        """
+        state = {'configuration': self._configuration(), 'batches': sorted(self.batches_), 'counts': self.counts_}
+        temporary = self.checkpoint + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary, self.checkpoint)
+
+    def _load_checkpoint(self) -> None:
+        """
+        Load the counts from the checkpoint file.
+        """
+        with open(self.checkpoint) as f:
+            state = json.load(f)
+        if state['configuration'] != self._configuration():
+            raise ValueError('The checkpoint %s was made with another configuration: %r.'
+                             % (self.checkpoint, state['configuration']))
+        self.batches_ = set(state['batches'])
+        self.counts_ = state['counts']
+
+    # Statistics
+    # ==========
+
+    @cached_property
+    def n_profiles_(self) -> int:
+        """
+        The number of profiles.
+
+        :return: an int.
+        """
+        return self.counts_['profiles']
+
+    @cached_property
+    def condorcet_frequency_(self) -> object:
+        """
+        The frequency of profiles with a Condorcet winner.
+
+        :return: a number (or None if there is no profile).
+        """
+        trials = self.counts_['profiles']
+        return my_division(self.counts_['condorcet'], trials) if trials else None
+
+    @cached_property
+    def condorcet_efficiency_(self) -> NiceDict:
+        """
+        The Condorcet efficiency of the rules.
+
+        :return: a :class:`NiceDict`. For each rule name, the frequency at which the rule elects the Condorcet winner,
+            among the profiles that have one (or None if there is no such profile).
+        """
+        trials = self.counts_['condorcet']
+        return NiceDict({name: my_division(successes, trials) if trials else None
+                         for name, successes in self.counts_['condorcet_elected'].items()})
+
+    @cached_property
+    def condorcet_efficiency_interval_(self) -> NiceDict:
+        """
+        Confidence intervals of the Condorcet efficiency.
+
+        :return: a :class:`NiceDict`. For each rule name, a pair of floats (cf. :func:`wilson_interval`).
+        """
+        trials = self.counts_['condorcet']
+        return NiceDict({name: wilson_interval(successes, trials, self.confidence)
+                         for name, successes in self.counts_['condorcet_elected'].items()})
+
+    @cached_property
+    def agreement_(self) -> NiceDict:
+        """
+        The agreement between the rules.
+
+        :return: a :class:`NiceDict`. For each pair of rule names (in the order of :attr:`rules`), the frequency at
+            which they have the same winner (or None if there is no profile).
+        """
+        trials = self.counts_['profiles']
+        return NiceDict({(name, other): my_division(successes, trials) if trials else None
+                         for name, d in self.counts_['agreement'].items() for other, successes in d.items()})
+
+    @cached_property
+    def agreement_interval_(self) -> NiceDict:
+        """
+        Confidence intervals of the agreement between the rules.
+
+        :return: a :class:`NiceDict`. For each pair of rule names, a pair of floats (cf. :func:`wilson_interval`).
+        """
+        trials = self.counts_['profiles']
+        return NiceDict({(name, other): wilson_interval(successes, trials, self.confidence)
+                         for name, d in self.counts_['agreement'].items() for other, successes in d.items()})
+
+
+def _batch_counts(simulation: Simulation, k: int) -> dict:
+    """
+    Counts of a batch, in a worker process.
+
+    :param simulation: the simulation.
+    :param k: the index of the batch.
+    :return: the counts of the batch.
+    """
+    # noinspection PyProtectedMember
+    return simulation._batch_counts(k)
@@ -18,11 +18,18 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with Whalrus.  If not, see <http://www.gnu.org/licenses/>.
 """
-from pyparsing import Group, Word, ZeroOrMore, alphas, nums, ParseException
+import inspect
 from bisect import bisect_left
+from collections.abc import Mapping
 from fractions import Fraction
 from decimal import Decimal
 from numbers import Number
+from statistics import NormalDist
+from typing import TYPE_CHECKING
+from weakref import WeakSet
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def _cache(f):
@@ -39,19 +46,33 @@ def _cache(f):
         try:
             return args[0]._cached_properties[name]
         except KeyError:
-            # Not stored in cache
+            # Not stored in cache. If another thread has stored it meanwhile, its value is kept, so that all the
+            # threads get the same object.
             value = f(*args)
-            args[0]._cached_properties[name] = value
-            return value
+            return args[0]._cached_properties.setdefault(name, value)
         except AttributeError:
-            # cache does not even exist
+            # cache does not even exist (but it may have been created meanwhile, e.g. by another cached property)
             value = f(*args)
-            args[0]._cached_properties = {name: value}
-            return value
+            return args[0].__dict__.setdefault('_cached_properties', dict()).setdefault(name, value)
     _f.__doc__ = f.__doc__
     return _f
 
 
+# The classes that define cached properties. This is used by :mod:`whalrus.profiling`.
+_cached_properties_owners = WeakSet()
+
+
+class _CachedProperty(property):
+    """
+    A property that registers its class in ``_cached_properties_owners`` when the class is created.
+    """
+
+    def __set_name__(self, owner, name):
+        # Like a plain property, it belongs to the module of its class (doctest relies on this to find its examples).
+        self.__module__ = owner.__module__
+        _cached_properties_owners.add(owner)
+
+
 def cached_property(f):
     """
     Decorator used in replacement of @property to put the value in cache automatically.
@@ -61,7 +82,7 @@ def cached_property(f):
 
     Cf. :class:`DeleteCacheMixin` for an example.
     """
-    return property(_cache(f))
+    return _CachedProperty(_cache(f))
 
 
 class DeleteCacheMixin:
@@ -92,6 +113,160 @@ class DeleteCacheMixin:
         self._cached_properties = dict()
 
 
+def _clone_parameter(x: object, memo: dict) -> object:
+    """
+    Auxiliary function used by :meth:`CloneMixin.clone`.
+
+    :param x: the value of a parameter.
+    :param memo: a dictionary of the objects already cloned (by id).
+    :return: a clone of ``x`` if it is a :class:`CloneMixin` (or a list or tuple of such objects), ``x`` itself
+        otherwise.
+    """
+    if isinstance(x, CloneMixin):
+        return x.clone(memo=memo)
+    if isinstance(x, list):
+        return [_clone_parameter(y, memo) for y in x]
+    if isinstance(x, tuple):
+        return tuple(_clone_parameter(y, memo) for y in x)
+    return x
+
+
+class CloneMixin:
+    """
+    Mixin used to copy the parameters of an object, without its computed variables.
+
+    By convention, the computed variables are the attributes whose name ends with an underscore (such as
+    ``profile_converted_``) and the cached properties (cf. :meth:`cached_property`). All the other attributes are
+    parameters. In the clone, the computed variables are reset to None and the cache is empty. The parameters that
+    are themselves :class:`CloneMixin` objects (or lists of such objects) are cloned recursively, while the other ones
+    are shared with the original object.
+
+    >>> class Example(CloneMixin, DeleteCacheMixin):
+    ...     def __init__(self, k):
+    ...         self.k = k
+    ...         self.result_ = None
+    ...     def __call__(self, x):
+    ...         self.result_ = self.k * x
+    ...         self.delete_cache()
+    ...         return self
+    ...     @cached_property
+    ...     def double_result_(self):
+    ...         return 2 * self.result_
+    >>> a = Example(k=3)(x=7)
+    >>> a.double_result_
+    42
+    >>> b = a.clone()
+    >>> b.k, b.result_
+    (3, None)
+    >>> b(x=2).double_result_
+    12
+    >>> a.double_result_
+    42
+
+    This is much cheaper than a ``deepcopy``, because the computed variables (profiles, matrices, etc.) are not
+    copied at all.
+    """
+
+    def clone(self, memo: dict = None) -> object:
+        """
+        Clone the object.
+
+        :param memo: a dictionary of the objects already cloned (by id). It is used internally to preserve the
+            aliasing between parameters, e.g. when the same sub-rule is given in two parameters.
+        :return: a new object of the same class, with the same parameters, but without computed variables.
+        """
+        if memo is None:
+            memo = dict()
+        try:
+            return memo[id(self)]
+        except KeyError:
+            pass
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+        for key, value in self.__dict__.items():
+            if key == '_cached_properties':
+                continue
+            result.__dict__[key] = None if key.endswith('_') else _clone_parameter(value, memo)
+        return result
+
+
+def parameters_key(x: object) -> object:
+    """
+    A hashable key that identifies an object by its class and its parameters.
+
+    :param x: an object, such as a matrix or a converter.
+    :return: a hashable key. For an object with attributes (other than a function or a class), it is made of its
+        class and of the keys of its parameters, i.e. its attributes whose names do not end with an underscore (as in
+        :class:`CloneMixin`). Lists, tuples, sets and dictionaries are keyed by their contents, and the other objects
+        are keyed by themselves (or by their ids if they are not hashable).
+
+    Two objects with the same key behave in the same way, even if they are distinct:
+
+    >>> from whalrus.matrix.MatrixMajority import MatrixMajority
+    >>> parameters_key(MatrixMajority()) == parameters_key(MatrixMajority())
+    True
+    >>> parameters_key(MatrixMajority()) == parameters_key(MatrixMajority(greater=2))
+    False
+    """
+    if isinstance(x, (list, tuple)):
+        return type(x), tuple(parameters_key(y) for y in x)
+    if isinstance(x, (set, frozenset)):
+        return frozenset, frozenset(parameters_key(y) for y in x)
+    if isinstance(x, dict):
+        return dict, frozenset((parameters_key(k), parameters_key(v)) for k, v in x.items())
+    if hasattr(x, '__dict__') and not isinstance(x, type) and not inspect.isroutine(x):
+        return type(x), frozenset((k, parameters_key(v)) for k, v in vars(x).items()
+                                  if not k.endswith('_') and k != '_cached_properties')
+    try:
+        hash(x)
+        return x
+    except TypeError:
+        return id(x)
+
+
+def shared_matrix_key(matrix: object, converter: object, candidates: set) -> tuple:
+    """
+    The key of a shared matrix (cf. :func:`share_matrices`).
+
+    :param matrix: a :class:`Matrix` (its parameters only are used).
+    :param converter: the :class:`ConverterBallot` of the rule that uses the matrix.
+    :param candidates: the candidates of the rule (cf. :attr:`Rule.candidates_`).
+    :return: a hashable key. Two matrices with the same key, computed for rules called with the same profile, are
+        computed on the same converted ballots: they are equal.
+    """
+    return parameters_key(matrix), parameters_key(converter), parameters_key(candidates)
+
+
+def share_matrices(rule: object, shared: dict) -> None:
+    """
+    Give a rule the matrices that are already computed for its profile.
+
+    :param rule: a :class:`Rule`, which has just been called with a profile.
+    :param shared: a dictionary of the matrices computed for the rules called with the same profile, whose keys are
+        given by :func:`shared_matrix_key`. It is updated with the matrices of the rule.
+
+    Each matrix parameter of the rule (e.g. ``matrix_weighted_majority``) is looked up in ``shared``, so that the
+    rules whose matrices have the same parameters and whose converters have the same parameters use the same matrix
+    (computed only once, by the first rule):
+
+    >>> from whalrus.rule.RuleCopeland import RuleCopeland
+    >>> from whalrus.rule.RuleCondorcet import RuleCondorcet
+    >>> profile, shared = ['a > b > c', 'b > a > c'], dict()
+    >>> copeland, condorcet = RuleCopeland(profile), RuleCondorcet(profile)
+    >>> share_matrices(copeland, shared)
+    >>> share_matrices(condorcet, shared)
+    >>> copeland.matrix_ is condorcet.matrix_majority_
+    True
+    """
+    for name in rule.matrix_parameters():
+        value = getattr(rule, name)
+        key = shared_matrix_key(value, rule.converter, rule.candidates_)
+        if key in shared:
+            rule.use_matrix(name, shared[key])
+        else:
+            shared[key] = getattr(rule, name + '_')
+
+
 def parse_weak_order(s: str) -> list:
     """
     Convert a string representing a weak order to a list of sets.
@@ -105,7 +280,8 @@ def parse_weak_order(s: str) -> list:
     True
     """
 
-    # Build the parser
+    # Build the parser (pyparsing is imported here, so that importing whalrus does not load it)
+    from pyparsing import Group, Word, ZeroOrMore, alphas, nums, ParseException
     candidate = Word(alphas.upper() + alphas.lower() + nums + '_')
     equiv_class = Group(candidate + ZeroOrMore(Word('~').suppress() + candidate))
     weak_preference = equiv_class + ZeroOrMore(Word('>').suppress() + equiv_class)
@@ -218,6 +394,58 @@ class NiceDict(dict):
         return dict_to_str(self)
 
 
+class NiceMatrixView(Mapping):
+    """
+    A read-only dictionary view of a square matrix, whose keys are pairs of candidates.
+
+    :param array: a square numpy array.
+    :param candidates_as_list: the list of candidates, in the order of the rows and columns of ``array``.
+    :param candidates_indexes: a dictionary that, to each candidate, associates its index in ``candidates_as_list``.
+        Default: it is computed from ``candidates_as_list``.
+
+    It behaves like a :class:`NiceDict` whose keys are the pairs of candidates, but the coefficients are read in the
+    array on demand: building the view does not allocate any pair of candidates.
+
+    >>> import numpy as np
+    >>> view = NiceMatrixView(np.array([[0, 3], [1, 0]]), ['a', 'b'])
+    >>> view
+    {('a', 'a'): 0, ('a', 'b'): 3, ('b', 'a'): 1, ('b', 'b'): 0}
+    >>> view[('a', 'b')]
+    3
+    >>> len(view)
+    4
+    """
+
+    def __init__(self, array, candidates_as_list: list, candidates_indexes: dict = None):
+        if candidates_indexes is None:
+            candidates_indexes = {c: i for i, c in enumerate(candidates_as_list)}
+        self._array = array
+        self._candidates_as_list = candidates_as_list
+        self._candidates_indexes = candidates_indexes
+
+    def __getitem__(self, key: tuple):
+        c, d = key
+        return self._array.item(self._candidates_indexes[c], self._candidates_indexes[d])
+
+    def __iter__(self):
+        for c in self._candidates_as_list:
+            for d in self._candidates_as_list:
+                yield c, d
+
+    def __len__(self) -> int:
+        return len(self._candidates_as_list) ** 2
+
+    def __contains__(self, key) -> bool:
+        try:
+            c, d = key
+            return c in self._candidates_indexes and d in self._candidates_indexes
+        except (TypeError, ValueError):
+            return False
+
+    def __repr__(self) -> str:
+        return dict_to_str(self)
+
+
 def take_closest(my_list, my_number):
     """
     In a list, take the closest element to a given number.
@@ -311,3 +539,214 @@ def my_division(x: Number, y: Number, divide_by_zero: Number = None):
         return convert_number(Fraction(x) / Fraction(y))
     except TypeError:
         raise NotImplementedError
+
+
+def weighted_quantile_index(weights: list, q: Number = Fraction(1, 2)) -> int:
+    """
+    Position of a weighted quantile.
+
+    :param weights: a non-empty list of weights, e.g. the total weight of each level of a scale, from the lowest level
+        to the highest one (i.e. a histogram).
+    :param q: a number between 0 and 1.
+    :return: the smallest index `i` such that the sum of the weights up to `i` (included) is at least `q` times the
+        total weight. For `q = 1 / 2`, this is the lower weighted median.
+
+    The cost is linear in the length of the list, hence in the number of levels (not in the number of voters).
+
+    >>> weighted_quantile_index([1, 1, 1, 1])
+    1
+    >>> weighted_quantile_index([1, 0, 3])
+    2
+    >>> weighted_quantile_index([1, 0, 3], q=Fraction(1, 4))
+    0
+    """
+    threshold = q * sum(weights)
+    cumulative_weight = 0
+    for i, weight in enumerate(weights):
+        cumulative_weight += weight
+        if cumulative_weight >= threshold:
+            return i
+    return len(weights) - 1
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = .95) -> tuple:
+    """
+    Confidence interval of a proportion (Wilson score interval).
+
+    :param successes: the number of successes.
+    :param trials: the number of trials.
+    :param confidence: the confidence level.
+    :return: a pair of floats `(low, high)`. If there is no trial, then it is `(0., 1.)`.
+
+    >>> low, high = wilson_interval(80, 100)
+    >>> round(low, 4), round(high, 4)
+    (0.7112, 0.8666)
+
+    Unlike the normal approximation, the interval stays within [0, 1] and is not reduced to a point when all trials
+    are successes:
+
+    >>> low, high = wilson_interval(10, 10)
+    >>> round(low, 4), high
+    (0.7225, 1.0)
+    """
+    if trials == 0:
+        return 0., 1.
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    center = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * (p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) ** .5 / denominator
+    return max(0., center - half_width), min(1., center + half_width)
+
+
+def strongly_connected_components(adjacency) -> list:
+    """
+    Strongly connected components of a directed graph (Tarjan's algorithm).
+
+    :param adjacency: a square array of booleans (e.g. a numpy array). ``adjacency[i][j]`` is True iff there is an
+        edge from `i` to `j`.
+    :return: a list of components, each one being a sorted list of indexes. The components are sorted topologically:
+        if there is an edge from a component to another one, then the first one comes before. The cost is quadratic
+        in the number of vertices.
+
+    >>> strongly_connected_components([[False, True, False, False],
+    ...                                [True, False, False, False],
+    ...                                [True, True, False, True],
+    ...                                [False, False, True, False]])
+    [[2, 3], [0, 1]]
+    """
+    n = len(adjacency)
+    successors = [[j for j in range(n) if adjacency[i][j]] for i in range(n)]
+    index = [None] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+    for root in range(n):
+        if index[root] is not None:
+            continue
+        # Each item is a vertex and the position of the next successor to explore.
+        work = [(root, 0)]
+        while work:
+            v, position = work.pop()
+            if position == 0:
+                index[v] = low[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack[v] = True
+            for j in range(position, len(successors[v])):
+                w = successors[v][j]
+                if index[w] is None:
+                    work.append((v, j + 1))
+                    work.append((w, 0))
+                    break
+                if on_stack[w]:
+                    low[v] = min(low[v], index[w])
+            else:
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+    # Tarjan's algorithm finds the components in reverse topological order.
+    return components[::-1]
+
+
+def small_int_array(values: list) -> 'np.ndarray':
+    """
+    Convert integers to a numpy array with the smallest possible dtype.
+
+    :param values: a list of integers.
+    :return: a numpy array. Its dtype is the smallest integer dtype that can hold all the values.
+
+    >>> small_int_array([0, 1, 200]).dtype
+    dtype('uint8')
+    >>> small_int_array([-2, 1, 200]).dtype
+    dtype('int16')
+    """
+    import numpy as np
+    if not values:
+        return np.zeros(0, dtype=np.uint8)
+    return np.array(values, dtype=np.result_type(np.min_scalar_type(min(values)), np.min_scalar_type(max(values))))
+
+
+def encode_numbers(values: list, name: str) -> dict:
+    """
+    Encode numbers as numpy arrays.
+
+    :param values: a list of numbers (integers, fractions or floats).
+    :param name: a name.
+    :return: a dictionary of numpy arrays, or None if the numbers cannot be encoded. If all the numbers are integers,
+        the dictionary is ``{name: array}``. If all of them are integers or fractions, it is
+        ``{name + '_numerators': array, name + '_denominators': array}``, so that the values are exact. If all of them
+        are floats, it is ``{name: array}`` with a float dtype. Cf. :func:`decode_numbers`.
+
+    >>> encode_numbers([1, 2], 'weights')
+    {'weights': array([1, 2], dtype=uint8)}
+    >>> encode_numbers([1, Fraction(1, 2)], 'weights')
+    {'weights_numerators': array([1, 1], dtype=uint8), 'weights_denominators': array([1, 2], dtype=uint8)}
+    """
+    import numpy as np
+    if all(type(x) is int for x in values):
+        if values and not -2 ** 63 <= min(values) <= max(values) < 2 ** 63:
+            return None
+        return {name: small_int_array(values)}
+    if all(type(x) in {int, Fraction} for x in values):
+        numerators = [x.numerator for x in values]
+        denominators = [x.denominator for x in values]
+        if not -2 ** 63 <= min(numerators) <= max(numerators) < 2 ** 63 or max(denominators) >= 2 ** 63:
+            return None
+        return {name + '_numerators': small_int_array(numerators),
+                name + '_denominators': small_int_array(denominators)}
+    if all(type(x) is float for x in values):
+        return {name: np.array(values, dtype=float)}
+    return None
+
+
+def decode_numbers(arrays: Mapping, name: str) -> list:
+    """
+    Decode numbers encoded by :func:`encode_numbers`.
+
+    :param arrays: a mapping that contains the output of :func:`encode_numbers` (and possibly other keys), e.g. the
+        content of a ``.npz`` file.
+    :param name: the name given to :func:`encode_numbers`.
+    :return: a list of numbers.
+
+    >>> decode_numbers(encode_numbers([1, Fraction(1, 2)], 'weights'), 'weights')
+    [1, Fraction(1, 2)]
+    """
+    if name in arrays:
+        return arrays[name].tolist()
+    numerators = arrays[name + '_numerators'].tolist()
+    denominators = arrays[name + '_denominators'].tolist()
+    return [convert_number(Fraction(p, q)) for p, q in zip(numerators, denominators)]
+
+
+def encode_labels(values: list, name: str) -> 'np.ndarray':
+    """
+    Encode labels (e.g. candidates or voters) as a numpy array.
+
+    :param values: a list of strings, or a list of integers.
+    :param name: the name of the labels (used in the error message).
+    :return: a numpy array, whose method ``tolist`` gives back the labels.
+
+    >>> encode_labels(['a', 'b'], 'candidates')
+    array(['a', 'b'], dtype='<U1')
+    >>> encode_labels(['a', 1], 'candidates')
+    Traceback (most recent call last):
+    TypeError: The candidates must all be strings, or all be integers.
+    """
+    import numpy as np
+    if all(type(x) is str for x in values):
+        return np.array(values, dtype=str)
+    if all(type(x) is int for x in values):
+        return np.array(values, dtype=np.int64)
+    raise TypeError('The %s must all be strings, or all be integers.' % name)